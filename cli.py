@@ -0,0 +1,247 @@
+# 백테스트/분석 통합 실행 진입점
+# python cli.py <명령> [옵션] 으로 각 스크립트를 실행한다. pandas/matplotlib/scipy/pyupbit 같은 무거운 모듈은
+# 해당 명령 함수 안에서만 import 하므로 --help 나 저장된 결과 조회(--cached)는 표준 라이브러리만으로 바로 끝난다.
+#
+#   backtest {bb,ma,cross}  전략 백테스트 (--cached: 저장소의 가장 최근 실행 요약)
+#   sweep                   MA 전략 take_profit/stop_loss 최적화 (--cached: 체크포인트 상위 결과)
+#   monthly                 볼린저 밴드 전략 월별 일괄 백테스트와 월별 그래프
+#   compare                 전략별 5일 단위 누적 수익률 비교
+#   stats                   전략 수익률 통계 검정
+#   report                  전체 보고서 그래프 렌더링
+#   worker                  캔들/지표를 메모리에 두는 상주 백테스트 프로세스 (serve, backtest, stats, evict, shutdown)
+#   distributed             작업 큐로 나눠 실행하는 파라미터 스윕 (run, submit, worker, collect, status)
+import argparse
+import json
+import os
+import runpy
+import sqlite3
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+LIBRARY = ROOT / '보조지표'
+
+STRATEGIES = ['bb', 'ma', 'cross']
+
+STRATEGY_MODULES = {
+    'bb': 'bb_indicators_trade',
+    'ma': 'ma_indicators_trade',
+    'cross': 'cross_indicators_trade',
+}
+
+# trade_store.DEFAULT_PATH 와 같은 경로 (조회만 할 때 pandas 를 import 하지 않도록 직접 계산)
+TRADE_STORE_PATH = os.environ.get('TRADE_STORE_PATH', str(ROOT / 'trade_store.db'))
+
+SWEEP_CHECKPOINT = 'ma_strategy_optimization_checkpoint.db'
+
+# 월별 보고서(2024_bit_price.py 등)가 다루는 구간 (report_figures.MONTHLY_START/END, 2024년 비트코인 가격)
+MONTHLY_REPORT_RANGE = ('20240101', '20241231')
+
+def _use_library():
+    for path in (str(LIBRARY), str(ROOT)):
+        if path not in sys.path:
+            sys.path.append(path)
+
+def _run_script(name):
+    # 파일 이름이 모듈 이름으로 쓸 수 없는 루트 스크립트(yield.py, P&L_ratio.py 등)를 __main__ 으로 실행
+    path = str(ROOT / name)
+    sys.argv = [path]
+    runpy.run_path(path, run_name='__main__')
+
+# ---------------------------------------------------------------- 저장된 결과 조회 (표준 라이브러리만 사용)
+
+def latest_run_summary(strategy, path=None):
+    """저장소에서 전략의 가장 최근 main 실행 요약 (없으면 None)"""
+    path = path or TRADE_STORE_PATH
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        # 전략 스크립트의 main 실행만 (kind 컬럼이 없는 예전 저장소는 모든 실행)
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(runs)')}
+        kind = " AND kind = 'main'" if 'kind' in columns else ''
+        row = conn.execute(
+            f'SELECT run_id, interval, params, created_at FROM runs WHERE strategy = ?{kind} '
+            'ORDER BY created_at DESC, run_id DESC LIMIT 1', (strategy,)
+        ).fetchone()
+        if row is None:
+            return None
+        ratios = [ratio for ratio, in conn.execute(
+            'SELECT profit_ratio FROM trades WHERE run_id = ? ORDER BY entry_time', (row[0],))]
+        total_profit, = conn.execute('SELECT COALESCE(SUM(profit), 0) FROM trades WHERE run_id = ?',
+                                     (row[0],)).fetchone()
+    finally:
+        conn.close()
+    equity = 1.0
+    for ratio in ratios:
+        equity *= 1 + ratio
+    return {
+        'run_id': row[0],
+        'interval': row[1],
+        'params': json.loads(row[2]),
+        'created_at': row[3],
+        'trades': len(ratios),
+        'win_rate': sum(ratio > 0 for ratio in ratios) / len(ratios) * 100 if ratios else 0.0,
+        'total_profit': total_profit,
+        'compound_return': (equity - 1) * 100,
+    }
+
+def sweep_results(path=SWEEP_CHECKPOINT):
+    """스윕 체크포인트에 저장된 결과 dict 목록 (없으면 빈 목록)"""
+    if not os.path.exists(path):
+        return []
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        return [json.loads(payload) for payload, in
+                conn.execute('SELECT result FROM results WHERE result IS NOT NULL')]
+    finally:
+        conn.close()
+
+# ---------------------------------------------------------------- 명령
+
+def cmd_backtest(args):
+    if args.cached:
+        summary = latest_run_summary(args.strategy)
+        if summary is None:
+            print(f"저장된 '{args.strategy}' 전략 거래 내역이 없습니다.")
+            return 1
+        print(f"run_id: {summary['run_id']} ({summary['created_at']}, {summary['interval']})")
+        print(f"파라미터: {summary['params']}")
+        print(f"거래 {summary['trades']}회, 승률 {summary['win_rate']:.2f}%, "
+              f"총 수익금 {summary['total_profit']:,.0f}원, 복리 수익률 {summary['compound_return']:.2f}%")
+        return 0
+    _use_library()
+    import importlib
+    module = importlib.import_module(STRATEGY_MODULES[args.strategy])
+    module.main(args.start, args.end)
+    return 0
+
+def cmd_sweep(args):
+    if args.cached:
+        results = sorted(sweep_results(args.checkpoint), key=lambda r: -r['total_profit_ratio'])
+        if not results:
+            print(f"체크포인트에 저장된 결과가 없습니다: {args.checkpoint}")
+            return 1
+        columns = ['take_profit', 'stop_loss', 'total_trades', 'win_rate', 'total_profit_ratio',
+                   'max_drawdown']
+        print(f"=== 상위 {min(args.top, len(results))}개 파라미터 조합 (완료 {len(results)}개) ===")
+        print('  '.join(f'{column:>18}' for column in columns))
+        for result in results[:args.top]:
+            print('  '.join(f'{result[column]:>18.3f}' for column in columns))
+        return 0
+    _use_library()
+    if args.checkpoint != SWEEP_CHECKPOINT:
+        namespace = runpy.run_path(str(ROOT / 'P&L_ratio.py'))
+        namespace['optimize_parameters'](args.checkpoint)
+    else:
+        _run_script('P&L_ratio.py')
+    return 0
+
+def cmd_monthly(args):
+    first, last = MONTHLY_REPORT_RANGE
+    if not args.skip_report and not first <= args.start <= args.end <= last:
+        # 보고서는 2024년 구간만 그리므로 다른 구간은 일괄 실행 전에 거절
+        print(f"월별 보고서는 {first} ~ {last} 구간만 지원합니다. "
+              f"다른 구간은 --skip-report 로 일괄 실행만 하세요. (요청: {args.start} ~ {args.end})")
+        return 1
+    _use_library()
+    if not args.skip_batch:
+        from bb_monthly_batch import main as run_monthly_batch
+        run_monthly_batch(args.start, args.end, args.freq)
+    if not args.skip_report:
+        for script in ['2024_bit_price.py', 'BB_monthly _trading_performance.py', 'monthly_comparison.py']:
+            _run_script(script)
+    return 0
+
+def cmd_compare(args):
+    _use_library()
+    _run_script('yield_reality.py' if args.all_trades else 'yield.py')
+    return 0
+
+def cmd_stats(args):
+    _use_library()
+    from statistical_validation import main as run_statistical_validation
+    run_statistical_validation()
+    if args.monte_carlo:
+        from monte_carlo import main as run_monte_carlo
+        run_monte_carlo()
+    return 0
+
+def cmd_report(args):
+    _use_library()
+    from report_figures import main as render_report
+    argv = ['--force'] if args.force else []
+    if args.output:
+        argv += ['--output', args.output]
+    if args.workers:
+        argv += ['--workers', str(args.workers)]
+    render_report(argv)
+    return 0
+
+def cmd_worker(args):
+    _use_library()
+    from warm_worker import main as run_worker
+    run_worker(args.args)
+    return 0
+
+def cmd_distributed(args):
+    _use_library()
+    from distributed_sweep import main as run_distributed
+    run_distributed(args.args)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="코인 보조지표 백테스트/분석 실행")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='<명령>')
+
+    backtest = commands.add_parser('backtest', help="전략 백테스트")
+    backtest.add_argument('strategy', choices=STRATEGIES)
+    backtest.add_argument('--start', default='20250101', help="시작 날짜 YYYYMMDD")
+    backtest.add_argument('--end', default='20250131', help="종료 날짜 YYYYMMDD")
+    backtest.add_argument('--cached', action='store_true', help="실행하지 않고 저장소의 가장 최근 결과 요약")
+    backtest.set_defaults(func=cmd_backtest)
+
+    sweep = commands.add_parser('sweep', help="MA 전략 take_profit/stop_loss 최적화")
+    sweep.add_argument('--checkpoint', default=SWEEP_CHECKPOINT, help="체크포인트 파일")
+    sweep.add_argument('--cached', action='store_true', help="실행하지 않고 체크포인트의 상위 결과 출력")
+    sweep.add_argument('--top', type=int, default=10)
+    sweep.set_defaults(func=cmd_sweep)
+
+    monthly = commands.add_parser('monthly', help="볼린저 밴드 월별 일괄 백테스트와 월별 그래프")
+    monthly.add_argument('--start', default='20240101')
+    monthly.add_argument('--end', default='20241231')
+    monthly.add_argument('--freq', default='MS', help="기간 단위 (MS: 월, W-MON: 주, D: 일)")
+    monthly.add_argument('--skip-batch', action='store_true', help="백테스트 없이 저장된 거래로 그래프만")
+    monthly.add_argument('--skip-report', action='store_true',
+                         help="그래프/월별 통계 생략 (보고서는 2024년 구간만 지원)")
+    monthly.set_defaults(func=cmd_monthly)
+
+    compare = commands.add_parser('compare', help="전략별 누적 수익률 비교")
+    compare.add_argument('--all-trades', action='store_true', help="5일 단위 대신 거래별 누적 수익률 그래프")
+    compare.set_defaults(func=cmd_compare)
+
+    stats = commands.add_parser('stats', help="전략 수익률 통계 검정")
+    stats.add_argument('--monte-carlo', action='store_true', help="몬테카를로 시뮬레이션도 실행")
+    stats.set_defaults(func=cmd_stats)
+
+    report = commands.add_parser('report', help="전체 보고서 그래프 렌더링")
+    report.add_argument('--output', help="출력 폴더 (기본: REPORT_DIR 또는 reports)")
+    report.add_argument('--workers', type=int, help="작업 프로세스 수")
+    report.add_argument('--force', action='store_true', help="변경 없는 그래프도 다시 그림")
+    report.set_defaults(func=cmd_report)
+
+    worker = commands.add_parser('worker', help="상주 백테스트 프로세스 (예: worker serve, worker backtest ma)")
+    worker.add_argument('args', nargs=argparse.REMAINDER, help="warm_worker.py 인자")
+    worker.set_defaults(func=cmd_worker)
+
+    distributed = commands.add_parser('distributed', help="작업 큐로 나눠 실행하는 파라미터 스윕 (예: distributed run --workers 3)")
+    distributed.add_argument('args', nargs=argparse.REMAINDER, help="distributed_sweep.py 인자")
+    distributed.set_defaults(func=cmd_distributed)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
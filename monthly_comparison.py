@@ -1,115 +1,31 @@
 # bb_indicators_trade.py 에서 생성한 2024년 월별 성과 시각화
 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 import os
-import matplotlib.pyplot as plt
-from matplotlib import font_manager, rc
-plt.rcParams['font.family'] ='Malgun Gothic'
-plt.rcParams['axes.unicode_minus'] =False
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent / '보조지표'))
+from report_figures import load_monthly_trades, monthly_statistics, monthly_statistics_job
+from report_pipeline import print_status, render_jobs
 
 def load_monthly_data():
-    # 현재 파일의 디렉토리 경로 가져오기
-    base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    # 모든 월의 파일 목록
-    months = ['01', '02', '03', '04', '05', '06', '07', '08', '09', '10', '11', '12']
-    all_data = []
-    
-    for month in months:
-        filename = f'2024{month}01_trade_history_bb.csv'
-        full_path = os.path.join(base_path, filename)
-        
-        try:
-            df = pd.read_csv(full_path)
-            # 날짜 컬럼을 datetime으로 변환
-            df['진입일자'] = pd.to_datetime(df['진입일자'])
-            df['종료일자'] = pd.to_datetime(df['종료일자'])
-            all_data.append(df)
-            print(f"{filename} 로드 완료")
-        except FileNotFoundError:
-            print(f"{filename} 파일을 찾을 수 없습니다. 경로: {full_path}")
-            continue
+    # 월별 일괄 실행(bb_monthly_batch.py)의 2024년 거래 내역을 저장소에서 한 번에 조회
+    combined_df = load_monthly_trades()
     
     # 데이터가 있는지 확인
-    if not all_data:
-        raise ValueError("로드된 데이터가 없습니다. 파일 경로를 확인해주세요.")
+    if combined_df.empty:
+        raise ValueError("로드된 데이터가 없습니다. bb_monthly_batch.py 로 월별 거래 내역을 먼저 생성해주세요.")
     
-    # 모든 데이터를 하나의 데이터프레임으로 합치기
-    combined_df = pd.concat(all_data, ignore_index=True)
+    print(f"거래 내역 {len(combined_df)}건 로드 완료")
     return combined_df
 
 def analyze_monthly_performance(df):
     """월별 성과 분석"""
-    # 월별 데이터 그룹화
-    df['월'] = df['진입일자'].dt.strftime('%Y-%m')
-    monthly_stats = df.groupby('월').agg({
-        '수익금액': ['count', 'sum', 'mean', 'std'],
-        '수익률': ['mean', 'std', lambda x: (x > 0).mean() * 100]  # 승률 추가
-    }).round(2)
-    
-    # 컬럼명 변경
-    monthly_stats.columns = [
-        '거래횟수', '총수익', '평균수익', '수익표준편차',
-        '평균수익률', '수익률표준편차', '승률'
-    ]
-    
-    # 추가 지표 계산
-    monthly_stats['샤프비율'] = monthly_stats['평균수익률'] / monthly_stats['수익률표준편차']
-    
-    return monthly_stats
+    return monthly_statistics(df)
 
 def plot_monthly_performance(stats):
-    """월별 성과 시각화"""
-    plt.rcParams['font.family'] = 'Malgun Gothic'  # 한글 폰트 설정
-    plt.rcParams['axes.unicode_minus'] = False     # 마이너스 기호 깨짐 방지
-    
-    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-    
-    # 1. 월별 총수익
-    axes[0, 0].grid(True, zorder=0)  # grid를 먼저 그리고 zorder를 0으로 설정
-    axes[0, 0].bar(range(len(stats.index)), stats['총수익'], color='skyblue', zorder=3)  # bar의 zorder를 더 높게 설정
-    axes[0, 0].set_title('월별 총수익률')
-    axes[0, 0].set_xticks(range(len(stats.index)))
-    axes[0, 0].set_xticklabels(stats.index, rotation=45)
-    
-    # 2. 월별 거래횟수
-    axes[0, 1].grid(True, zorder=0)
-    axes[0, 1].bar(range(len(stats.index)), stats['거래횟수'], color='lightgreen', zorder=3)
-    axes[0, 1].set_title('월별 거래횟수')
-    axes[0, 1].set_xticks(range(len(stats.index)))
-    axes[0, 1].set_xticklabels(stats.index, rotation=45)
-    
-    # 3. 월별 승률
-    axes[1, 0].grid(True, zorder=0)
-    axes[1, 0].bar(range(len(stats.index)), stats['승률'], color='salmon', zorder=3)
-    axes[1, 0].set_title('월별 승률 (%)')
-    axes[1, 0].set_xticks(range(len(stats.index)))
-    axes[1, 0].set_xticklabels(stats.index, rotation=45)
-    
-    # 4. 월별 샤프비율
-    axes[1, 1].grid(True, zorder=0)
-    axes[1, 1].bar(range(len(stats.index)), stats['샤프비율'], color='purple', zorder=3)
-    axes[1, 1].set_title('월별 샤프비율')
-    axes[1, 1].set_xticks(range(len(stats.index)))
-    axes[1, 1].set_xticklabels(stats.index, rotation=45)
-    
-    plt.tight_layout()
-    
-    # 현재 시간을 파일명에 포함
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # 현재 스크립트의 디렉토리에 저장
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    image_path = os.path.join(current_dir, f'monthly_performance_{timestamp}.png')
-    
-    # 이미지 저장 (높은 DPI로 저장하여 품질 향상)
-    plt.savefig(image_path, dpi=300, bbox_inches='tight')
-    print(f"\n그래프가 저장되었습니다: {image_path}")
-    
-    plt.show()
+    """월별 성과 시각화 (Agg 백엔드로 reports 폴더에 저장, 데이터가 바뀌지 않았으면 기존 파일 사용)"""
+    print_status(render_jobs([monthly_statistics_job(stats)]))
 
 def print_monthly_summary(stats):
     """월별 성과 요약 출력"""
@@ -161,14 +77,4 @@ def main():
         print("프로그램을 종료합니다.")
 
 if __name__ == "__main__":
-    # font_path = "C:/Windows/Fonts/malgun.ttf" 
-    
-    # try:
-    #     font_name = font_manager.FontProperties(fname=font_path).get_name()
-    #     rc('font', family=font_name)
-    #     print("font 설정 완료")
-    # except Exception as e:
-    #     print(f"폰트 설정 오류: {e}")
-    #     print("기본 폰트로 설정합니다.")    
-
-    main()
\ No newline at end of file
+    main()
@@ -1,12 +1,12 @@
 # 통계적 검증
-import pandas as pd
-import numpy as np
 from scipy import stats
-import matplotlib.pyplot as plt
-import platform
-
-plt.rc('font', family='Malgun Gothic')
-plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent / '보조지표'))
+from report_figures import distribution_jobs
+from report_pipeline import print_status, render_jobs
+from resampling_tests import resampling_tests
+from trade_store import load_report_frame
 
 class TradingStrategyTester:
     def __init__(self, bb_data, cross_data):
@@ -41,37 +41,13 @@ class TradingStrategyTester:
         return test_results
 
     def plot_distribution_comparison(self):
-        """두 전략의 수익률 분포 시각화"""
-        plt.figure(figsize=(12, 6))
-        
-        # 수익률 분포 비교
-        plt.subplot(1, 2, 1)
-        plt.hist(self.bb_df['수익률'], bins=30, alpha=0.5, label='볼린저밴드 전략')
-        plt.hist(self.cross_df['수익률'], bins=30, alpha=0.5, label='골든/데드크로스 전략')
-        plt.title('수익률 분포 비교')
-        plt.xlabel('수익률')
-        plt.ylabel('빈도')
-        plt.legend()
-        
-        # Q-Q plot
-        plt.subplot(1, 2, 2)
-        stats.probplot(self.bb_df['수익률'], dist="norm", plot=plt)
-        plt.title('볼린저밴드 전략 Q-Q Plot')
-        
-        plt.tight_layout()
-        plt.show()
-
-        # Cross 전략의 Q-Q plot도 별도로 표시
-        plt.figure(figsize=(6, 6))
-        stats.probplot(self.cross_df['수익률'], dist="norm", plot=plt)
-        plt.title('크로스 전략 Q-Q Plot')
-        plt.tight_layout()
-        plt.show()
+        """두 전략의 수익률 분포와 Q-Q plot 저장 (Agg 백엔드, 데이터가 바뀌지 않았으면 기존 파일 사용)"""
+        print_status(render_jobs(distribution_jobs(self.bb_df['수익률'], self.cross_df['수익률'])))
 
 def main():
-    # 데이터 로드
-    bb_df = pd.read_csv('trade_history_20250208_014914.csv')
-    cross_df = pd.read_csv('trade_history_20250210_053652_cross.csv')
+    # 데이터 로드 (거래 내역 저장소에서 전략별 가장 최근 실행)
+    bb_df = load_report_frame('bb')
+    cross_df = load_report_frame('cross')
     
     # 분석 실행
     tester = TradingStrategyTester(bb_df, cross_df)
@@ -88,6 +64,17 @@ def main():
     print(f"   - BB 전략: p-value = {results['BB전략 정규성 p-value']:.4f}")
     print(f"   - Cross 전략: p-value = {results['Cross전략 정규성 p-value']:.4f}")
     print(f"   - 해석: p-value < 0.05 인 경우 정규분포가 아님")
+    
+    # 모든 전략 쌍의 평균 수익률/샤프 비율 차이 재표본 검정
+    returns = {
+        'BB': bb_df['수익률'],
+        'Cross': cross_df['수익률'],
+        'MA': load_report_frame('ma')['수익률'],
+    }
+    resampling = resampling_tests(returns, n_resamples=100000, seed=0)
+    print("\n3. 전략 쌍별 재표본 검정 (block bootstrap 95% 신뢰구간, 순열 검정)")
+    print(resampling.to_string(index=False, float_format=lambda x: f'{x:.4f}'))
+    print(f"   - 해석: 보정 p-value(p_holm, p_bh) < 0.05 인 쌍은 여러 쌍을 함께 검정해도 유의미한 차이")
     print("=" * 50)
     
     # 분포 시각화
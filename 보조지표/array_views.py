@@ -0,0 +1,35 @@
+# 전략 입력용 읽기 전용 NumPy 뷰와 메모리 할당 확인
+# 데이터프레임을 복사해 지표/결과 컬럼을 덧붙이는 대신, 필요한 컬럼을 복사 없는 읽기 전용 뷰로 넘기고
+# 전략은 신호/거래 결과를 별도 배열로 반환한다. 뷰에 쓰려고 하면 ValueError 가 발생한다.
+import tracemalloc
+
+import numpy as np
+
+def readonly_view(values):
+    """배열(또는 Series)의 복사 없는 읽기 전용 뷰"""
+    view = np.asarray(values).view()
+    view.flags.writeable = False
+    return view
+
+def column_views(df, columns):
+    """데이터프레임 컬럼별 읽기 전용 뷰 dict (컬럼 자료형이 그대로면 복사하지 않음)"""
+    return {column: readonly_view(df[column].to_numpy()) for column in columns}
+
+def allocation_peak(func, *args, **kwargs):
+    """func 실행 중 새로 할당된 메모리의 최대값 (tracemalloc 기준, bytes)
+
+    Returns:
+        tuple: (func 반환값, 최대 할당 bytes)
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return result, peak - start
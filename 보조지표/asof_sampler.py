@@ -0,0 +1,41 @@
+# 여러 전략의 누적 수익률을 하나의 달력에 맞춰 as-of 샘플링
+import numpy as np
+import pandas as pd
+
+def sampling_calendar(series_by_name, freq='5D', start=None, end=None):
+    """모든 전략의 첫/마지막 날짜를 포함하는 freq 간격 날짜 달력"""
+    observed = [series for series in series_by_name.values() if len(series)]
+    if start is None:
+        start = min(series.index.min() for series in observed)
+    if end is None:
+        end = max(series.index.max() for series in observed)
+    return pd.date_range(start=pd.Timestamp(start).normalize(),
+                         end=pd.Timestamp(end).normalize(), freq=freq)
+
+def asof_sample(series_by_name, freq='5D', start=None, end=None, cutoff=pd.Timedelta(days=1),
+                fill_value=0.0):
+    """각 달력 날짜 시점의 마지막 값으로 샘플링 (전략 수, 주기에 무관하게 한 번의 정렬 탐색)
+
+    Args:
+        series_by_name: {전략 이름: 시각 index 의 pd.Series (예: 누적수익률)}
+        freq: 달력 간격 ('5D', 'D', 'W' 등)
+        cutoff: 날짜 L 의 값은 L + cutoff 이전(기본: 그날 하루 전체)까지의 마지막 관측값
+        fill_value: 첫 관측 이전 날짜의 값 (누적 수익률이면 0)
+
+    Returns:
+        pd.DataFrame: index=달력 날짜, columns=전략 이름
+    """
+    calendar = sampling_calendar(series_by_name, freq=freq, start=start, end=end)
+    bounds = (calendar + cutoff).values
+    sampled = {}
+    for name, series in series_by_name.items():
+        if len(series) == 0:
+            sampled[name] = np.full(len(calendar), fill_value)
+            continue
+        if not series.index.is_monotonic_increasing:
+            series = series.sort_index(kind='stable')
+        values = series.to_numpy(dtype=np.float64)
+        # bounds 이전의 마지막 관측 위치 (없으면 -1)
+        positions = np.searchsorted(series.index.values, bounds, side='left') - 1
+        sampled[name] = np.where(positions >= 0, values[np.maximum(positions, 0)], fill_value)
+    return pd.DataFrame(sampled, index=pd.DatetimeIndex(calendar, name='날짜'))
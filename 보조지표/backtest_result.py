@@ -0,0 +1,191 @@
+# 출력 없는 백테스트 실행 API
+# run_backtest() 는 아무것도 출력하거나 저장하지 않고 BacktestResult(컬럼별 거래 배열, 봉별 데이터,
+# 누적 거래 통계, 성과 지표)를 반환한다. 출력/CSV 저장은 trade_report 의 함수로 필요할 때만 한다.
+# run_array_backtest() 는 캔들을 복사하지 않고 읽기 전용 배열 뷰로 전략을 실행한다 (스윕용).
+import numpy as np
+import pandas as pd
+
+from array_views import allocation_peak, readonly_view
+from equity_curve import equity_curve, max_drawdown
+from incremental_backtest import STRATEGIES, CANDLE_COLUMNS, calculate_indicators, closed_trades
+from metrics import performance_metrics
+
+TRADE_FIELDS = ['position', 'entry_date', 'exit_date', 'entry_price', 'exit_price',
+                'profit_ratio', 'profit', 'exit_reason']
+
+def trade_arrays(trades):
+    """청산된 거래 목록(dict)을 컬럼별 NumPy 배열 dict 로 변환"""
+    return {
+        'position': np.array([trade['position'] for trade in trades], dtype='U5'),
+        'entry_date': np.array([trade['entry_date'] for trade in trades], dtype='datetime64[ns]'),
+        'exit_date': np.array([trade['exit_date'] for trade in trades], dtype='datetime64[ns]'),
+        'entry_price': np.array([trade['entry_price'] for trade in trades], dtype=np.float64),
+        'exit_price': np.array([trade['exit_price'] for trade in trades], dtype=np.float64),
+        'profit_ratio': np.array([trade['profit_ratio'] for trade in trades], dtype=np.float64),
+        'profit': np.array([trade['profit'] for trade in trades], dtype=np.float64),
+        'exit_reason': np.array([trade.get('exit_reason') or '' for trade in trades], dtype='U16'),
+    }
+
+class BacktestResult:
+    """백테스트 한 번의 결과
+
+    trades 는 컬럼별 배열(dict), bars 는 지표/신호가 붙은 봉별 데이터프레임,
+    stats 는 실행 중 누적된 TradeStats, open_position 은 청산되지 않은 포지션(dict 또는 None)이다.
+    배열 인터페이스로 실행하면 bars 는 입력 캔들 그대로이고 봉별 결과는 bar_arrays(dict)에 있다.
+    """
+
+    def __init__(self, name, params, trades, bars, stats, open_position=None, bar_arrays=None):
+        self.name = name
+        self.params = params
+        self.trades = trades
+        self.bars = bars
+        self.stats = stats
+        self.open_position = open_position
+        self.bar_arrays = bar_arrays
+        self._metrics = None
+
+    @classmethod
+    def from_strategy(cls, name, strategy, bars, bar_arrays=None):
+        """실행이 끝난 전략 객체에서 결과 생성"""
+        open_position = None
+        if strategy.position is not None:
+            open_position = {'position': strategy.position, 'entry_date': strategy.entry_date,
+                             'entry_price': strategy.entry_price}
+        params = {'take_profit': strategy.take_profit, 'stop_loss': strategy.stop_loss}
+        return cls(name, params, trade_arrays(closed_trades(strategy)), bars, strategy.stats,
+                   open_position, bar_arrays)
+
+    def __len__(self):
+        return len(self.trades['profit_ratio'])
+
+    @property
+    def metrics(self):
+        """거래별 수익률 기준 성과 지표 dict (metrics.performance_metrics) + 총 수익금"""
+        if self._metrics is None:
+            metrics = performance_metrics(self.trades['profit_ratio'][None, :]).iloc[0].to_dict()
+            metrics['total_profit'] = float(self.trades['profit'].sum())
+            self._metrics = metrics
+        return self._metrics
+
+    def trade_frame(self):
+        """거래 내역 데이터프레임 (컬럼은 전략 거래 내역 dict 키)"""
+        return pd.DataFrame(self.trades, columns=TRADE_FIELDS)
+
+    def trade_list(self):
+        """거래 내역 dict 목록 (저장소 write_run, equity_curve 등에 전달)"""
+        records = self.trade_frame().to_dict('records')
+        for record in records:
+            record['exit_reason'] = record['exit_reason'] or None
+        return records
+
+    def equity(self):
+        """보유 중 포지션의 평가 손익까지 포함한 봉별 복리 자산 곡선"""
+        trades = self.trade_list()
+        if self.open_position is not None:
+            trades.append(self.open_position)
+        return equity_curve(trades, self.bars)
+
+def run_backtest(name, candles, start=None, **params):
+    """전략 하나를 출력 없이 실행
+
+    Args:
+        name: 전략 이름 ('bb', 'ma', 'cross')
+        candles: 지표 워밍업 구간을 포함한 캔들 데이터프레임
+        start: 매매 시작 시각 (이전 봉은 지표 계산에만 사용)
+        params: 전략 속성 (take_profit, stop_loss 등)
+
+    Returns:
+        BacktestResult
+    """
+    strategy = STRATEGIES[name]()
+    df = calculate_indicators(strategy, candles[CANDLE_COLUMNS].copy())
+    if start is not None:
+        df = df[df.index >= start]
+    return run_prepared(name, df, **params)
+
+def run_prepared(name, df, **params):
+    """지표를 이미 계산한 매매 구간 데이터프레임으로 전략 실행
+
+    df 는 얕은 복사본으로 실행하므로 봉별 결과 컬럼이 추가되지 않는다 (캐시한 지표를 여러 번 재사용 가능).
+
+    Returns:
+        BacktestResult
+    """
+    strategy = STRATEGIES[name]()
+    for key, value in params.items():
+        setattr(strategy, key, value)
+    df = df.copy(deep=False)
+    output = strategy.execute_strategy(df)
+    # 볼린저 밴드는 봉별 데이터프레임, 이동평균은 (데이터프레임, 거래 내역), 크로스는 거래 내역 반환
+    if isinstance(output, tuple):
+        bars = output[0]
+    elif isinstance(output, pd.DataFrame):
+        bars = output
+    else:
+        bars = df
+    return BacktestResult.from_strategy(name, strategy, bars)
+
+def run_array_backtest(name, candles, indicators=None, **params):
+    """배열 인터페이스(indicator_arrays/run_arrays)로 전략을 캔들 복사 없이 실행
+
+    Args:
+        name: 전략 이름 ('bb', 'ma', 'cross')
+        candles: 매매 구간 캔들 데이터프레임 (수정하지 않음)
+        indicators: 미리 계산한 strategy.indicator_arrays() 결과 (스윕에서 한 번만 계산해 재사용)
+        params: 전략 속성 (take_profit, stop_loss 등)
+
+    Returns:
+        BacktestResult (bars 는 candles, 봉별 결과는 bar_arrays)
+    """
+    strategy = STRATEGIES[name]()
+    if not hasattr(strategy, 'run_arrays'):
+        raise ValueError(f"배열 인터페이스를 지원하지 않는 전략: {name}")
+    for key, value in params.items():
+        setattr(strategy, key, value)
+    close = readonly_view(candles['close'].to_numpy())
+    if indicators is None:
+        indicators = strategy.indicator_arrays(close)
+    bar_arrays, _ = strategy.run_arrays(close, candles.index, indicators)
+    return BacktestResult.from_strategy(name, strategy, candles, bar_arrays)
+
+def sweep_summary(result):
+    """파라미터 스윕 결과 한 줄 (take_profit/stop_loss/수익률/낙폭은 %, 최대 낙폭은 봉별 자산 곡선 기준)"""
+    stats = result.metrics
+    return {
+        'take_profit': result.params['take_profit'] * 100,
+        'stop_loss': result.params['stop_loss'] * 100,
+        'total_trades': len(result),
+        'winning_trades': int(stats['wins']),
+        'win_rate': stats['win_rate'],
+        'total_profit': stats['total_profit'],
+        'total_profit_ratio': result.trades['profit_ratio'].sum() * 100,
+        'max_drawdown': max_drawdown(result.equity().to_numpy()) * 100,
+        'profit_factor': stats['profit_factor'],
+        'sharpe': stats['sharpe'],
+    }
+
+def check_zero_copy(name='ma', n_bars=200_000, take_profit=0.03, stop_loss=0.02):
+    """배열 인터페이스 실행이 입력 크기의 복사본을 만들지 않는지 확인 (test_array_backtest.py 에서 실행)
+
+    거래가 적은 완만한 가격으로 run_arrays() 를 실행해, 새로 할당된 메모리에서 봉별 결과 배열을 빼면
+    float64 컬럼 하나(8 * n_bars bytes)의 절반보다 작아야 한다. 입력 배열은 실행 전후로 같아야 한다.
+
+    Returns:
+        dict: 최대 할당 bytes, 결과 배열 bytes, 거래 수
+    """
+    steps = np.arange(n_bars)
+    close = readonly_view(np.round(1e8 + 1e6 * np.sin(2 * np.pi * steps / 20_000)))
+    times = pd.date_range('2024-01-01', periods=n_bars, freq='min')
+    strategy = STRATEGIES[name]()
+    strategy.take_profit = take_profit
+    strategy.stop_loss = stop_loss
+    indicators = {key: readonly_view(values)
+                  for key, values in strategy.indicator_arrays(close).items()}
+    before = close.copy()
+    (bar_arrays, trades), peak = allocation_peak(strategy.run_arrays, close, times, indicators)
+    output = sum(values.nbytes for values in bar_arrays.values())
+    if not np.array_equal(before, close):
+        raise AssertionError(f"{name}: 입력 배열이 변경되었습니다.")
+    if peak - output >= 8 * n_bars // 2:
+        raise AssertionError(f"{name}: 입력 크기의 추가 할당이 있습니다: {peak - output:,} bytes")
+    return {'peak': peak, 'output': output, 'trades': len(closed_trades(strategy))}
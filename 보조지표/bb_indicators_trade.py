@@ -1,9 +1,17 @@
-import pyupbit
 import pandas as pd
 import numpy as np
+import copy
 import os
-from ta.volatility import BollingerBands
+from array_views import column_views
+from compact_dtypes import POSITION_CODES, empty_bar_arrays
+from instrumentation import count_loop, timed
+from indicators import bollinger_bands
+from metrics import trade_metrics
 from datetime import datetime
+from data_planner import plan_candles, load_candles
+from trade_report import display_options, format_trade_stats, format_trade_table
+from trade_stats import TradeStats
+from trade_store import TradeStore
 
 class BollingerBandStrategy:
     def __init__(self):
@@ -13,45 +21,102 @@ class BollingerBandStrategy:
         self.take_profit = 0.02
         self.stop_loss = 0.01
         self.trade_history = []
+        self.stats = TradeStats()  # 청산될 때마다 갱신되는 거래 통계
+        self.last_position = None  # 직전 포지션
+        self.middle_touched = True  # 중간선 터치 여부
         
+    def get_state(self):
+        """증분 백테스트를 위한 전략 상태 스냅샷"""
+        return {
+            'position': self.position,
+            'entry_price': self.entry_price,
+            'entry_date': self.entry_date,
+            'take_profit': self.take_profit,
+            'stop_loss': self.stop_loss,
+            'trade_history': [dict(trade) for trade in self.trade_history],
+            'stats': copy.deepcopy(self.stats),
+            'last_position': self.last_position,
+            'middle_touched': self.middle_touched,
+        }
+    
+    def set_state(self, state):
+        """get_state() 로 저장한 상태 복원"""
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.trade_history = [dict(trade) for trade in state['trade_history']]
+    
+    def required_lookback(self, window=30):
+        """지표 워밍업에 필요한 과거 봉 개수 (볼린저 밴드 window 봉 중 현재 봉 제외)"""
+        return window - 1
+    
+    @timed('indicators')
+    def indicator_arrays(self, close, window=30, num_std=3):
+        """종가 배열로 볼린저 밴드 배열 계산 (입력 배열은 수정하지 않음)
+
+        take_profit/stop_loss 와 관계없으므로 파라미터 스윕에서는 한 번만 계산해 재사용할 수 있다.
+        """
+        upper, middle, lower, width = bollinger_bands(close, window=window, num_std=num_std)
+        return {
+            'bb_upper': upper,
+            'bb_middle': middle,
+            'bb_lower': lower,
+            'bb_width': width,
+        }
+    
     def calculate_bollinger_bands(self, df, window=30, num_std=3):
-        bb = BollingerBands(close=df['close'], window=window, window_dev=num_std)
-        df['bb_upper'] = bb.bollinger_hband()
-        df['bb_middle'] = bb.bollinger_mavg()
-        df['bb_lower'] = bb.bollinger_lband()
-        df['bb_width'] = bb.bollinger_wband()
+        """볼린저 밴드 컬럼을 df 에 추가"""
+        for name, values in self.indicator_arrays(df['close'].to_numpy(), window, num_std).items():
+            df[name] = values
         return df
     
-    def execute_strategy(self, df):
-        signals = []
-        positions = []
-        entry_prices = []
-        profits = []
-        last_position = None  # 직전 포지션 저장
-        middle_touched = True  # 중간선 터치 여부 (초기값은 True로 설정)
+    @timed('execute_strategy')
+    def run_arrays(self, close, times, indicators, resume=False):
+        """배열 인터페이스로 매매 전략 실행 (입력 배열은 읽기만 하고 복사하지 않음)
+
+        Args:
+            close: 종가 배열 (array_views.readonly_view 등 읽기 전용 뷰)
+            times: 봉 시각 index (거래 내역의 진입/종료 시각)
+            indicators: indicator_arrays() 결과 (bb_upper, bb_middle, bb_lower 사용)
+            resume: True 이면 직전 실행의 상태에서 이어서 실행
+
+        Returns:
+            tuple: (봉별 결과 배열 dict - signal/position/entry_price/profit, 거래 내역)
+        """
+        bb_upper = indicators['bb_upper']
+        bb_middle = indicators['bb_middle']
+        bb_lower = indicators['bb_lower']
+        bars = empty_bar_arrays(len(close))
+        signals, positions = bars['signal'], bars['position']
+        entry_prices, profits = bars['entry_price'], bars['profit']
+        if not resume:
+            self.last_position = None
+            self.middle_touched = True  # 초기값은 True로 설정
+        last_position = self.last_position  # 직전 포지션 저장
+        closed_before, was_open = self.stats.count, self.position is not None
+        middle_touched = self.middle_touched  # 중간선 터치 여부
         
-        for i in range(len(df)):
+        for i in range(len(close)):
             signal = 0
-            current_price = df['close'].iloc[i]
-            current_date = df.index[i]
+            current_price = close[i]
+            current_date = times[i]
             current_profit = 0
             
             # 중간선 터치 여부 확인
             if last_position is not None:
-                if (last_position == 'long' and current_price <= df['bb_middle'].iloc[i]) or \
-                   (last_position == 'short' and current_price >= df['bb_middle'].iloc[i]):
+                if (last_position == 'long' and current_price <= bb_middle[i]) or \
+                   (last_position == 'short' and current_price >= bb_middle[i]):
                     middle_touched = True
             
             if self.position is None:
                 # 새로운 포지션 진입은 중간선을 터치한 후에만 가능
                 if middle_touched:
-                    if current_price < df['bb_lower'].iloc[i]:
+                    if current_price < bb_lower[i]:
                         signal = 1  # 롱 진입
                         self.position = 'long'
                         self.entry_price = current_price
                         self.entry_date = current_date
                         middle_touched = False  # 포지션 진입 후 중간선 터치 초기화
-                    elif current_price > df['bb_upper'].iloc[i]:
+                    elif current_price > bb_upper[i]:
                         signal = -1  # 숏 진입
                         self.position = 'short'
                         self.entry_price = current_price
@@ -64,7 +129,7 @@ class BollingerBandStrategy:
                 
                 # 수익/손실 조건 또는 상단 밴드 터치로 인한 종료
                 if profit_ratio >= self.take_profit or profit_ratio <= -self.stop_loss or \
-                   current_price >= df['bb_upper'].iloc[i]:
+                   current_price >= bb_upper[i]:
                     signal = -1  # 롱 종료
                     self.trade_history.append({
                         'entry_date': self.entry_date,
@@ -78,6 +143,7 @@ class BollingerBandStrategy:
                                      'stop_loss' if profit_ratio <= -self.stop_loss else 
                                      'bb_touch'
                     })
+                    self.stats.add(self.trade_history[-1])
                     last_position = self.position  # 직전 포지션 저장
                     self.position = None
                     self.entry_price = None
@@ -89,7 +155,7 @@ class BollingerBandStrategy:
                 
                 # 수익/손실 조건 또는 하단 밴드 터치로 인한 종료
                 if profit_ratio >= self.take_profit or profit_ratio <= -self.stop_loss or \
-                   current_price <= df['bb_lower'].iloc[i]:
+                   current_price <= bb_lower[i]:
                     signal = 1  # 숏 종료
                     self.trade_history.append({
                         'entry_date': self.entry_date,
@@ -103,47 +169,43 @@ class BollingerBandStrategy:
                                      'stop_loss' if profit_ratio <= -self.stop_loss else 
                                      'bb_touch'
                     })
+                    self.stats.add(self.trade_history[-1])
                     last_position = self.position  # 직전 포지션 저장
                     self.position = None
                     self.entry_price = None
                     self.entry_date = None
             
-            signals.append(signal)
-            positions.append(self.position)
-            entry_prices.append(self.entry_price)
-            profits.append(current_profit)
+            signals[i] = signal
+            positions[i] = POSITION_CODES[self.position]
+            if self.entry_price is not None:
+                entry_prices[i] = self.entry_price
+            profits[i] = current_profit
             
-        df['signal'] = signals
-        df['position'] = positions
-        df['entry_price'] = entry_prices
-        df['profit'] = profits
+        self.last_position = last_position
+        self.middle_touched = middle_touched
+        count_loop(self, len(close), closed_before, was_open)
+        return bars, self.trade_history
+
+    def execute_strategy(self, df, resume=False):
+        """매매 전략 실행 (resume=True 이면 직전 실행의 상태에서 이어서 실행)
+
+        calculate_bollinger_bands() 결과의 컬럼 뷰로 run_arrays() 를 실행하고 봉별 결과 컬럼을 추가한다.
+        """
+        views = column_views(df, ['close', 'bb_upper', 'bb_middle', 'bb_lower'])
+        bars, _ = self.run_arrays(views['close'], df.index, views, resume=resume)
+        # 봉별 결과는 int8 신호/포지션 코드, NaN 진입가격으로 저장 (compact_dtypes)
+        for name, values in bars.items():
+            df[name] = values
         
         return df
 
-def print_trade_history(trade_history, start_date):
-    duration = start_date
-    print("\n거래 내역:")
-    print("-" * 100)
-    print(f"{'포지션':<8} {'진입일자':<22} {'종료일자':<22} {'진입가격':<15} {'종료가격':<15} {'수익률':<8} {'수익금액'}")
-    print("-" * 100)
-    
-    total_profit = 0
-    for trade in trade_history:
-        profit_str = f"{trade['profit_ratio']*100:+.2f}%"
-        print(f"{trade['position']:<8} "
-              f"{trade['entry_date'].strftime('%Y-%m-%d %H:%M:%S'):<22} "
-              f"{trade['exit_date'].strftime('%Y-%m-%d %H:%M:%S'):<22} "
-              f"{trade['entry_price']:,.0f} KRW"
-              f"{trade['exit_price']:>15,.0f} KRW"
-              f"{profit_str:>8} "
-              f"{trade['profit']:>12,.0f} KRW")
-        total_profit += trade['profit']
-    
-    print("-" * 100)
-    print(f"총 수익금액: {total_profit:,.0f} KRW")
-    
-    # 데이터프레임 생성 및 출력
-    df_trades = pd.DataFrame(trade_history)
+TRADE_COLUMNS = ['entry_date', 'exit_date', 'position', 'entry_price', 'exit_price',
+                 'profit_ratio', 'profit', 'exit_reason']
+
+@timed('trade_table')
+def trades_to_dataframe(trade_history):
+    """거래 내역을 한글 컬럼명/퍼센트 수익률의 데이터프레임으로 변환 (월별 CSV 형식)"""
+    df_trades = pd.DataFrame(trade_history, columns=TRADE_COLUMNS)
     
     # 컬럼명 한글로 변경
     df_trades = df_trades.rename(columns={
@@ -160,24 +222,24 @@ def print_trade_history(trade_history, start_date):
     # 수익률을 퍼센트로 변환
     df_trades['수익률'] = df_trades['수익률'] * 100
     
-    # 데이터프레임 형식 지정
-    pd.set_option('display.float_format', lambda x: f'{x:,.2f}' if isinstance(x, (float, int)) else str(x))
-    
-    # 거래 통계 계산
-    total_trades = len(df_trades)
-    winning_trades = len(df_trades[df_trades['수익률'] > 0])
-    losing_trades = len(df_trades[df_trades['수익률'] <= 0])
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    return df_trades
+
+@timed('report')
+def print_trade_history(trade_history, start_date, stats=None):
+    duration = start_date
+    print("\n거래 내역:")
+    print("-" * 100)
+    print(format_trade_table(trade_history))
+    total_profit = sum(trade['profit'] for trade in trade_history)
+    print("-" * 100)
+    print(f"총 수익금액: {total_profit:,.0f} KRW")
     
-    avg_profit = df_trades[df_trades['수익률'] > 0]['수익률'].mean() if winning_trades > 0 else 0
-    avg_loss = df_trades[df_trades['수익률'] <= 0]['수익률'].mean() if losing_trades > 0 else 0
+    # 데이터프레임 생성 및 출력
+    df_trades = trades_to_dataframe(trade_history)
     
-    # 거래 통계 출력
-    print("\n=== 거래 통계 ===")
-    print(f"총 거래 횟수: {total_trades}")
-    print(f"승률: {win_rate:.2f}%")
-    print(f"평균 수익: {avg_profit:.2f}%")
-    print(f"평균 손실: {avg_loss:.2f}%")
+    # 거래 통계 (stats: 실행 중 누적된 TradeStats, 없으면 거래 내역으로 계산)
+    stats = stats.totals() if stats is not None else trade_metrics(trade_history)
+    print("\n" + format_trade_stats(stats))
     
     #CSV 파일로 저장
     # timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -188,29 +250,6 @@ def print_trade_history(trade_history, start_date):
     
     return df_trades, total_profit
 
-def get_trade_summary(trade_history):
-    """거래 내역 요약 통계를 반환하는 함수"""
-    if not trade_history:
-        return pd.DataFrame()
-        
-    df_trades = pd.DataFrame(trade_history)
-    
-    # 포지션별 통계
-    position_stats = df_trades.groupby('position').agg({
-        'profit_ratio': ['count', 'mean', 'std', 'min', 'max'],
-        'profit': 'sum'
-    }).round(4)
-    
-    # 컬럼명 변경
-    position_stats.columns = ['거래횟수', '평균수익률', '표준편차', '최소수익률', '최대수익률', '총수익금']
-    position_stats.index.name = '포지션'
-    
-    # 수익률 계산을 퍼센트로 변환
-    for col in ['평균수익률', '최소수익률', '최대수익률']:
-        position_stats[col] = position_stats[col] * 100
-    
-    return position_stats
-
 def backtest_strategy(df):
     total_trades = len(df[df['signal'] != 0])
     profitable_trades = len(df[df['profit'] >= 0.02])
@@ -234,20 +273,14 @@ def backtest_strategy(df):
 #     else:
 #         df.to_csv(filename + '.csv', index=False, mode='a', header=False, encoding='utf-8-sig')
 
-def main():
-
-    # 시작 날짜 (YYYYMMDD 형식)
-    start_date = "20250101"
-    end_date = "20250131"
-    # 시작 날짜의 다음 날짜 계산
-    next_day = pd.to_datetime(end_date) + pd.Timedelta(days=1)
-    next_day_str = next_day.strftime("%Y%m%d")
-    # 비트코인 데이터 가져오기
-    df = pyupbit.get_ohlcv("KRW-BTC", count=9000, to=next_day_str, interval="minute5")
-    #df = pyupbit.get_ohlcv("KRW-BTC", count=8640, interval="minute5")       # 5분봉 데이터 한달치
+def main(start_date="20250101", end_date="20250131"):
+    # 시작/종료 날짜 (YYYYMMDD 형식)
+    strategy = BollingerBandStrategy()
+    # 비트코인 데이터 가져오기 (매매 구간 + 볼린저 밴드 워밍업만큼)
+    plan = plan_candles(start_date, end_date, strategy, interval="minute5")
+    df = load_candles(plan, "KRW-BTC")
     
     # 전략 실행
-    strategy = BollingerBandStrategy()
     df = strategy.calculate_bollinger_bands(df)
     # 시작 날짜 이후 데이터만 사용하여 매매 진행
     df = df[df.index >= start_date+'0900']
@@ -258,11 +291,21 @@ def main():
     backtest_strategy(result_df)
     
     # 거래 내역 출력
-    df_trades, total_profit = print_trade_history(strategy.trade_history, start_date)
+    df_trades, total_profit = print_trade_history(strategy.trade_history, start_date,
+                                                 stats=strategy.stats)
+    # 거래 내역 저장소에 저장
+    with TradeStore() as store:
+        run_id = store.write_run(strategy.trade_history, 'bb', interval=plan.interval,
+                                 params={'take_profit': strategy.take_profit,
+                                         'stop_loss': strategy.stop_loss})
+    print(f"\n거래 내역이 저장소에 저장되었습니다. (run_id: {run_id})")
     # 포지션별 통계 확인
-    position_stats = get_trade_summary(strategy.trade_history)
-    print("\n=== 포지션별 통계 ===")
-    print(position_stats)
+    position_stats = strategy.stats.position_summary()
+    with display_options():
+        print("\n=== 포지션별 통계 ===")
+        print(position_stats)
+        print("\n=== 종료이유별 통계 ===")
+        print(strategy.stats.reason_summary())
     #to_csv(strategy.trade_history, start_date + end_date + "bb_indicators")
     
     # 현재 상태 출력
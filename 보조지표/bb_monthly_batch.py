@@ -0,0 +1,75 @@
+# 볼린저 밴드 전략 기간별(월별) 일괄 백테스트
+# 캔들은 한 번만 받아오고 지표도 한 번만 계산한 뒤, 기간별 매매는 병렬로 실행해
+# 모든 기간의 거래 내역을 거래 내역 저장소에 한꺼번에 저장한다.
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from bb_indicators_trade import BollingerBandStrategy, trades_to_dataframe
+from data_planner import plan_candles, load_candles, trading_window
+from trade_store import MONTHLY_BB_PREFIX, MONTHLY_RUN, TradeStore
+
+def split_periods(start_date, end_date, freq='MS'):
+    """[start_date, end_date] 구간을 freq 단위(MS: 월, W-MON: 주, D: 일) 기간 목록으로 분할
+
+    각 기간은 (시작일, 종료일) YYYYMMDD 문자열 튜플이며 종료일을 포함한다.
+    """
+    start = pd.Timestamp(start_date)
+    stop = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    bounds = [start] + [b for b in pd.date_range(start, stop, freq=freq) if start < b < stop] + [stop]
+    return [(b0.strftime("%Y%m%d"), (b1 - pd.Timedelta(days=1)).strftime("%Y%m%d"))
+            for b0, b1 in zip(bounds[:-1], bounds[1:])]
+
+def _run_period(period_start, df):
+    """기간 하나의 매매 실행 (프로세스 풀 작업 단위)"""
+    strategy = BollingerBandStrategy()
+    strategy.execute_strategy(df)
+    return period_start, strategy.trade_history
+
+def run_batch(start_date, end_date, freq='MS', ticker="KRW-BTC", interval="minute5",
+              max_workers=None):
+    """기간별 백테스트를 병렬로 실행하고 전체 거래 내역을 저장소에 하나의 실행(run)으로 저장
+
+    run_id 는 bb_monthly_{시작일}_{종료일} 이며 같은 구간을 다시 실행하면 덮어쓴다.
+
+    Returns:
+        dict: {기간 시작일: 거래 내역 데이터프레임}
+    """
+    periods = split_periods(start_date, end_date, freq)
+
+    # 캔들 로드와 지표 계산은 전체 구간(+ 워밍업)에 대해 한 번만 수행
+    strategy = BollingerBandStrategy()
+    df = load_candles(plan_candles(start_date, end_date, strategy, interval=interval), ticker)
+    df = strategy.calculate_bollinger_bands(df)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for period_start, period_end in periods:
+            window_start, window_end = trading_window(period_start, period_end)
+            period_df = df[(df.index >= window_start) & (df.index < window_end)]
+            futures.append(executor.submit(_run_period, period_start, period_df))
+        results = dict(future.result() for future in futures)
+
+    # 모든 기간의 거래 내역을 한꺼번에 저장
+    trade_history = [trade for period_start, _ in periods for trade in results[period_start]]
+    with TradeStore() as store:
+        run_id = store.write_run(trade_history, 'bb', interval=interval, symbol=ticker,
+                                 params={'take_profit': strategy.take_profit,
+                                         'stop_loss': strategy.stop_loss, 'freq': freq},
+                                 run_id=f'{MONTHLY_BB_PREFIX}{start_date}_{end_date}', kind=MONTHLY_RUN)
+    print(f"{len(periods)}개 기간의 거래 내역을 저장소에 저장했습니다. (run_id: {run_id})")
+
+    trade_frames = {period_start: trades_to_dataframe(results[period_start])
+                    for period_start, _ in periods}
+
+    return trade_frames
+
+def main(start_date="20240101", end_date="20241231", freq='MS'):
+    # 2024년 월별 거래 내역 생성 (2024_bit_price.py, monthly_comparison.py 등에서 조회)
+    trade_frames = run_batch(start_date, end_date, freq=freq)
+
+    for period_start, df_trades in trade_frames.items():
+        print(f"{period_start}: 거래 {len(df_trades)}회, 수익률 합계 {df_trades['수익률'].sum():.2f}%")
+
+if __name__ == "__main__":
+    main()
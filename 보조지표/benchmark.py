@@ -0,0 +1,203 @@
+# 전략 엔진 벤치마크 (봉 수별 처리 속도/메모리)
+# 가상 시장(synthetic_market)의 10k ~ 10M 봉 1분봉 캔들에서 전략별 지표 계산과 매매 루프를 따로 측정한다.
+# 각 측정은 별도 프로세스에서 실행해 최대 메모리(RSS)와 봉당 메모리가 서로 섞이지 않게 하고,
+# 결과는 JSON 으로 저장해 이전 실행과 비교한다.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from compact_dtypes import compact_candles
+from instrumentation import peak_rss, reset_peak_rss
+from synthetic_market import EPOCH, generate_ohlcv
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+ENGINES = ['bb', 'ma', 'cross']
+
+# 측정 하나의 예상 시간이 이 값(초)을 넘으면 건너뜀
+TIME_BUDGET = 300.0
+
+def benchmark_candles(n_bars, seed=0):
+    """벤치마크용 1분봉 캔들 (synthetic_market 가상 시장의 처음 n_bars 봉, 시드가 같으면 같은 데이터)"""
+    end = EPOCH + pd.Timedelta(minutes=n_bars)
+    return compact_candles(generate_ohlcv("KRW-BTC", "minute1", n_bars, end=end, seed=seed))
+
+def run_case(engine, n_bars, seed=0):
+    """현재 프로세스에서 전략 하나를 n_bars 봉으로 실행하고 측정값 반환"""
+    from incremental_backtest import STRATEGIES, calculate_indicators, closed_trades
+
+    candles = benchmark_candles(n_bars, seed)
+    strategy = STRATEGIES[engine]()
+    # 캔들 생성 중 임시 배열의 최대 메모리가 섞이지 않도록 최대 RSS 를 초기화한 뒤의 증가량만 측정
+    # (초기화할 수 없는 플랫폼은 봉당 메모리를 기록하지 않음)
+    baseline_rss = peak_rss() if reset_peak_rss() else None
+
+    start = time.perf_counter()
+    df = calculate_indicators(strategy, candles)
+    indicator_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    strategy.execute_strategy(df)
+    loop_seconds = time.perf_counter() - start
+
+    trades = len(closed_trades(strategy))
+    total = indicator_seconds + loop_seconds
+    rss = peak_rss()
+    return {
+        'engine': engine,
+        'bars': n_bars,
+        'trades': trades,
+        'indicator_seconds': indicator_seconds,
+        'loop_seconds': loop_seconds,
+        'total_seconds': total,
+        'bars_per_sec': n_bars / total,
+        'trades_per_sec': trades / total,
+        'peak_rss': rss,
+        'baseline_rss': baseline_rss,
+        # 캔들 생성 이후 늘어난 최대 RSS 를 봉 수로 나눈 값 (지표 + 루프 결과, 캔들 자체는 제외)
+        'memory_per_bar': (rss - baseline_rss) / n_bars if baseline_rss is not None else None,
+    }
+
+def run_case_subprocess(engine, n_bars, seed=0, timeout=None):
+    """별도 프로세스에서 run_case 실행 (최대 메모리를 측정별로 분리)"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--case', engine, str(n_bars), '--seed', str(seed)],
+        capture_output=True, text=True, timeout=timeout, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def run_suite(engines=ENGINES, sizes=SIZES, seed=0, time_budget=TIME_BUDGET, progress=True):
+    """전략 x 봉 수 전체 측정
+
+    작은 봉 수부터 실행하며 직전 측정의 처리 속도로 예상한 시간이 time_budget 을 넘으면
+    그 전략의 나머지 봉 수는 건너뛴다 (skipped 로 기록). 측정 프로세스가 비정상 종료하면
+    종료 코드와 stderr 마지막 줄을 failed 로 기록하고 다음 측정을 계속한다.
+
+    Returns:
+        list: 측정 결과 dict 목록
+    """
+    results = []
+    for engine in engines:
+        rate = None
+        for n_bars in sorted(sizes):
+            expected = n_bars / rate if rate else None
+            if expected is not None and expected > time_budget:
+                results.append({'engine': engine, 'bars': n_bars, 'skipped': True,
+                                'expected_seconds': expected})
+                if progress:
+                    print(f"{engine} {n_bars:>10,}봉: 건너뜀 (예상 {expected:,.0f}초 > {time_budget:,.0f}초)")
+                continue
+            try:
+                result = run_case_subprocess(engine, n_bars, seed, timeout=time_budget * 2)
+            except subprocess.TimeoutExpired:
+                results.append({'engine': engine, 'bars': n_bars, 'skipped': True,
+                                'expected_seconds': time_budget * 2})
+                rate = n_bars / (time_budget * 2)
+                continue
+            except subprocess.CalledProcessError as e:
+                # 측정 프로세스가 비정상 종료 (메모리 부족으로 강제 종료 등): 실패로 기록하고 나머지 측정 계속
+                error = '\n'.join((e.stderr or '').strip().splitlines()[-5:])
+                results.append({'engine': engine, 'bars': n_bars, 'failed': True,
+                                'returncode': e.returncode, 'error': error})
+                if progress:
+                    print(f"{engine} {n_bars:>10,}봉: 실패 (종료 코드 {e.returncode}) "
+                          f"{error.splitlines()[-1] if error else ''}")
+                continue
+            rate = result['bars_per_sec']
+            results.append(result)
+            if progress:
+                rss = f"{result['peak_rss'] / 1024 ** 2:,.0f}MB" if result['peak_rss'] else "-"
+                if result['memory_per_bar'] is not None:
+                    rss += f" ({result['memory_per_bar']:,.0f} B/봉)"
+                print(f"{engine} {n_bars:>10,}봉: {result['bars_per_sec']:>12,.0f} 봉/초, "
+                      f"거래 {result['trades']:,}회, 지표 {result['indicator_seconds']:.2f}초 / "
+                      f"루프 {result['loop_seconds']:.2f}초, 최대 메모리 {rss}")
+    return results
+
+def environment():
+    """측정 환경 정보 (결과 비교 시 참고)"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+def save_results(results, path=None, seed=0):
+    """측정 결과를 JSON 파일로 저장하고 경로 반환"""
+    if path is None:
+        path = f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    payload = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'seed': seed,
+        'environment': environment(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return path
+
+def load_results(path):
+    """저장한 측정 결과를 (engine, bars) index 데이터프레임으로 읽기 (건너뛴/실패한 측정 제외)"""
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)['results']
+    df = pd.DataFrame([result for result in results
+                       if not result.get('skipped') and not result.get('failed')])
+    return df.set_index(['engine', 'bars']).sort_index()
+
+def compare_results(old_path, new_path):
+    """두 측정 결과의 처리 속도/메모리 비교 (new / old 비율, 1 보다 크면 속도는 빨라지고 메모리는 늘어남)"""
+    old = load_results(old_path)
+    new = load_results(new_path)
+    common = old.index.intersection(new.index)
+    table = pd.DataFrame({
+        'old_bars_per_sec': old.loc[common, 'bars_per_sec'],
+        'new_bars_per_sec': new.loc[common, 'bars_per_sec'],
+    })
+    table['speedup'] = table['new_bars_per_sec'] / table['old_bars_per_sec']
+    table['loop_speedup'] = old.loc[common, 'loop_seconds'] / new.loc[common, 'loop_seconds']
+    table['indicator_speedup'] = (old.loc[common, 'indicator_seconds']
+                                  / new.loc[common, 'indicator_seconds'])
+    table['rss_ratio'] = new.loc[common, 'peak_rss'] / old.loc[common, 'peak_rss']
+    if 'memory_per_bar' in old and 'memory_per_bar' in new:
+        table['old_bytes_per_bar'] = old.loc[common, 'memory_per_bar']
+        table['new_bytes_per_bar'] = new.loc[common, 'memory_per_bar']
+        table['memory_per_bar_ratio'] = table['new_bytes_per_bar'] / table['old_bytes_per_bar']
+    return table
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전략 엔진 벤치마크")
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--budget', type=float, default=TIME_BUDGET, help="측정 하나의 최대 예상 시간(초)")
+    parser.add_argument('--output', help="결과 JSON 경로 (기본: benchmark_<시각>.json)")
+    parser.add_argument('--compare', metavar='OLD_JSON', help="저장 후 이전 결과와 비교")
+    parser.add_argument('--case', nargs=2, metavar=('ENGINE', 'BARS'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        # run_case_subprocess 가 실행하는 측정 하나
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.seed)))
+        return
+
+    results = run_suite(args.engines, args.sizes, args.seed, args.budget)
+    path = save_results(results, args.output, args.seed)
+    print(f"\n결과가 {path} 에 저장되었습니다.")
+    if args.compare:
+        print("\n=== 이전 결과와 비교 ===")
+        with pd.option_context('display.width', None):
+            print(compare_results(args.compare, path).round(3))
+
+if __name__ == "__main__":
+    main()
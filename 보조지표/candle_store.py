@@ -0,0 +1,190 @@
+# 캔들/지표 저장소 (SQLite)
+# 여러 종목의 수년치 분봉을 메모리에 올리지 않고 (종목, 간격, 시각) 순으로 저장하고,
+# iter_candles() 로 고정 크기 묶음씩 읽는다. 지표 값은 features 테이블에 (이름, 시각)별로 저장한다.
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+from compact_dtypes import compact_candles
+from data_planner import get_ohlcv
+from trade_store import TIME_FORMAT
+
+DEFAULT_PATH = os.environ.get(
+    'CANDLE_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'candle_store.db')
+)
+
+CANDLE_FIELDS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    time TEXT NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (symbol, interval, time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS features (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    name TEXT NOT NULL,
+    time TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (symbol, interval, name, time)
+) WITHOUT ROWID;
+"""
+
+def _format_times(index):
+    return pd.DatetimeIndex(index).strftime(TIME_FORMAT)
+
+class CandleStore:
+    """캔들/지표 저장소"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_PATH
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_candles(self, df, symbol, interval):
+        """캔들 데이터프레임 저장 (같은 시각이 있으면 덮어씀)
+
+        Returns:
+            int: 저장한 봉 개수
+        """
+        rows = zip([symbol] * len(df), [interval] * len(df), _format_times(df.index),
+                   *(df[field].to_numpy(dtype=np.float64).tolist() for field in CANDLE_FIELDS))
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO candles VALUES ({", ".join("?" * (3 + len(CANDLE_FIELDS)))})',
+                rows
+            )
+        return len(df)
+
+    def candle_range(self, symbol, interval):
+        """저장된 첫/마지막 봉 시각과 봉 개수 (없으면 (None, None, 0))"""
+        first, last, count = self.conn.execute(
+            'SELECT MIN(time), MAX(time), COUNT(*) FROM candles WHERE symbol = ? AND interval = ?',
+            (symbol, interval)
+        ).fetchone()
+        if count == 0:
+            return None, None, 0
+        return pd.Timestamp(first), pd.Timestamp(last), count
+
+    def iter_candles(self, symbol, interval, start=None, end=None, chunk_rows=100_000):
+        """start 이상 end 미만의 캔들을 시각 순으로 chunk_rows 개씩 읽는 generator
+
+        마지막으로 읽은 시각 다음부터 다시 조회하므로(keyset) 한 번에 chunk_rows 개만 메모리에 있다.
+        """
+        after = None
+        while True:
+            conditions = ['symbol = ?', 'interval = ?']
+            values = [symbol, interval]
+            if after is not None:
+                conditions.append('time > ?')
+                values.append(after)
+            elif start is not None:
+                conditions.append('time >= ?')
+                values.append(pd.Timestamp(start).strftime(TIME_FORMAT))
+            if end is not None:
+                conditions.append('time < ?')
+                values.append(pd.Timestamp(end).strftime(TIME_FORMAT))
+            df = pd.read_sql_query(
+                f'SELECT time, {", ".join(CANDLE_FIELDS)} FROM candles '
+                f'WHERE {" AND ".join(conditions)} ORDER BY time LIMIT ?',
+                self.conn, params=values + [chunk_rows], index_col='time'
+            )
+            if df.empty:
+                return
+            after = df.index[-1]
+            df.index = pd.to_datetime(df.index)
+            yield compact_candles(df)
+            if len(df) < chunk_rows:
+                return
+
+    def read_candles(self, symbol, interval, start=None, end=None):
+        """start 이상 end 미만의 캔들을 한 번에 조회"""
+        chunks = list(self.iter_candles(symbol, interval, start, end))
+        if not chunks:
+            return pd.DataFrame(columns=CANDLE_FIELDS, index=pd.DatetimeIndex([]))
+        return pd.concat(chunks)
+
+    def write_features(self, df, symbol, interval):
+        """지표 데이터프레임(컬럼 = 지표 이름) 저장 (NaN 값은 저장하지 않음)
+
+        Returns:
+            int: 저장한 값 개수
+        """
+        times = _format_times(df.index)
+        written = 0
+        with self.conn:
+            for name in df.columns:
+                values = df[name].to_numpy(dtype=np.float64)
+                valid = ~np.isnan(values)
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?)',
+                    zip([symbol] * int(valid.sum()), [interval] * int(valid.sum()),
+                        [name] * int(valid.sum()), times[valid], values[valid].tolist())
+                )
+                written += int(valid.sum())
+        return written
+
+    def delete_features(self, symbol, interval, names=None):
+        """저장된 지표 삭제 (names 가 없으면 종목/간격의 모든 지표)"""
+        query = 'DELETE FROM features WHERE symbol = ? AND interval = ?'
+        values = [symbol, interval]
+        if names is not None:
+            query += f' AND name IN ({", ".join("?" * len(names))})'
+            values.extend(names)
+        with self.conn:
+            self.conn.execute(query, values)
+
+    def read_features(self, symbol, interval, names=None, start=None, end=None):
+        """start 이상 end 미만의 지표를 (시각 x 지표 이름) 데이터프레임으로 조회 (저장되지 않은 값은 NaN)"""
+        conditions = ['symbol = ?', 'interval = ?']
+        values = [symbol, interval]
+        if names is not None:
+            conditions.append(f'name IN ({", ".join("?" * len(names))})')
+            values.extend(names)
+        if start is not None:
+            conditions.append('time >= ?')
+            values.append(pd.Timestamp(start).strftime(TIME_FORMAT))
+        if end is not None:
+            conditions.append('time < ?')
+            values.append(pd.Timestamp(end).strftime(TIME_FORMAT))
+        df = pd.read_sql_query(
+            f'SELECT name, time, value FROM features WHERE {" AND ".join(conditions)}',
+            self.conn, params=values
+        )
+        table = df.pivot(index='time', columns='name', values='value')
+        table.index = pd.to_datetime(table.index)
+        table.columns.name = None
+        if names is not None:
+            table = table.reindex(columns=list(names))
+        return table.sort_index()
+
+def download_candles(store, symbol="KRW-BTC", interval="minute1", count=200, to=None):
+    """현재 데이터 소스(data_planner.get_ohlcv)에서 캔들을 받아 저장소에 저장
+
+    Returns:
+        int: 저장한 봉 개수
+    """
+    df = get_ohlcv(symbol, count=count, interval=interval, to=to)
+    if df is None or df.empty:
+        return 0
+    return store.write_candles(df, symbol, interval)
@@ -0,0 +1,108 @@
+# 저장소 캔들의 묶음 단위(out-of-core) 지표 계산
+# 캔들 저장소에서 chunk_rows 개씩 읽어 SMA/볼린저 밴드/RSI 를 계산하고 지표 저장소에 기록한다.
+# 이동평균/표준편차는 직전 묶음의 마지막 (최대 window - 1)개 종가(halo)를 앞에 붙여 계산하고,
+# RSI 는 직전 묶음의 지수이동평균 상태를 넘겨 이어서 계산하므로 전체를 한 번에 계산한 값과 완전히 같다.
+# 메모리는 종목/기간 길이와 관계없이 묶음 크기에만 비례한다.
+import numpy as np
+import pandas as pd
+
+from candle_store import CandleStore, download_candles
+from indicators import bollinger_bands, rsi, sma
+
+# (지표, window[, 표준편차 배수])
+FEATURE_SPECS = [('sma', 20), ('sma', 60), ('bb', 30, 3), ('rsi', 14)]
+
+def feature_names(spec):
+    """지표 설정 하나가 만드는 지표 이름 목록"""
+    kind, window = spec[0], spec[1]
+    if kind == 'sma':
+        return [f'sma_{window}']
+    if kind == 'bb':
+        suffix = f'{window}_{spec[2]}'
+        return [f'bb_upper_{suffix}', f'bb_middle_{suffix}', f'bb_lower_{suffix}',
+                f'bb_width_{suffix}']
+    if kind == 'rsi':
+        return [f'rsi_{window}']
+    raise ValueError(f"지원하지 않는 지표: {kind}")
+
+def halo_size(specs):
+    """이동평균 계산에 필요한 직전 묶음의 종가 개수 (가장 긴 window - 1)"""
+    return max((spec[1] - 1 for spec in specs if spec[0] in ('sma', 'bb')), default=0)
+
+def compute_features(close, index, specs=FEATURE_SPECS, halo=None, rsi_states=None):
+    """종가 묶음 하나의 지표 계산
+
+    Args:
+        close: 묶음의 종가 배열
+        index: 묶음의 시각 index
+        halo: 직전 묶음의 마지막 종가들 (없으면 데이터의 처음부터 계산)
+        rsi_states: RSI 이름 -> 직전 묶음 마지막 봉까지의 상태 (없으면 처음부터 계산)
+
+    Returns:
+        tuple: (지표 데이터프레임, 이 묶음 마지막 봉까지의 RSI 상태 dict)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    halo = np.array([]) if halo is None else np.asarray(halo, dtype=np.float64)
+    extended = np.concatenate([halo, close])
+    rsi_states = rsi_states or {}
+    columns = {}
+    new_states = {}
+    for spec in specs:
+        names = feature_names(spec)
+        if spec[0] == 'sma':
+            columns[names[0]] = sma(extended, spec[1])[len(halo):]
+        elif spec[0] == 'bb':
+            for name, values in zip(names, bollinger_bands(extended, spec[1], spec[2])):
+                columns[name] = values[len(halo):]
+        else:
+            columns[names[0]], new_states[names[0]] = rsi(close, spec[1],
+                                                          state=rsi_states.get(names[0]))
+    return pd.DataFrame(columns, index=index), new_states
+
+def compute_store_features(store, symbol, interval, specs=FEATURE_SPECS, chunk_rows=100_000):
+    """저장소의 종목/간격 캔들 전체에 대해 지표를 묶음 단위로 계산해 저장 (기존 지표는 다시 계산)
+
+    Returns:
+        int: 계산한 봉 개수
+    """
+    names = [name for spec in specs for name in feature_names(spec)]
+    store.delete_features(symbol, interval, names)
+    size = halo_size(specs)
+    halo = np.array([])
+    states = {}
+    bars = 0
+    for chunk in store.iter_candles(symbol, interval, chunk_rows=chunk_rows):
+        close = chunk['close'].to_numpy(dtype=np.float64)
+        features, states = compute_features(close, chunk.index, specs, halo, states)
+        store.write_features(features, symbol, interval)
+        halo = np.concatenate([halo, close])[-size:] if size else halo
+        bars += len(chunk)
+    return bars
+
+def verify_store_features(store, symbol, interval, specs=FEATURE_SPECS):
+    """저장된 지표가 전체 캔들을 한 번에 계산한 값과 완전히 같은지 확인 (검증용, 전체를 메모리에 올림)
+
+    Returns:
+        list: 값이 다른 지표 이름 목록 (모두 같으면 빈 목록)
+    """
+    candles = store.read_candles(symbol, interval)
+    expected, _ = compute_features(candles['close'], candles.index, specs)
+    stored = store.read_features(symbol, interval, list(expected.columns)).reindex(expected.index)
+    return [name for name in expected.columns
+            if not np.array_equal(expected[name].to_numpy(), stored[name].to_numpy(),
+                                  equal_nan=True)]
+
+def main():
+    # 여러 종목의 1분봉을 저장소에 받아두고 지표를 묶음 단위로 계산
+    symbols = ['KRW-BTC', 'KRW-ETH', 'KRW-XRP']
+    interval = 'minute1'
+    with CandleStore() as store:
+        for symbol in symbols:
+            download_candles(store, symbol, interval, count=100_000)
+            bars = compute_store_features(store, symbol, interval, chunk_rows=20_000)
+            mismatched = verify_store_features(store, symbol, interval)
+            print(f"{symbol}: {bars}개 봉 지표 계산 완료"
+                  + (f", 불일치 지표: {mismatched}" if mismatched else " (전체 계산과 일치)"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# 캔들/봉별 결과 데이터프레임의 메모리 절약형 자료형
+# 원화 가격은 정수이므로 int64, 거래량은 float32, 포지션/신호는 int8 코드로 저장하고
+# 진입가격은 None 대신 NaN 을 쓰는 float64 로 저장해 object 컬럼을 없앤다.
+# 지표 컬럼은 float64 를 유지한다 (float32 로 줄이면 가격과 지표의 비교 결과가 달라질 수 있음).
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# 봉별 포지션 코드 (0: 없음, 1: 롱, -1: 숏)
+POSITION_CODES = {None: 0, 'long': 1, 'short': -1}
+
+def compact_candles(df):
+    """캔들 데이터프레임을 작은 자료형으로 변환
+
+    시가/고가/저가/종가가 모두 정수(원화 가격)면 int64, 아니면 float64 로 두고,
+    거래량은 float32, index 는 datetime64 로 변환한다. 거래대금(value)은 float64 를 유지한다.
+    """
+    df = df.copy()
+    df.index = pd.DatetimeIndex(df.index)
+    prices = df[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+    if np.isfinite(prices).all() and (prices == np.round(prices)).all():
+        df[PRICE_COLUMNS] = prices.astype(np.int64)
+    if 'volume' in df:
+        df['volume'] = df['volume'].astype(np.float32)
+    return df
+
+def empty_bar_arrays(n):
+    """봉별 결과 배열 (signal/position 0, entry_price NaN, profit 0) - 전략이 봉마다 채워 넣음
+
+    signal/position 은 int8, entry_price 는 포지션이 없으면 NaN 인 float64.
+    profit(봉별 평가 수익률)은 backtest_strategy 가 0.02/-0.01 경계와 비교하므로 float64 를 유지한다.
+    (float32 로 줄이면 경계에 정확히 걸린 봉이 다르게 분류됨)
+    """
+    return {
+        'signal': np.zeros(n, dtype=np.int8),
+        'position': np.zeros(n, dtype=np.int8),
+        'entry_price': np.full(n, np.nan),
+        'profit': np.zeros(n, dtype=np.float64),
+    }
@@ -1,8 +1,14 @@
-import pyupbit
-from ta.momentum import RSIIndicator
-from ta.trend import SMAIndicator
+import copy
+from array_views import column_views
+from instrumentation import count_loop, timed
+from indicators import rsi, sma
+from metrics import trade_metrics
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from data_planner import plan_candles, load_candles
+from trade_report import display_options, format_trade_stats, format_trade_table
+from trade_stats import TradeStats
+from trade_store import TradeStore
 
 class CrossStrategy:
     def __init__(self):
@@ -11,33 +17,102 @@ class CrossStrategy:
         self.entry_date = None
         self.take_profit = 0.02  # 0.3% 이익/손실
         self.stop_loss = 0.01
+        self.trades = []
+        self.stats = TradeStats()  # 청산될 때마다 갱신되는 거래 통계
 
-    def calculate_indicators(self, df):
+    def get_state(self):
+        """증분 백테스트를 위한 전략 상태 스냅샷"""
+        return {
+            'position': self.position,
+            'entry_price': self.entry_price,
+            'entry_date': self.entry_date,
+            'take_profit': self.take_profit,
+            'stop_loss': self.stop_loss,
+            'trades': [dict(trade) for trade in self.trades],
+            'stats': copy.deepcopy(self.stats),
+        }
+
+    def set_state(self, state):
+        """get_state() 로 저장한 상태 복원"""
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.trades = [dict(trade) for trade in state['trades']]
+
+    def required_lookback(self, rsi_window=14):
+        """지표 워밍업에 필요한 과거 봉 개수
+
+        sma_34 와 전봉 비교(shift 1)에 34개가 필요하다. RSI 는 지수이동평균이라 시작점의 영향이
+        계속 남으므로 window 의 10배(140개)를 받아 그 영향을 1e-4 이하로 줄인다.
+        """
+        return max(34, rsi_window * 10)
+
+    @timed('indicators')
+    def indicator_arrays(self, close, rsi_state=None):
+        """종가 배열로 RSI/이동평균/크로스 신호 배열 계산 (입력 배열은 수정하지 않음)
+
+        rsi_state 는 close 첫 봉 직전까지의 RSI 상태 (증분 계산 시 사용).
+        take_profit/stop_loss 와 관계없으므로 파라미터 스윕에서는 한 번만 계산해 재사용할 수 있다.
+        """
         # RSI
-        df['rsi'] = RSIIndicator(close=df['close']).rsi()
+        rsi_values, _ = rsi(close, state=rsi_state)
         # 이동평균선
-        df['sma_10'] = SMAIndicator(close=df['close'], window=10).sma_indicator()
-        df['sma_34'] = SMAIndicator(close=df['close'], window=34).sma_indicator()
-        
-        # 골든크로스/데드크로스 조건 생성
-        df['golden_cross'] = (df['sma_10'] > df['sma_34']) & (df['sma_10'].shift(1) <= df['sma_34'].shift(1))
-        df['death_cross'] = (df['sma_10'] < df['sma_34']) & (df['sma_10'].shift(1) >= df['sma_34'].shift(1))
+        sma_10 = sma(close, 10)
+        sma_34 = sma(close, 34)
         
+        # 골든크로스/데드크로스 조건 생성 (첫 봉은 전봉이 없으므로 False)
+        golden_cross = np.zeros(len(close), dtype=bool)
+        death_cross = np.zeros(len(close), dtype=bool)
+        golden_cross[1:] = (sma_10[1:] > sma_34[1:]) & (sma_10[:-1] <= sma_34[:-1])
+        death_cross[1:] = (sma_10[1:] < sma_34[1:]) & (sma_10[:-1] >= sma_34[:-1])
+        return {
+            'rsi': rsi_values,
+            'sma_10': sma_10,
+            'sma_34': sma_34,
+            'golden_cross': golden_cross,
+            'death_cross': death_cross,
+        }
+    
+    def calculate_indicators(self, df, rsi_state=None):
+        """지표 컬럼을 df 에 추가 (rsi_state: df 첫 봉 직전까지의 RSI 상태, 증분 계산 시 사용)"""
+        for name, values in self.indicator_arrays(df['close'].to_numpy(), rsi_state).items():
+            df[name] = values
         return df
     
-    def execute_strategy(self, df):
-        trades = []
-        position = None
-        entry_price = None
-        entry_date = None
+    @timed('execute_strategy')
+    def run_arrays(self, close, times, indicators, resume=False):
+        """배열 인터페이스로 매매 전략 실행 (입력 배열은 읽기만 하고 복사하지 않음)
+
+        Args:
+            close: 종가 배열 (array_views.readonly_view 등 읽기 전용 뷰)
+            times: 봉 시각 index (거래 내역의 진입/종료 시각)
+            indicators: indicator_arrays() 결과 (rsi, golden_cross, death_cross 사용)
+            resume: True 이면 직전 실행의 상태에서 첫 봉부터 이어서 실행
+
+        Returns:
+            tuple: (봉별 결과 배열 dict - 이 전략은 봉별 결과가 없어 빈 dict, 거래 내역)
+        """
+        rsi_values = indicators['rsi']
+        golden_cross = indicators['golden_cross']
+        death_cross = indicators['death_cross']
+        if not resume:
+            self.position = None
+            self.entry_price = None
+            self.entry_date = None
+            self.trades = []
+            self.stats = TradeStats()
+        trades = self.trades
+        position = self.position
+        entry_price = self.entry_price
+        entry_date = self.entry_date
+        closed_before, was_open = self.stats.count, position is not None
         
-        for i in range(1, len(df)):
-            current_price = df['close'].iloc[i]
-            current_date = df.index[i]
+        for i in range(0 if resume else 1, len(close)):
+            current_price = close[i]
+            current_date = times[i]
             
             if position is None:
                 # 롱 진입 조건
-                if df['golden_cross'].iloc[i] and df['rsi'].iloc[i] >= 55:
+                if golden_cross[i] and rsi_values[i] >= 55:
                     position = 'long'
                     entry_price = current_price
                     entry_date = current_date
@@ -48,7 +123,7 @@ class CrossStrategy:
                     })
                 
                 # 숏 진입 조건
-                elif df['death_cross'].iloc[i] and df['rsi'].iloc[i] <= 45:
+                elif death_cross[i] and rsi_values[i] <= 45:
                     position = 'short'
                     entry_price = current_price
                     entry_date = current_date
@@ -75,13 +150,28 @@ class CrossStrategy:
                         'profit_ratio': profit_ratio,
                         'profit': profit
                     })
+                    self.stats.add(trades[-1])
                     position = None
                     entry_price = None
                     entry_date = None
         
+        self.position = position
+        self.entry_price = entry_price
+        self.entry_date = entry_date
+        count_loop(self, len(close), closed_before, was_open)
+        return {}, trades
+
+    def execute_strategy(self, df, resume=False):
+        """매매 전략 실행 (resume=True 이면 직전 실행의 상태에서 첫 행부터 이어서 실행)
+
+        calculate_indicators() 결과의 컬럼 뷰로 run_arrays() 를 실행하고 거래 내역을 반환한다.
+        """
+        views = column_views(df, ['close', 'rsi', 'golden_cross', 'death_cross'])
+        _, trades = self.run_arrays(views['close'], df.index, views, resume=resume)
         return trades
 
-def print_trade_results(trades):
+@timed('report')
+def print_trade_results(trades, stats=None):
     # 완료된 거래만 필터링
     completed_trades = [t for t in trades if 'exit_date' in t]
     
@@ -100,21 +190,8 @@ def print_trade_results(trades):
     # 거래 내역 출력
     print("\n거래 내역:")
     print("-" * 100)
-    print(f"{'포지션':<8} {'진입일자':<22} {'종료일자':<22} {'진입가격':<15} {'종료가격':<15} {'수익률':<8} {'수익금액'}")
-    print("-" * 100)
-    
-    total_profit = 0
-    for trade in completed_trades:
-        profit_str = f"{trade['profit_ratio']*100:+.2f}%"
-        print(f"{trade['position']:<8} "
-              f"{trade['entry_date'].strftime('%Y-%m-%d %H:%M:%S'):<22} "
-              f"{trade['exit_date'].strftime('%Y-%m-%d %H:%M:%S'):<22} "
-              f"{trade['entry_price']:,.0f} KRW"
-              f"{trade['exit_price']:>15,.0f} KRW"
-              f"{profit_str:>8} "
-              f"{trade['profit']:>12,.0f} KRW")
-        total_profit += trade['profit']
-    
+    print(format_trade_table(completed_trades))
+    total_profit = sum(trade['profit'] for trade in completed_trades)
     print("-" * 100)
     print(f"총 수익금액: {total_profit:,.0f} KRW")
 
@@ -134,68 +211,20 @@ def print_trade_results(trades):
     # 수익률을 퍼센트로 변환
     df_trades['수익률'] = df_trades['수익률'] * 100
     
-    # 데이터프레임 형식 지정
-    pd.set_option('display.float_format', lambda x: f'{x:,.2f}' if isinstance(x, (float, int)) else str(x))
-    
-    # 거래 통계 계산
-    total_trades = len(df_trades)
-    winning_trades = len(df_trades[df_trades['수익률'] > 0])
-    losing_trades = len(df_trades[df_trades['수익률'] <= 0])
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-    
-    avg_profit = df_trades[df_trades['수익률'] > 0]['수익률'].mean() if winning_trades > 0 else 0
-    avg_loss = df_trades[df_trades['수익률'] <= 0]['수익률'].mean() if losing_trades > 0 else 0
-    
-    # 거래 통계 출력
-    print("\n=== 거래 통계 ===")
-    print(f"총 거래 횟수: {total_trades}")
-    print(f"승률: {win_rate:.2f}%")
-    print(f"평균 수익: {avg_profit:.2f}%")
-    print(f"평균 손실: {avg_loss:.2f}%")
-    
-    # CSV 파일로 저장
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_filename = f'trade_history_{timestamp}_cross.csv'
-    df_trades.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-    print(f"\n거래 내역이 '{csv_filename}'로 저장되었습니다.")
+    # 거래 통계 (stats: 실행 중 누적된 TradeStats, 없으면 거래 내역으로 계산)
+    stats = stats.totals() if stats is not None else trade_metrics(completed_trades)
+    print("\n" + format_trade_stats(stats))
     
     return df_trades, total_profit
 
-def get_trade_summary(trade_history):
-    """거래 내역 요약 통계를 반환하는 함수"""
-    if not trade_history:
-        return pd.DataFrame()
-        
-    df_trades = pd.DataFrame(trade_history)
-    
-    # 포지션별 통계
-    position_stats = df_trades.groupby('position').agg({
-        'profit_ratio': ['count', 'mean', 'std', 'min', 'max'],
-        'profit': 'sum'
-    }).round(4)
-    
-    # 컬럼명 변경
-    position_stats.columns = ['거래횟수', '평균수익률', '표준편차', '최소수익률', '최대수익률', '총수익금']
-    position_stats.index.name = '포지션'
-    
-    # 수익률 계산을 퍼센트로 변환
-    for col in ['평균수익률', '최소수익률', '최대수익률']:
-        position_stats[col] = position_stats[col] * 100
-    
-    return position_stats
-    
-
-def main():
-    start_date = "20250101"
-    end_date = "20250131"
-    # 시작 날짜의 다음 날짜 계산
-    next_day = pd.to_datetime(end_date) + pd.Timedelta(days=1)
-    next_day_str = next_day.strftime("%Y%m%d")
-    # 데이터 가져오기
-    df = pyupbit.get_ohlcv("KRW-BTC", count=9000, to=next_day_str, interval="minute5")
+def main(start_date="20250101", end_date="20250131"):
+    # 시작/종료 날짜 (YYYYMMDD 형식)
+    strategy = CrossStrategy()
+    # 데이터 가져오기 (매매 구간 + 지표 워밍업만큼)
+    plan = plan_candles(start_date, end_date, strategy, interval="minute5")
+    df = load_candles(plan, "KRW-BTC")
     
     # 전략 실행
-    strategy = CrossStrategy()
     df = strategy.calculate_indicators(df)
 
     df = df[df.index >= start_date+'0900']
@@ -204,11 +233,18 @@ def main():
     
     # 결과 출력
     #print_trade_results(trades)
-    df_trades, total_profit = print_trade_results(trades)
+    df_trades, total_profit = print_trade_results(trades, stats=strategy.stats)
+    # 거래 내역 저장소에 저장
+    with TradeStore() as store:
+        run_id = store.write_run(trades, 'cross', interval=plan.interval,
+                                 params={'take_profit': strategy.take_profit,
+                                         'stop_loss': strategy.stop_loss})
+    print(f"\n거래 내역이 저장소에 저장되었습니다. (run_id: {run_id})")
     # 포지션별 통계 확인
-    position_stats = get_trade_summary(trades)
+    position_stats = strategy.stats.position_summary()
     print("\n=== 포지션별 통계 ===")
-    print(position_stats)
+    with display_options():
+        print(position_stats)
     # 현재 상태 출력
     current_trade = trades[-1] if trades else None
     print("\n현재 상태:")
@@ -0,0 +1,90 @@
+# 지표 워밍업을 고려한 캔들 데이터 구간 계획
+# 각 전략의 required_lookback() 으로 필요한 과거 봉 개수를 모아
+# 요청한 매매 구간에 필요한 최소한의 캔들만 받아온다.
+# 캔들은 get_ohlcv() 로 받으며, 환경변수 CANDLE_SOURCE=synthetic 또는 set_candle_source() 로
+# pyupbit 대신 오프라인 가상 시장(synthetic_market) 등 다른 데이터 소스를 쓸 수 있다.
+import os
+
+import pandas as pd
+import pyupbit
+
+from instrumentation import timed
+
+from compact_dtypes import compact_candles
+
+INTERVAL_MINUTES = {
+    'minute1': 1, 'minute3': 3, 'minute5': 5, 'minute10': 10, 'minute15': 15,
+    'minute30': 30, 'minute60': 60, 'minute240': 240, 'day': 1440,
+}
+
+# set_candle_source() 로 지정한 캔들 조회 함수 (None 이면 CANDLE_SOURCE 환경변수에 따름)
+_SOURCE = None
+
+def set_candle_source(source):
+    """캔들 조회 함수 지정 (pyupbit.get_ohlcv 와 같은 인자, None 이면 기본값으로 되돌림)"""
+    global _SOURCE
+    _SOURCE = source
+
+def candle_source():
+    """현재 캔들 조회 함수 (기본: pyupbit.get_ohlcv, CANDLE_SOURCE=synthetic 이면 가상 시장)"""
+    if _SOURCE is not None:
+        return _SOURCE
+    if os.environ.get('CANDLE_SOURCE') == 'synthetic':
+        from synthetic_market import get_ohlcv as synthetic_ohlcv
+        return synthetic_ohlcv
+    return pyupbit.get_ohlcv
+
+@timed('fetch')
+def get_ohlcv(ticker="KRW-BTC", interval="day", count=200, to=None):
+    """현재 데이터 소스에서 캔들 조회 (pyupbit.get_ohlcv 와 같은 결과 형식)"""
+    return candle_source()(ticker, interval=interval, count=count, to=to)
+
+def trading_window(start_date, end_date):
+    """매매 구간: 시작일 09:00 부터 종료일 다음날 09:00 전까지 (KST, UTC 기준 하루 단위)"""
+    return (pd.Timestamp(start_date + '0900'),
+            pd.Timestamp(end_date + '0900') + pd.Timedelta(days=1))
+
+class CandlePlan:
+    """매매 구간과 워밍업을 포함해 받아올 캔들 구간"""
+
+    def __init__(self, start_date, end_date, interval, lookback):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.interval = interval
+        self.lookback = lookback
+        self.window_start, self.window_end = trading_window(start_date, end_date)
+        self.bar = pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+        self.window_bars = int((self.window_end - self.window_start) / self.bar)
+        # 워밍업 봉 + 매매 구간 봉
+        self.count = self.window_bars + lookback
+        self.fetch_start = self.window_start - lookback * self.bar
+        # pyupbit 의 to 는 UTC 기준이므로 종료일 다음날 00:00(UTC) = 09:00(KST)
+        self.to = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).strftime("%Y%m%d")
+
+    def __repr__(self):
+        return (f"CandlePlan({self.interval}, {self.fetch_start} ~ {self.window_end}, "
+                f"count={self.count}, lookback={self.lookback})")
+
+def required_lookback(strategies):
+    """전략 하나 또는 여러 전략에 필요한 워밍업 봉 개수 (여러 전략이면 최댓값)"""
+    if not isinstance(strategies, (list, tuple, set)):
+        strategies = [strategies]
+    return max((strategy.required_lookback() for strategy in strategies), default=0)
+
+def plan_candles(start_date, end_date, strategies, interval="minute5"):
+    """매매 구간(start_date ~ end_date, YYYYMMDD)에 필요한 최소 캔들 구간 계산"""
+    return CandlePlan(start_date, end_date, interval, required_lookback(strategies))
+
+def load_candles(plan, ticker="KRW-BTC"):
+    """계획한 구간의 캔들을 받아와 워밍업 봉 lookback 개 + 매매 구간만 남겨 반환
+
+    거래가 없어 빠진 봉이 있으면 count 기준으로 받은 데이터의 앞쪽이 남으므로
+    워밍업 앞부분은 잘라내고, 상장 직후처럼 과거 데이터가 부족하면 경고를 출력한다.
+    가격/거래량은 compact_candles 로 작은 자료형으로 변환한다.
+    """
+    df = get_ohlcv(ticker, count=plan.count, to=plan.to, interval=plan.interval)
+    df = df[df.index < plan.window_end]
+    first = df.index.searchsorted(plan.window_start)
+    if first < plan.lookback:
+        print(f"경고: 워밍업 봉이 부족합니다 ({first}/{plan.lookback}개)")
+    return compact_candles(df.iloc[max(first - plan.lookback, 0):])
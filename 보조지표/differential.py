@@ -0,0 +1,319 @@
+# 기준 루프와 가속 실행 경로의 차등 검증 (differential testing)
+# 전략의 execute_strategy 를 데이터프레임 전체로 한 번 실행한 결과(run_backtest)를 기준으로,
+# 같은 캔들을 다른 경로(배열 인터페이스, 증분 실행 등)로 실행한 거래 내역을 필드 단위로 비교한다.
+# 데이터는 시드 기반 가상 시장, 가격이 굵은 호가 단위에서 자주 같아지는 경계값 데이터(중간선/밴드/이동평균과
+# 종가가 같은 봉, 익절/손절 비율에 정확히 닿는 봉), 캔들 저장소/CSV 에 기록된 캔들 구간을 사용한다.
+# 불일치가 나오면 같은 불일치가 유지되는 가장 짧은 캔들 구간으로 줄여 보고한다.
+#
+#   python differential.py --cases 20 --bars 3000
+#   python differential.py --strategy bb --recorded KRW-BTC:minute5 --save-dir mismatches
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from backtest_result import (TRADE_FIELDS, BacktestResult, run_array_backtest, run_backtest,
+                             trade_arrays)
+from compact_dtypes import compact_candles
+from incremental_backtest import CANDLE_COLUMNS, STRATEGIES, IncrementalBacktest
+from synthetic_market import generate_ohlcv
+
+# 파라미터 후보 (작은 값일수록 거래가 많아져 경계 상황이 자주 나온다)
+TAKE_PROFITS = [0.005, 0.01, 0.02, 0.03]
+STOP_LOSSES = [0.005, 0.01, 0.02]
+
+INTERVALS = ['minute1', 'minute5', 'minute10']
+
+# 증분 실행에서 최초 실행이 끝나는 위치 (매매 구간 비율)
+INCREMENTAL_START = 0.2
+# 이후 extend 할 캔들 수 (순환 사용, 한 봉씩 이어가는 경우와 상태가 여러 번 넘어가는 경계를 모두 포함)
+INCREMENTAL_STEPS = (1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+# 스트리밍 실행에서 첫 매매 봉 이후 한 봉씩 extend 하는 봉 수 (나머지는 INCREMENTAL_STEPS)
+STREAMING_BARS = 200
+
+# ---------------------------------------------------------------- 실행 경로
+
+def reference_engine(name, candles, start, params):
+    """기준: 지표를 계산한 데이터프레임 전체로 execute_strategy 한 번 실행"""
+    result = run_backtest(name, candles, start, **params)
+    return result.trade_list(), result.open_position
+
+def array_engine(name, candles, start, params):
+    """배열 인터페이스 (워밍업 포함 전체 종가로 지표 배열을 계산한 뒤 매매 구간만 전달)"""
+    strategy = STRATEGIES[name]()
+    indicators = strategy.indicator_arrays(candles['close'].to_numpy())
+    first = candles.index.searchsorted(start)
+    result = run_array_backtest(name, candles.iloc[first:],
+                                {key: values[first:] for key, values in indicators.items()}, **params)
+    return result.trade_list(), result.open_position
+
+def incremental_engine(name, candles, start, params, initial=INCREMENTAL_START, single_bars=0):
+    """증분 실행: 매매 구간의 initial 비율로 최초 실행 후 single_bars 개 봉은 한 봉씩,
+    나머지는 INCREMENTAL_STEPS 개씩 나눠 extend
+    """
+    first = candles.index.searchsorted(start)
+    cuts = [first + max(int((len(candles) - first) * initial), 1)]
+    cuts += range(cuts[0] + 1, min(cuts[0] + single_bars, len(candles)) + 1)
+    step = 0
+    while cuts[-1] < len(candles):
+        cuts.append(min(cuts[-1] + INCREMENTAL_STEPS[step % len(INCREMENTAL_STEPS)], len(candles)))
+        step += 1
+
+    backtest = IncrementalBacktest(name)
+    for key, value in params.items():
+        setattr(backtest.strategy, key, value)
+    trades = list(backtest.run(candles.iloc[:cuts[0]], start=start))
+    for previous, cut in zip(cuts, cuts[1:]):
+        trades += backtest.extend(candles.iloc[previous:cut])
+
+    strategy = backtest.strategy
+    open_position = None
+    if strategy.position is not None:
+        open_position = {'position': strategy.position, 'entry_date': strategy.entry_date,
+                         'entry_price': strategy.entry_price}
+    # run_backtest 결과와 같은 형식으로 변환
+    result = BacktestResult(name, params, trade_arrays(trades), candles, strategy.stats, open_position)
+    return result.trade_list(), result.open_position
+
+def streaming_engine(name, candles, start, params):
+    """실시간 갱신처럼 첫 매매 봉으로 최초 실행 후 한 봉씩 extend (봉 경계마다 전략 상태가 이어지는지 확인)"""
+    return incremental_engine(name, candles, start, params, initial=0, single_bars=STREAMING_BARS)
+
+# 이름 -> (실행 함수, 지원 전략 목록 또는 None(모든 전략))
+ENGINES = {
+    'arrays': (array_engine, None),
+    'incremental': (incremental_engine, None),
+    'streaming': (streaming_engine, None),
+}
+
+def register_engine(name, engine, strategies=None):
+    """가속 실행 경로 등록
+
+    engine(name, candles, start, params) 는 (거래 dict 목록, 미청산 포지션 dict 또는 None) 을 반환해야 하며,
+    거래 dict 는 BacktestResult.trade_list() 와 같은 키(TRADE_FIELDS)를 가진다.
+    """
+    ENGINES[name] = (engine, strategies)
+
+def engines_for(strategy, names=None):
+    """전략을 지원하는 실행 경로 이름 목록"""
+    return [name for name, (_, strategies) in ENGINES.items()
+            if (names is None or name in names) and (strategies is None or strategy in strategies)]
+
+# ---------------------------------------------------------------- 데이터
+
+def synthetic_cases(n_cases, bars, seed=0):
+    """시드 기반 가상 시장의 (이름, 캔들) 목록 (시드마다 종료 시각/봉 간격이 다름)"""
+    rng = np.random.default_rng(seed)
+    cases = []
+    for i in range(n_cases):
+        interval = INTERVALS[rng.integers(len(INTERVALS))]
+        end = pd.Timestamp('2019-01-01') + pd.Timedelta(days=int(rng.integers(0, 5 * 365)))
+        candles = generate_ohlcv("KRW-BTC", interval, bars, end=end, seed=seed + i)
+        cases.append((f"synthetic[seed={seed + i},{interval},{end:%Y%m%d}]", compact_candles(candles)))
+    return cases
+
+def _candles(close, freq='5min'):
+    """종가 배열로 만든 캔들 (시가는 직전 종가)"""
+    close = np.asarray(close, dtype=np.float64)
+    open_ = np.concatenate([close[:1], close[:-1]])
+    index = pd.date_range('2024-01-01 09:00', periods=len(close), freq=freq)
+    volume = np.ones(len(close))
+    return compact_candles(pd.DataFrame({
+        'open': open_, 'high': np.maximum(open_, close), 'low': np.minimum(open_, close),
+        'close': close, 'volume': volume, 'value': close * volume,
+    }, index=index))
+
+def tie_candles(bars, seed=0, tick=1000, base=100_000_000, jump_probability=0.02):
+    """종가가 굵은 호가 단위(tick)로만 움직이는 캔들
+
+    가격이 자주 그대로 머물러 이동평균/중간선과 종가가 같은 봉, 이동평균이 서로 같은 봉이 많고,
+    가끔 base 의 0.5%/1%/2%/3% 만큼 뛰므로 진입가가 base 이면 익절/손절 비율에 정확히 닿는다 (>=, <= 경계).
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([-1, 0, 0, 0, 1], size=bars)
+    jumps = rng.random(bars) < jump_probability
+    sizes = np.array([0.005, 0.01, 0.02, 0.03]) * base / tick
+    steps[jumps] = rng.choice(np.concatenate([sizes, -sizes]), size=jumps.sum()).astype(np.int64)
+    return _candles(base + tick * np.cumsum(steps))
+
+def tie_cases(n_cases, bars, seed=0):
+    return [(f"ties[seed={seed + i}]", tie_candles(bars, seed + i)) for i in range(n_cases)]
+
+def scenario_cases(base=100_000_000):
+    """경계 상황을 일부러 만든 (이름, 캔들, 파라미터) 목록
+
+    - bb_middle_gate: 하단 이탈 롱 진입 -> 다음 봉 상단 돌파로 청산 (같은 봉에 숏 진입 조건) ->
+      중간선을 터치하기 전까지 상단 위에 머묾 (숏 진입 막힘) -> 중간선 터치 후 상단 돌파 숏 진입 -> 하단 이탈 청산
+    - trend: 워밍업부터 꾸준히 오르는 가격 (첫 매매 봉부터 롱 신호, 익절 청산 봉에도 롱 신호 유지)
+    - waves: 골든/데드크로스가 반복되는 파동
+    """
+    # 앞부분은 중간선 +-500 에서만 움직여 밴드가 좁고 진입이 없는 구간 (가장 긴 워밍업 140봉 이상)
+    flat = base + 1000 * (np.arange(150) % 2)
+    gate = np.concatenate([flat, [base - 50_000], [base + 100_000] * 4, [base] * 5, [base + 200_000],
+                           [base] * 3, [base - 300_000], [base] * 10])
+    trend = np.round(base * 1.001 ** np.arange(400), -3)
+    waves = np.round(base * (1 + 0.01 * np.sin(2 * np.pi * np.arange(1200) / 150)), -3)
+    return [
+        ('scenario[bb_middle_gate]', _candles(gate), {'take_profit': 0.01, 'stop_loss': 0.005}),
+        ('scenario[trend]', _candles(trend), {'take_profit': 0.01, 'stop_loss': 0.005}),
+        ('scenario[waves]', _candles(waves), {'take_profit': 0.005, 'stop_loss': 0.005}),
+    ]
+
+def recorded_cases(candles, label, n_cases, bars, seed=0):
+    """기록된 캔들에서 무작위로 고른 길이 bars 의 구간 목록"""
+    rng = np.random.default_rng(seed)
+    if len(candles) <= bars:
+        return [(label, candles)]
+    starts = sorted(rng.integers(0, len(candles) - bars, size=n_cases))
+    return [(f"{label}[{candles.index[i]:%Y%m%d%H%M}]", candles.iloc[i:i + bars]) for i in starts]
+
+def load_recorded(source):
+    """'SYMBOL:INTERVAL'(캔들 저장소) 또는 CSV 파일 경로의 캔들"""
+    if os.path.exists(source):
+        return compact_candles(pd.read_csv(source, index_col=0, parse_dates=True))
+    from candle_store import CandleStore
+    symbol, interval = source.split(':')
+    with CandleStore() as store:
+        return compact_candles(store.read_candles(symbol, interval))
+
+# ---------------------------------------------------------------- 비교
+
+def _same(expected, actual):
+    if isinstance(expected, float) and isinstance(actual, float):
+        return expected == actual or (math.isnan(expected) and math.isnan(actual))
+    return expected == actual
+
+def diff_trades(expected, actual):
+    """거래 내역 필드 단위 비교
+
+    Args:
+        expected, actual: (거래 dict 목록, 미청산 포지션) 튜플
+
+    Returns:
+        list: 차이 dict 목록 (trade: 거래 순번 또는 'count'/'open', field, expected, actual)
+    """
+    expected_trades, expected_open = expected
+    actual_trades, actual_open = actual
+    diffs = []
+    if len(expected_trades) != len(actual_trades):
+        diffs.append({'trade': 'count', 'field': None,
+                      'expected': len(expected_trades), 'actual': len(actual_trades)})
+    for i, (left, right) in enumerate(zip(expected_trades, actual_trades)):
+        for field in TRADE_FIELDS:
+            if not _same(left.get(field), right.get(field)):
+                diffs.append({'trade': i, 'field': field,
+                              'expected': left.get(field), 'actual': right.get(field)})
+    if (expected_open is None) != (actual_open is None):
+        diffs.append({'trade': 'open', 'field': None, 'expected': expected_open, 'actual': actual_open})
+    elif expected_open is not None:
+        for field in expected_open:
+            if not _same(expected_open[field], actual_open.get(field)):
+                diffs.append({'trade': 'open', 'field': field,
+                              'expected': expected_open[field], 'actual': actual_open.get(field)})
+    return diffs
+
+def compare(strategy, engine, candles, params, warmup):
+    """candles 의 앞 warmup 개 봉을 지표 워밍업으로 두고 기준과 실행 경로의 차이 목록 반환"""
+    candles = candles[CANDLE_COLUMNS]
+    start = candles.index[warmup]
+    run = ENGINES[engine][0]
+    return diff_trades(reference_engine(strategy, candles, start, params),
+                       run(strategy, candles, start, params))
+
+def shrink(strategy, engine, candles, params, warmup):
+    """불일치가 유지되는 가장 짧은 캔들 구간 (양 끝을 절반씩 줄여 보고 유지되면 채택)
+
+    Returns:
+        tuple: (줄인 캔들, 그 구간의 차이 목록)
+    """
+    def fails(a, b):
+        return bool(compare(strategy, engine, candles.iloc[a:b], params, warmup))
+
+    a, b = 0, len(candles)
+    min_len = warmup + 2
+    step = (b - a) // 2
+    while step >= 1:
+        if b - step - a >= min_len and fails(a, b - step):
+            b -= step
+        elif b - a - step >= min_len and fails(a + step, b):
+            a += step
+        else:
+            step //= 2
+    window = candles.iloc[a:b]
+    return window, compare(strategy, engine, window, params, warmup)
+
+def random_params(rng):
+    return {'take_profit': float(rng.choice(TAKE_PROFITS)), 'stop_loss': float(rng.choice(STOP_LOSSES))}
+
+def run_harness(strategies, cases, engines=None, seed=0, save_dir=None):
+    """모든 (전략, 실행 경로, 데이터) 조합을 비교
+
+    cases 는 (이름, 캔들) 또는 (이름, 캔들, 파라미터) 목록이며, 파라미터가 없으면 시드로 고른다.
+
+    Returns:
+        list: 불일치 dict 목록 (strategy, engine, case, params, window, diffs)
+    """
+    mismatches = []
+    for strategy in strategies:
+        warmup = STRATEGIES[strategy]().required_lookback()
+        for engine in engines_for(strategy, engines):
+            rng = np.random.default_rng(seed)
+            matched = 0
+            for label, candles, *case_params in cases:
+                params = case_params[0] if case_params else random_params(rng)
+                if len(candles) < warmup + 2 or not compare(strategy, engine, candles, params, warmup):
+                    matched += 1
+                    continue
+                window, diffs = shrink(strategy, engine, candles, params, warmup)
+                mismatch = {'strategy': strategy, 'engine': engine, 'case': label, 'params': params,
+                            'window': window, 'diffs': diffs}
+                mismatches.append(mismatch)
+                print_mismatch(mismatch)
+                if save_dir:
+                    save_mismatch(mismatch, save_dir)
+            print(f"{strategy} / {engine}: {matched}/{len(cases)} 일치")
+    return mismatches
+
+def print_mismatch(mismatch, max_diffs=5):
+    window = mismatch['window']
+    print(f"불일치: {mismatch['strategy']} / {mismatch['engine']} / {mismatch['case']} {mismatch['params']}")
+    print(f"  최소 구간: {window.index[0]} ~ {window.index[-1]} ({len(window)}봉)")
+    for diff in mismatch['diffs'][:max_diffs]:
+        field = f".{diff['field']}" if diff['field'] else ''
+        print(f"  거래 {diff['trade']}{field}: 기준 {diff['expected']!r} / 실행 경로 {diff['actual']!r}")
+    if len(mismatch['diffs']) > max_diffs:
+        print(f"  ... 외 {len(mismatch['diffs']) - max_diffs}개")
+
+def save_mismatch(mismatch, directory):
+    """최소 구간 캔들을 CSV 로 저장 (load_recorded 로 다시 읽어 재현)"""
+    os.makedirs(directory, exist_ok=True)
+    name = f"{mismatch['strategy']}_{mismatch['engine']}_{mismatch['window'].index[0]:%Y%m%d%H%M}.csv"
+    mismatch['window'].to_csv(os.path.join(directory, name))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기준 루프와 가속 실행 경로의 거래 내역 비교")
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), action='append',
+                        help="검증할 전략 (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), action='append',
+                        help="검증할 실행 경로 (기본: 전체)")
+    parser.add_argument('--cases', type=int, default=4, help="데이터 종류별 구간 수")
+    parser.add_argument('--bars', type=int, default=2000, help="구간별 봉 수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--recorded', action='append', default=[],
+                        help="기록된 캔들 (SYMBOL:INTERVAL 또는 CSV 경로, 여러 번 지정 가능)")
+    parser.add_argument('--save-dir', help="불일치 최소 구간 CSV 저장 폴더")
+    args = parser.parse_args(argv)
+
+    cases = (scenario_cases() + synthetic_cases(args.cases, args.bars, args.seed)
+             + tie_cases(args.cases, args.bars, args.seed))
+    for source in args.recorded:
+        cases += recorded_cases(load_recorded(source), source, args.cases, args.bars, args.seed)
+    mismatches = run_harness(args.strategy or sorted(STRATEGIES), cases, args.engine, args.seed,
+                             args.save_dir)
+    print(f"불일치 {len(mismatches)}건")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,778 @@
+# 여러 노드에 나눠 실행하는 파라미터 스윕 (코디네이터/워커)
+# 코디네이터는 (데이터 구간, 파라미터 조합 묶음) 단위의 청크를 작업 큐에 넣고, 워커는 청크를 임대(lease)해 실행한 뒤
+# 결과를 큐에 돌려준다. 워커는 실행 중 주기적으로 하트비트를 보내 임대 시간을 늘리고, 하트비트가 끊겨 임대 시간이 지난
+# 청크는 다른 워커가 다시 임대한다 (MAX_ATTEMPTS 회까지). 워커는 불러온 캔들/지표를 메모리에 두고 같은 데이터 구간의
+# 청크를 먼저 임대하므로 노드마다 같은 캔들을 반복해서 받지 않는다. 코디네이터는 완료된 청크의 결과를
+# 스윕 체크포인트(결과 저장소)와 거래 저장소에 모은다 (같은 결과를 두 번 모아도 중복되지 않음).
+# 큐는 WorkQueue 인터페이스로 교체할 수 있으며 SQLite 파일(sqlite:경로)과 폴더(file:경로) 구현이 있다.
+#
+#   python distributed_sweep.py run --strategy ma --period 20250101:20250131 --workers 3
+#   python distributed_sweep.py submit --queue sqlite:/shared/queue.db --strategy bb --period 20250101:20250131
+#   python distributed_sweep.py worker --queue sqlite:/shared/queue.db   (노드마다 실행)
+#   python distributed_sweep.py collect --queue sqlite:/shared/queue.db --checkpoint results.db
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from sweep import SweepCheckpoint, cell_key, iter_grid
+from warm_worker import LRUCache
+
+DEFAULT_QUEUE = os.environ.get('SWEEP_QUEUE', 'sqlite:sweep_queue.db')
+
+CHUNK_SIZE = 10          # 청크당 파라미터 조합 수
+LEASE_SECONDS = 60.0     # 하트비트 없이 임대가 유지되는 시간
+HEARTBEAT_SECONDS = 10.0
+POLL_SECONDS = 1.0       # 임대할 청크가 없을 때 다시 확인하는 간격
+MAX_ATTEMPTS = 3         # 청크당 최대 임대 횟수 (넘으면 failed)
+WORKER_MEMORY_MB = 1024  # 워커의 캔들/지표 캐시 한도
+
+# 기본 파라미터 그리드 (P&L_ratio.py 와 같은 1% ~ 5.5%, 0.5% 단위)
+DEFAULT_GRID = {
+    'take_profit': np.arange(0.01, 0.06, 0.005),
+    'stop_loss': np.arange(0.01, 0.06, 0.005),
+}
+
+DEFAULT_INTERVALS = {'bb': 'minute5', 'ma': 'minute10', 'cross': 'minute5'}
+
+def _json_default(value):
+    # numpy 스칼라/Timestamp 를 JSON 기본 타입으로 변환
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"JSON 으로 변환할 수 없는 타입: {type(value)}")
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default)
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+# ---------------------------------------------------------------- 작업 큐
+
+class WorkQueue:
+    """작업 큐 인터페이스
+
+    청크는 (chunk_id, data_key, payload dict) 이며 상태는 pending -> leased -> done -> collected 순으로 바뀐다.
+    임대 시간이 지난 leased 청크는 다른 워커가 다시 임대할 수 있고, 임대 횟수를 다 쓴 청크는 failed 가 된다.
+    완료 보고는 임대한 워커만 할 수 있으며, 임대를 잃은 뒤의 하트비트/완료 보고는 False 를 반환한다.
+    """
+
+    def put(self, chunks):
+        """청크 목록 추가 (이미 있는 chunk_id 는 건너뜀), 추가한 수 반환"""
+        raise NotImplementedError
+
+    def lease(self, worker, loaded=(), lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """청크 하나 임대 ((chunk_id, data_key, payload) 또는 None)
+
+        loaded(워커가 이미 불러온 data_key)의 청크, 다른 워커가 처리 중이지 않은 데이터의 청크, 나머지 순으로 고른다.
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, worker, chunk_id, lease_seconds=LEASE_SECONDS):
+        """임대 시간 연장 (임대를 잃었으면 False)"""
+        raise NotImplementedError
+
+    def complete(self, worker, chunk_id, result):
+        """결과 보고 (임대를 잃었으면 False)"""
+        raise NotImplementedError
+
+    def fail(self, worker, chunk_id, error, max_attempts=MAX_ATTEMPTS):
+        """실행 실패 보고 (임대 횟수가 남았으면 다시 pending)"""
+        raise NotImplementedError
+
+    def collect(self):
+        """완료된 청크의 (chunk_id, payload, result) 목록"""
+        raise NotImplementedError
+
+    def mark_collected(self, chunk_ids):
+        """결과 저장소에 모은 청크 표시"""
+        raise NotImplementedError
+
+    def counts(self):
+        """상태별 청크 수 dict"""
+        raise NotImplementedError
+
+    def failures(self):
+        """실패한 청크의 (chunk_id, 임대 횟수, 오류) 목록"""
+        raise NotImplementedError
+
+    def reopen(self):
+        """같은 큐에 새로 연결 (다른 스레드에서 쓸 큐 객체)"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _pick(candidates, loaded, busy):
+    """(chunk_id, data_key, ...) 후보 중 데이터 지역성 우선순위가 가장 높은 것"""
+    return min(candidates, key=lambda c: (c[1] not in loaded, c[1] in busy, c[0]), default=None)
+
+class SQLiteQueue(WorkQueue):
+    """SQLite 파일 하나를 여러 프로세스/노드(공유 파일 시스템)가 같이 쓰는 큐
+
+    임대/완료는 BEGIN IMMEDIATE 트랜잭션으로 처리하므로 같은 청크를 두 워커가 동시에 임대하지 않는다.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS chunks (
+        chunk_id TEXT PRIMARY KEY,
+        data_key TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'pending',
+        worker TEXT,
+        lease_until REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        result TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_chunks_state ON chunks (state, data_key);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(self.SCHEMA)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def put(self, chunks):
+        with self._transaction():
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO chunks (chunk_id, data_key, payload) VALUES (?, ?, ?)',
+                [(chunk_id, data_key, _dumps(payload)) for chunk_id, data_key, payload in chunks]
+            )
+            return self.conn.total_changes - before
+
+    def lease(self, worker, loaded=(), lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        now = time.time()
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE chunks SET state = 'failed', error = COALESCE(error, '임대 시간 초과') "
+                "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?", (now, max_attempts))
+            candidates = self.conn.execute(
+                "SELECT chunk_id, data_key, payload FROM chunks "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?)", (now,)).fetchall()
+            busy = {key for key, in self.conn.execute(
+                "SELECT DISTINCT data_key FROM chunks WHERE state = 'leased' AND lease_until >= ? "
+                "AND worker != ?", (now, worker))}
+            chosen = _pick(candidates, set(loaded), busy)
+            if chosen is None:
+                return None
+            self.conn.execute(
+                "UPDATE chunks SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE chunk_id = ?", (worker, now + lease_seconds, chosen[0]))
+        chunk_id, data_key, payload = chosen
+        return chunk_id, data_key, json.loads(payload)
+
+    def heartbeat(self, worker, chunk_id, lease_seconds=LEASE_SECONDS):
+        cursor = self.conn.execute(
+            "UPDATE chunks SET lease_until = ? WHERE chunk_id = ? AND worker = ? AND state = 'leased'",
+            (time.time() + lease_seconds, chunk_id, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, worker, chunk_id, result):
+        cursor = self.conn.execute(
+            "UPDATE chunks SET state = 'done', result = ?, lease_until = NULL "
+            "WHERE chunk_id = ? AND worker = ? AND state = 'leased'", (_dumps(result), chunk_id, worker))
+        return cursor.rowcount == 1
+
+    def fail(self, worker, chunk_id, error, max_attempts=MAX_ATTEMPTS):
+        self.conn.execute(
+            "UPDATE chunks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL, error = ? "
+            "WHERE chunk_id = ? AND worker = ? AND state = 'leased'", (max_attempts, error, chunk_id, worker))
+
+    def collect(self):
+        return [(chunk_id, json.loads(payload), json.loads(result)) for chunk_id, payload, result in
+                self.conn.execute("SELECT chunk_id, payload, result FROM chunks WHERE state = 'done' "
+                                  "ORDER BY chunk_id")]
+
+    def mark_collected(self, chunk_ids):
+        with self._transaction():
+            self.conn.executemany("UPDATE chunks SET state = 'collected' WHERE chunk_id = ?",
+                                  [(chunk_id,) for chunk_id in chunk_ids])
+
+    def counts(self):
+        return dict(self.conn.execute('SELECT state, COUNT(*) FROM chunks GROUP BY state'))
+
+    def failures(self):
+        return self.conn.execute(
+            "SELECT chunk_id, attempts, error FROM chunks WHERE state = 'failed' ORDER BY chunk_id").fetchall()
+
+    def reopen(self):
+        return SQLiteQueue(self.path)
+
+    def close(self):
+        self.conn.close()
+
+class FileQueue(WorkQueue):
+    """폴더 하나를 큐로 쓰는 구현 (상태별 하위 폴더 사이의 파일 이동(rename)으로 임대/완료)
+
+    pending/{data_key}~{chunk_id}.json 을 leased/ 의 숨은 파일(*.claim)로 옮기는 쪽이 임대하며, 수정 시각을
+    임대 만료 시각으로 쓴 leased/{data_key}~{chunk_id}@{worker}.json 을 만든 뒤 숨은 파일을 지운다
+    (하트비트는 수정 시각 갱신). 숨은 파일 이름에도 만료 시각이 있어 옮긴 프로세스가 중간에 종료되면 되돌린다.
+    완료 결과는 done/{chunk_id}.json 에 쓰고, 결과 저장소에 모은 뒤 collected/ 로 옮긴다.
+    """
+
+    STATES = ['pending', 'leased', 'done', 'collected', 'failed']
+    CLAIM_SECONDS = 60.0  # 숨은 파일을 되돌리기까지의 시간 (파일을 옮긴 뒤 임대 파일을 만들기까지보다 충분히 길게)
+
+    def __init__(self, root):
+        self.root = root
+        for state in self.STATES:
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    def _path(self, state, name):
+        return os.path.join(self.root, state, name)
+
+    def _names(self, state):
+        return [name for name in os.listdir(os.path.join(self.root, state)) if name.endswith('.json')]
+
+    def _claims(self):
+        return [name for name in os.listdir(os.path.join(self.root, 'leased')) if name.endswith('.claim')]
+
+    def _write(self, path, record, mtime=None):
+        # 같은 폴더의 임시 파일에 쓴 뒤 이름 변경 (읽는 쪽이 쓰다 만 파일을 보지 않도록)
+        # mtime 을 주면 이름을 바꾸기 전에 수정 시각을 설정한다 (임대 만료 시각)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(_dumps(record))
+        if mtime is not None:
+            os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, path)
+
+    def _read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _parse(name):
+        # '{data_key}~{chunk_id}[@{worker}].json' -> (chunk_id, data_key, worker)
+        stem = name[:-len('.json')]
+        data_key, _, rest = stem.partition('~')
+        chunk_id, _, worker = rest.partition('@')
+        return chunk_id, data_key, worker
+
+    def _finished(self, chunk_id):
+        name = f"{chunk_id}.json"
+        return any(os.path.exists(self._path(state, name)) for state in ('done', 'collected', 'failed'))
+
+    def _leased_path(self, worker, chunk_id):
+        for name in self._names('leased'):
+            leased_id, _, owner = self._parse(name)
+            if leased_id == chunk_id and owner == worker:
+                return self._path('leased', name)
+        return None
+
+    def put(self, chunks):
+        existing = {self._parse(name)[0] for state in ('pending', 'leased') for name in self._names(state)}
+        existing.update(name[:-len('.json')] for state in ('done', 'collected', 'failed')
+                        for name in self._names(state))
+        added = 0
+        for chunk_id, data_key, payload in chunks:
+            if chunk_id in existing:
+                continue
+            record = {'chunk_id': chunk_id, 'data_key': data_key, 'payload': payload, 'attempts': 0,
+                      'error': None}
+            self._write(self._path('pending', f"{data_key}~{chunk_id}.json"), record)
+            added += 1
+        return added
+
+    def _claim(self, path):
+        """path 를 leased/ 의 숨은 파일로 옮겨 독점 (숨은 파일 경로, 다른 프로세스가 먼저 옮겼으면 None)"""
+        deadline = time.time() + self.CLAIM_SECONDS
+        claim = self._path('leased', f"{os.path.basename(path)}.{deadline:.0f}.{uuid.uuid4().hex}.claim")
+        try:
+            os.rename(path, claim)
+        except FileNotFoundError:
+            return None
+        return claim
+
+    def _recover_claims(self, now):
+        """만료 시각이 지난 숨은 파일(옮긴 프로세스가 중간에 종료됨)을 pending 으로 되돌림"""
+        for name in self._claims():
+            original, deadline, _, _ = name.rsplit('.', 3)
+            if float(deadline) >= now:
+                continue
+            chunk_id, data_key, _ = self._parse(original)
+            claim = self._path('leased', name)
+            with contextlib.suppress(FileNotFoundError):
+                if self._finished(chunk_id):
+                    os.remove(claim)
+                else:
+                    os.rename(claim, self._path('pending', f"{data_key}~{chunk_id}.json"))
+
+    def _release(self, path, error, max_attempts):
+        """임대 파일을 pending(또는 시도 횟수를 다 썼으면 failed)으로 되돌림 (다른 프로세스가 먼저 했으면 False)"""
+        claim = self._claim(path)
+        if claim is None:
+            return False
+        record = self._read(claim)
+        record['error'] = error
+        if record['attempts'] >= max_attempts:
+            self._write(self._path('failed', f"{record['chunk_id']}.json"), record)
+        else:
+            self._write(self._path('pending', f"{record['data_key']}~{record['chunk_id']}.json"), record)
+        os.remove(claim)
+        return True
+
+    def lease(self, worker, loaded=(), lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        now = time.time()
+        self._recover_claims(now)
+        busy = set()
+        for name in self._names('leased'):
+            path = self._path('leased', name)
+            try:
+                expired = os.path.getmtime(path) < now
+            except FileNotFoundError:
+                continue
+            if expired:
+                self._release(path, error='임대 시간 초과', max_attempts=max_attempts)
+            elif self._parse(name)[2] != worker:
+                busy.add(self._parse(name)[1])
+
+        candidates = [self._parse(name) + (name,) for name in self._names('pending')]
+        loaded = set(loaded)
+        until = now + lease_seconds
+        while candidates:
+            chosen = _pick(candidates, loaded, busy)
+            candidates.remove(chosen)
+            chunk_id, data_key, _, name = chosen
+            claim = self._claim(self._path('pending', name))
+            if claim is None:
+                continue  # 다른 워커가 먼저 임대
+            try:
+                if self._finished(chunk_id):
+                    # 완료 보고 직후 만료로 되돌려진 청크 (이미 결과가 있음)
+                    os.remove(claim)
+                    continue
+                record = self._read(claim)
+            except FileNotFoundError:
+                continue  # 숨은 파일이 만료되어 다른 워커가 되돌림
+            record['attempts'] += 1
+            # 만료 시각을 수정 시각으로 설정한 뒤 leased/ 에 보이게 함 (다른 워커가 만료된 임대로 보지 않도록)
+            self._write(self._path('leased', f"{data_key}~{chunk_id}@{worker}.json"), record, mtime=until)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(claim)
+            return chunk_id, data_key, record['payload']
+        return None
+
+    def heartbeat(self, worker, chunk_id, lease_seconds=LEASE_SECONDS):
+        path = self._leased_path(worker, chunk_id)
+        if path is None:
+            return False
+        until = time.time() + lease_seconds
+        try:
+            os.utime(path, (until, until))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def complete(self, worker, chunk_id, result):
+        path = self._leased_path(worker, chunk_id)
+        if path is None:
+            return False
+        try:
+            record = self._read(path)
+        except FileNotFoundError:
+            return False
+        record['result'] = result
+        self._write(self._path('done', f"{chunk_id}.json"), record)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        return True
+
+    def fail(self, worker, chunk_id, error, max_attempts=MAX_ATTEMPTS):
+        path = self._leased_path(worker, chunk_id)
+        if path is not None:
+            self._release(path, error, max_attempts)
+
+    def collect(self):
+        records = [self._read(self._path('done', name)) for name in sorted(self._names('done'))]
+        return [(record['chunk_id'], record['payload'], record['result']) for record in records]
+
+    def mark_collected(self, chunk_ids):
+        for chunk_id in chunk_ids:
+            os.replace(self._path('done', f"{chunk_id}.json"), self._path('collected', f"{chunk_id}.json"))
+
+    def counts(self):
+        counts = {state: len(self._names(state)) for state in self.STATES}
+        counts['leased'] += len(self._claims())  # 임대/반환 중인 청크
+        return {state: count for state, count in counts.items() if count}
+
+    def failures(self):
+        records = [self._read(self._path('failed', name)) for name in sorted(self._names('failed'))]
+        return [(record['chunk_id'], record['attempts'], record['error']) for record in records]
+
+    def reopen(self):
+        return FileQueue(self.root)
+
+# 'backend:경로' 형식의 큐 주소 -> 구현 클래스
+QUEUE_BACKENDS = {
+    'sqlite': SQLiteQueue,
+    'file': FileQueue,
+}
+
+def open_queue(url=DEFAULT_QUEUE):
+    """'sqlite:경로' 또는 'file:폴더' 주소의 큐 열기"""
+    backend, _, path = url.partition(':')
+    if backend not in QUEUE_BACKENDS or not path:
+        raise ValueError(f"지원하지 않는 큐 주소: {url} (사용 가능: {', '.join(QUEUE_BACKENDS)})")
+    return QUEUE_BACKENDS[backend](path)
+
+# ---------------------------------------------------------------- 데이터/실행 (워커)
+
+def data_key(strategy, dataset):
+    """전략 + 데이터 구간의 짧은 해시 (워커 캐시/지역성 배정 단위)"""
+    payload = json.dumps({'strategy': strategy, **dataset}, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:10]
+
+def load_dataset(strategy, dataset):
+    """데이터 구간의 매매 구간 캔들과 지표 배열 (캔들 전체로 계산한 뒤 매매 구간만 읽기 전용 뷰로 자름)"""
+    from array_views import readonly_view
+    from data_planner import load_candles, plan_candles
+    from incremental_backtest import STRATEGIES
+
+    instance = STRATEGIES[strategy]()
+    plan = plan_candles(dataset['start'], dataset['end'], instance, interval=dataset['interval'])
+    candles = load_candles(plan, dataset['symbol'])
+    first = candles.index.searchsorted(plan.window_start)
+    indicators = instance.indicator_arrays(readonly_view(candles['close'].to_numpy()))
+    return {'candles': candles.iloc[first:],
+            'indicators': {name: readonly_view(values[first:]) for name, values in indicators.items()}}
+
+def dataset_bytes(data):
+    return (int(data['candles'].memory_usage(deep=True).sum())
+            + sum(values.nbytes for values in data['indicators'].values()))
+
+def evaluate_cell(strategy, data, params, store_trades=False):
+    """파라미터 조합 하나 실행 (summary 는 sweep_summary, 거래가 없으면 None)"""
+    from backtest_result import run_array_backtest, sweep_summary
+    result = run_array_backtest(strategy, data['candles'], data['indicators'], **params)
+    return {
+        'params': params,
+        'summary': sweep_summary(result) if len(result) else None,
+        'trades': result.trade_list() if store_trades else None,
+    }
+
+class LeaseLost(Exception):
+    """하트비트에 실패해 청크 임대를 잃음 (다른 워커가 다시 실행)"""
+
+@contextlib.contextmanager
+def keep_lease(queue, worker, chunk_id, lease_seconds=LEASE_SECONDS, interval=HEARTBEAT_SECONDS):
+    """블록 실행 중 백그라운드 스레드에서 하트비트 (yield 한 Event 는 임대를 잃으면 set)
+
+    데이터 로드처럼 오래 걸리는 한 번의 호출 중에도 임대가 유지된다. 스레드는 queue.reopen() 으로 따로 연결한다.
+    """
+    lost = threading.Event()
+    stop = threading.Event()
+
+    def beat():
+        with queue.reopen() as connection:
+            while not stop.wait(interval):
+                try:
+                    alive = connection.heartbeat(worker, chunk_id, lease_seconds)
+                except (sqlite3.Error, OSError):
+                    continue  # 일시적인 잠금/파일 시스템 오류는 다음 하트비트에서 다시 시도
+                if not alive:
+                    lost.set()
+                    return
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{chunk_id}", daemon=True)
+    thread.start()
+    try:
+        yield lost
+    finally:
+        stop.set()
+        thread.join()
+
+def process_chunk(queue, worker, chunk_id, data_key_, payload, cache, lease_seconds=LEASE_SECONDS,
+                  heartbeat_interval=HEARTBEAT_SECONDS):
+    """청크 하나 실행 (데이터 로드부터 끝까지 keep_lease 로 하트비트, 임대를 잃으면 조합 사이에서 LeaseLost)"""
+    with keep_lease(queue, worker, chunk_id, lease_seconds, heartbeat_interval) as lost:
+        data = cache.get(data_key_)
+        loaded = data is None
+        if loaded:
+            data = load_dataset(payload['strategy'], payload['dataset'])
+            cache.put(data_key_, data, dataset_bytes(data))
+        cells = []
+        for params in payload['cells']:
+            if lost.is_set():
+                raise LeaseLost(chunk_id)
+            cells.append(evaluate_cell(payload['strategy'], data, params, payload.get('store_trades', False)))
+    if lost.is_set():
+        raise LeaseLost(chunk_id)
+    return {'worker': worker, 'loaded': loaded, 'cells': cells}
+
+def run_worker(queue, worker=None, memory_mb=WORKER_MEMORY_MB, max_datasets=8, lease_seconds=LEASE_SECONDS,
+               heartbeat_interval=HEARTBEAT_SECONDS, poll_interval=POLL_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """큐에 남은 청크가 없을 때까지 임대/실행/보고 반복
+
+    Returns:
+        int: 완료 보고한 청크 수
+    """
+    worker = worker or default_worker_id()
+    cache = LRUCache(int(memory_mb * 1024 ** 2), max_datasets)
+    completed = 0
+    while True:
+        leased = queue.lease(worker, loaded=list(cache.entries), lease_seconds=lease_seconds,
+                             max_attempts=max_attempts)
+        if leased is None:
+            counts = queue.counts()
+            if not counts.get('pending') and not counts.get('leased'):
+                return completed
+            time.sleep(poll_interval)  # 다른 워커의 임대가 끝나거나 만료되기를 기다림
+            continue
+        chunk_id, key, payload = leased
+        try:
+            result = process_chunk(queue, worker, chunk_id, key, payload, cache, lease_seconds,
+                                   heartbeat_interval)
+        except LeaseLost:
+            continue
+        except Exception as e:
+            queue.fail(worker, chunk_id, f"{type(e).__name__}: {e}", max_attempts)
+            continue
+        if queue.complete(worker, chunk_id, result):
+            completed += 1
+
+def _worker_process(queue_url, worker, options):
+    with open_queue(queue_url) as queue:
+        run_worker(queue, worker, **options)
+
+# ---------------------------------------------------------------- 코디네이터
+
+def make_datasets(periods, symbol="KRW-BTC", interval="minute10"):
+    """'YYYYMMDD:YYYYMMDD' 목록을 데이터 구간 dict 목록으로 변환"""
+    datasets = []
+    for period in periods:
+        start, end = period.split(':')
+        datasets.append({'symbol': symbol, 'interval': interval, 'start': start, 'end': end})
+    return datasets
+
+def dataset_labels(dataset):
+    return {'symbol': dataset['symbol'], 'interval': dataset['interval'],
+            'period': f"{dataset['start']}:{dataset['end']}"}
+
+def result_params(dataset, params):
+    """결과 저장소 키에 쓰는 조합 (데이터 구간 포함)"""
+    return {**params, **dataset_labels(dataset)}
+
+def submit(queue, job, strategy, datasets, param_grid=None, chunk_size=CHUNK_SIZE, checkpoint=None,
+           store_trades=False):
+    """데이터 구간별로 파라미터 조합을 chunk_size 개씩 묶어 큐에 추가
+
+    checkpoint(SweepCheckpoint)에 이미 결과가 있는 조합은 제외한다.
+
+    Returns:
+        int: 새로 추가한 청크 수
+    """
+    grid = {name: [v.item() if isinstance(v, np.generic) else v for v in values]
+            for name, values in (param_grid or DEFAULT_GRID).items()}
+    done = checkpoint.completed() if checkpoint is not None else set()
+    chunks = []
+    for dataset in datasets:
+        key = data_key(strategy, dataset)
+        cells = [params for params in iter_grid(grid)
+                 if cell_key(result_params(dataset, params)) not in done]
+        for number, first in enumerate(range(0, len(cells), chunk_size)):
+            payload = {'job': job, 'strategy': strategy, 'dataset': dataset,
+                       'cells': cells[first:first + chunk_size], 'store_trades': store_trades}
+            chunks.append((f"{job}-{key}-{number:04d}", key, payload))
+    return queue.put(chunks)
+
+def collect(queue, checkpoint, store=None):
+    """완료된 청크의 결과를 결과 저장소(체크포인트)와 거래 저장소에 기록하고 collected 로 표시
+
+    체크포인트는 이미 있는 조합을 무시하고 거래 저장소는 같은 run_id 를 덮어쓰므로 여러 번 모아도 결과가 같다.
+
+    Returns:
+        dict: 워커별 {'chunks': 청크 수, 'loads': 데이터 로드 수}
+    """
+    from trade_store import SWEEP_RUN, params_hash
+    workers = {}
+    for chunk_id, payload, result in queue.collect():
+        dataset = payload['dataset']
+        for cell in result['cells']:
+            summary = cell['summary'] and {**cell['summary'], **dataset_labels(dataset)}
+            checkpoint.add(result_params(dataset, cell['params']), summary)
+            if store is not None and cell['trades'] is not None:
+                run_id = f"{payload['job']}_{dataset['start']}_{dataset['end']}_{params_hash(cell['params'])}"
+                store.write_run(cell['trades'], payload['strategy'], params=cell['params'],
+                                symbol=dataset['symbol'], interval=dataset['interval'], run_id=run_id,
+                                kind=SWEEP_RUN)
+        checkpoint.flush()
+        queue.mark_collected([chunk_id])
+        stats = workers.setdefault(result['worker'], {'chunks': 0, 'loads': 0})
+        stats['chunks'] += 1
+        stats['loads'] += result['loaded']
+    return workers
+
+def coordinate(queue, checkpoint, store=None, poll_interval=POLL_SECONDS, processes=()):
+    """남은 청크가 없을 때까지 결과를 모음 (processes: 같이 기다릴 로컬 워커 프로세스)
+
+    Returns:
+        dict: 워커별 처리 청크/데이터 로드 수
+    """
+    workers = {}
+    while True:
+        for worker, stats in collect(queue, checkpoint, store).items():
+            total = workers.setdefault(worker, {'chunks': 0, 'loads': 0})
+            total['chunks'] += stats['chunks']
+            total['loads'] += stats['loads']
+        counts = queue.counts()
+        if not counts.get('pending') and not counts.get('leased') and not counts.get('done'):
+            return workers
+        if processes and not any(process.is_alive() for process in processes):
+            print("경고: 모든 로컬 워커가 종료되었지만 남은 청크가 있습니다.")
+            return workers
+        time.sleep(poll_interval)
+
+def run_local(strategy, datasets, param_grid=None, workers=2, queue_url=None, checkpoint_path=None,
+              store_trades=False, chunk_size=CHUNK_SIZE, worker_options=None):
+    """코디네이터 + 로컬 워커 프로세스 workers 개 (각 프로세스가 노드 하나 역할)
+
+    Returns:
+        list: 결과 저장소의 결과 dict 목록
+    """
+    job = f"{strategy}_{time.strftime('%Y%m%d_%H%M%S')}"
+    queue_url = queue_url or f"sqlite:{job}_queue.db"
+    checkpoint_path = checkpoint_path or f"{job}_results.db"
+    with open_queue(queue_url) as queue, SweepCheckpoint(checkpoint_path) as checkpoint:
+        added = submit(queue, job, strategy, datasets, param_grid, chunk_size, checkpoint, store_trades)
+        print(f"청크 {added}개 추가 ({queue_url}), 워커 {workers}개 시작")
+        processes = [multiprocessing.Process(target=_worker_process,
+                                             args=(queue_url, f"{default_worker_id()}-w{i}", worker_options or {}))
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+        store = None
+        if store_trades:
+            from trade_store import TradeStore
+            store = TradeStore()
+        try:
+            stats = coordinate(queue, checkpoint, store, processes=processes)
+        finally:
+            if store is not None:
+                store.close()
+            for process in processes:
+                process.join()
+        print_status(queue, stats)
+        return [result for result in checkpoint.results().values() if result is not None]
+
+def print_status(queue, workers=None):
+    counts = queue.counts()
+    print("청크 상태: " + ", ".join(f"{state} {count}" for state, count in sorted(counts.items())))
+    for worker, stats in sorted((workers or {}).items()):
+        print(f"  {worker}: 청크 {stats['chunks']}개, 데이터 로드 {stats['loads']}회")
+    for chunk_id, attempts, error in queue.failures():
+        print(f"  실패: {chunk_id} (임대 {attempts}회) {error}")
+
+def print_top(results, top=10):
+    import pandas as pd
+    if not results:
+        print("결과가 없습니다.")
+        return
+    df = pd.DataFrame(results).sort_values('total_profit_ratio', ascending=False)
+    print(f"\n=== 상위 {min(top, len(df))}개 파라미터 조합 ===")
+    print(df.head(top).to_string(index=False))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="작업 큐로 나눠 실행하는 파라미터 스윕")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_job_arguments(command):
+        command.add_argument('--strategy', choices=sorted(DEFAULT_INTERVALS), default='ma')
+        command.add_argument('--period', action='append', default=[],
+                             help="YYYYMMDD:YYYYMMDD (여러 번 지정 가능, 기본: 20250101:20250131)")
+        command.add_argument('--symbol', default="KRW-BTC")
+        command.add_argument('--interval', help="기본: 전략별 간격")
+        command.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        command.add_argument('--checkpoint', help="결과 저장소 (스윕 체크포인트 파일)")
+        command.add_argument('--store-trades', action='store_true', help="조합별 거래 내역을 거래 저장소에 기록")
+
+    run = commands.add_parser('run', help="로컬 워커 프로세스로 실행 (코디네이터 포함)")
+    add_job_arguments(run)
+    run.add_argument('--queue', help="큐 주소 (기본: sqlite:<작업>_queue.db)")
+    run.add_argument('--workers', type=int, default=2)
+    run.add_argument('--top', type=int, default=10)
+
+    submit_command = commands.add_parser('submit', help="청크를 큐에 추가")
+    add_job_arguments(submit_command)
+    submit_command.add_argument('--queue', default=DEFAULT_QUEUE)
+    submit_command.add_argument('--job', help="작업 이름 (기본: 전략_시각)")
+
+    worker = commands.add_parser('worker', help="큐의 청크 실행 (노드마다 실행)")
+    worker.add_argument('--queue', default=DEFAULT_QUEUE)
+    worker.add_argument('--memory-mb', type=float, default=WORKER_MEMORY_MB, help="캔들/지표 캐시 한도 (MB)")
+    worker.add_argument('--lease', type=float, default=LEASE_SECONDS, help="임대 시간 (초)")
+    worker.add_argument('--heartbeat', type=float, default=HEARTBEAT_SECONDS, help="하트비트 간격 (초)")
+
+    collect_command = commands.add_parser('collect', help="완료된 결과를 저장소에 모음 (남은 청크가 없을 때까지)")
+    collect_command.add_argument('--queue', default=DEFAULT_QUEUE)
+    collect_command.add_argument('--checkpoint', required=True)
+    collect_command.add_argument('--store-trades', action='store_true', help="거래 내역도 거래 저장소에 기록")
+    collect_command.add_argument('--top', type=int, default=10)
+
+    status = commands.add_parser('status', help="청크 상태")
+    status.add_argument('--queue', default=DEFAULT_QUEUE)
+    args = parser.parse_args(argv)
+
+    if args.command in ('run', 'submit'):
+        datasets = make_datasets(args.period or ['20250101:20250131'], args.symbol,
+                                 args.interval or DEFAULT_INTERVALS[args.strategy])
+    if args.command == 'run':
+        print_top(run_local(args.strategy, datasets, workers=args.workers, queue_url=args.queue,
+                            checkpoint_path=args.checkpoint, store_trades=args.store_trades,
+                            chunk_size=args.chunk_size), args.top)
+    elif args.command == 'submit':
+        job = args.job or f"{args.strategy}_{time.strftime('%Y%m%d_%H%M%S')}"
+        with open_queue(args.queue) as queue, contextlib.ExitStack() as stack:
+            checkpoint = args.checkpoint and stack.enter_context(SweepCheckpoint(args.checkpoint))
+            added = submit(queue, job, args.strategy, datasets, chunk_size=args.chunk_size,
+                           checkpoint=checkpoint or None, store_trades=args.store_trades)
+        print(f"작업 {job}: 청크 {added}개 추가 ({args.queue})")
+    elif args.command == 'worker':
+        with open_queue(args.queue) as queue:
+            completed = run_worker(queue, memory_mb=args.memory_mb, lease_seconds=args.lease,
+                                   heartbeat_interval=args.heartbeat)
+        print(f"청크 {completed}개 완료")
+    elif args.command == 'collect':
+        from trade_store import TradeStore
+        with open_queue(args.queue) as queue, SweepCheckpoint(args.checkpoint) as checkpoint, \
+                contextlib.ExitStack() as stack:
+            store = stack.enter_context(TradeStore()) if args.store_trades else None
+            print_status(queue, coordinate(queue, checkpoint, store))
+            print_top([result for result in checkpoint.results().values() if result is not None], args.top)
+    else:
+        with open_queue(args.queue) as queue:
+            print_status(queue)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# 그래프용 시계열 다운샘플링
+# 봉 단위 자산 곡선처럼 점이 수백만 개인 시계열을 그대로 그리면 matplotlib 렌더링 시간과 파일 크기가 데이터 크기에
+# 비례해 커진다. 축의 가로 픽셀 수 정도로 점 수를 줄이되, 구간별 최소/최대(minmax) 또는
+# LTTB(Largest-Triangle-Three-Buckets) 로 눈에 보이는 극값과 모양을 유지한다.
+# 모든 함수는 원래 순서의 선택된 위치(index 배열)를 반환하므로 날짜/값 자료형이 그대로 유지된다.
+import numpy as np
+
+def _as_float(values):
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+def _bucket_edges(n, n_buckets):
+    # 처음/마지막 점을 뺀 1 ~ n-1 구간을 n_buckets 개로 균등 분할
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+def minmax_indices(y, n_out):
+    """구간별 최소/최대 위치 (처음/마지막 점 포함, n_out >= 4 이면 최대 n_out 개)
+
+    각 구간의 최소값과 최대값을 모두 남기므로 선 그래프의 위아래 극값이 그대로 보인다.
+    """
+    y = _as_float(y)
+    n = len(y)
+    if n <= max(n_out, 2):
+        return np.arange(n)
+    n_buckets = max((n_out - 2) // 2, 1)
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1][edges[:-1] < edges[1:]]
+    bucket = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n - 1)))
+    inner = y[1:n - 1]
+
+    # 구간 최소/최대값과 같은 첫 위치 (정렬 없이 O(n))
+    picks = [np.array([0, n - 1])]
+    for reduce in (np.minimum, np.maximum):
+        extreme = reduce.reduceat(inner, starts - 1)
+        hits = np.flatnonzero(inner == extreme[bucket])
+        first = np.searchsorted(bucket[hits], np.arange(len(starts)))
+        picks.append(hits[first[first < len(hits)]] + 1)
+    return np.unique(np.concatenate(picks))
+
+def lttb_indices(x, y, n_out):
+    """LTTB 로 고른 n_out 개 위치 (처음/마지막 점 포함)
+
+    각 구간에서 직전 선택 점, 다음 구간 평균 점과 만드는 삼각형 넓이가 가장 큰 점을 고른다.
+    """
+    x = _as_float(x)
+    y = _as_float(y)
+    n = len(y)
+    if n <= max(n_out, 2):
+        return np.arange(n)
+    n_buckets = max(n_out - 2, 1)
+    edges = _bucket_edges(n, n_buckets)
+
+    # 다음 구간 평균 (마지막 구간은 마지막 점)
+    x_sum = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    y_sum = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.maximum(np.diff(edges), 1)
+    x_mean = np.append((x_sum / sizes)[1:], x[-1])
+    y_mean = np.append((y_sum / sizes)[1:], y[-1])
+
+    selected = np.empty(n_buckets + 2, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_buckets):
+        start, stop = edges[i], max(edges[i + 1], edges[i] + 1)
+        # 삼각형 넓이 x 2 (부호 제외)
+        area = np.abs((x[previous] - x_mean[i]) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (y_mean[i] - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return np.unique(selected)
+
+def downsample_indices(x, y, n_out, method='minmax'):
+    """method('minmax' 또는 'lttb') 로 고른 최대 n_out 개 위치"""
+    if method == 'minmax':
+        return minmax_indices(y, n_out)
+    if method == 'lttb':
+        return lttb_indices(x, y, n_out)
+    raise ValueError(f"지원하지 않는 다운샘플링 방법: {method}")
+
+def downsample(x, y, n_out, method='minmax'):
+    """(x, y) 시계열을 최대 n_out 개 점으로 줄인 (x, y) 배열 (NaN 은 제외)"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    valid = ~np.isnan(_as_float(y))
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    index = downsample_indices(x, y, n_out, method)
+    return x[index], y[index]
+
+def axes_pixel_width(ax, dpi):
+    """dpi 로 저장할 때 축의 가로 픽셀 수"""
+    return max(int(ax.get_position().width * ax.figure.get_figwidth() * dpi), 2)
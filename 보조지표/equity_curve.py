@@ -0,0 +1,109 @@
+# 복리 평가 자산 곡선(equity curve)과 낙폭(drawdown) 계산
+# 거래 내역과 캔들로 봉마다 (청산된 거래의 복리 수익) x (보유 중인 포지션의 평가 손익)을 계산한다.
+# 여러 스윕 설정의 곡선은 (설정 수 x 봉 수) 행렬에 설정 하나씩 계산해 채운다.
+import numpy as np
+import pandas as pd
+
+POSITION_SIGN = {'long': 1.0, 'short': -1.0}
+
+def trades_frame(trades):
+    """거래 내역(전략의 dict 목록 또는 저장소 조회 결과)을 표준 컬럼의 데이터프레임으로 변환
+
+    청산되지 않은 거래는 exit_time 이 NaT 이며 마지막 봉까지 평가 손익으로 반영된다.
+    """
+    df = pd.DataFrame(trades)
+    df = df.rename(columns={'entry_date': 'entry_time', 'exit_date': 'exit_time'})
+    for column in ['entry_time', 'exit_time', 'entry_price', 'exit_price']:
+        if column not in df:
+            df[column] = np.nan
+    df['entry_time'] = pd.to_datetime(df['entry_time'])
+    df['exit_time'] = pd.to_datetime(df['exit_time'])
+    return df.sort_values('entry_time', kind='stable').reset_index(drop=True)
+
+def with_open_position(trades, strategy):
+    """청산된 거래 목록 뒤에 전략이 아직 보유 중인 포지션(청산 전 거래)을 덧붙인 목록"""
+    trades = list(trades)
+    if strategy.position is not None:
+        trades.append({'position': strategy.position, 'entry_date': strategy.entry_date,
+                       'entry_price': strategy.entry_price})
+    return trades
+
+def compound_returns(ratios):
+    """거래별 수익률(비율)의 복리 누적 수익률 (단순 합산 cumsum 대신 사용)"""
+    return np.cumprod(1 + np.asarray(ratios, dtype=np.float64)) - 1
+
+def equity_matrix(trade_sets, candles, initial=1.0, dtype=np.float64):
+    """여러 실행(설정)의 봉별 복리 평가 자산 행렬 계산
+
+    실행 하나씩 결과 행에 채우므로 임시 배열은 실행 수와 관계없이 봉 수 크기 배열 3개다.
+
+    Args:
+        trade_sets: 실행별 거래 내역 목록 (각각 trades_frame 으로 변환 가능한 형식)
+        candles: 'close' 컬럼과 시각 index 를 가진 캔들 데이터프레임
+
+    Returns:
+        np.ndarray: (실행 수, 봉 수) 자산 행렬
+    """
+    times = candles.index.values
+    close = candles['close'].to_numpy(dtype=np.float64)
+    n_bars = len(times)
+    bars = np.arange(n_bars)
+    equity = np.empty((len(trade_sets), n_bars), dtype=dtype)
+    gather = np.empty(n_bars)
+    values = np.empty(n_bars)
+
+    for row, trades in enumerate(trade_sets):
+        trades = trades_frame(trades)
+        if trades.empty:
+            equity[row] = initial
+            continue
+        sign = trades['position'].map(POSITION_SIGN).to_numpy(dtype=np.float64)
+        entry_price = trades['entry_price'].to_numpy(dtype=np.float64)
+        exit_price = trades['exit_price'].to_numpy(dtype=np.float64)
+        # 진입/청산 시각을 봉 위치로 변환 (청산되지 않은 거래는 n_bars)
+        entry_pos = np.searchsorted(times, trades['entry_time'].values, side='left')
+        exit_times = trades['exit_time'].values
+        exit_pos = np.where(pd.isna(exit_times), n_bars,
+                            np.searchsorted(times, exit_times, side='left'))
+
+        # 거래 직전/직후의 복리 누적 계수 (청산되지 않은 거래는 1)
+        factor = np.where(np.isnan(exit_price), 1.0, 1 + sign * (exit_price - entry_price) / entry_price)
+        after = np.cumprod(factor)
+        before = np.concatenate([[1.0], after[:-1]])
+
+        # 구간: 첫 진입 전(1), 거래마다 보유 구간(진입 ~ 청산 전, 평가 손익)과 청산 후 구간(after)
+        # 모든 구간을 base * (1 + sign * (close - entry) / entry) 로 계산 (보유하지 않은 구간은 sign 0)
+        n = len(trades)
+        seg_start = np.concatenate([[0], np.column_stack([entry_pos, exit_pos]).ravel()])
+        seg_base = np.concatenate([[1.0], np.column_stack([before, after]).ravel()])
+        seg_sign = np.concatenate([[0.0], np.column_stack([sign, np.zeros(n)]).ravel()])
+        seg_entry = np.concatenate([[1.0], np.column_stack([entry_price, np.ones(n)]).ravel()])
+
+        # 각 봉이 속한 구간 (같은 봉에서 시작하는 구간이 여럿이면 마지막 구간)
+        segment = np.searchsorted(seg_start, bars, side='right')
+        segment -= 1
+        np.subtract(close, np.take(seg_entry, segment, out=gather), out=values)
+        values *= np.take(seg_sign, segment, out=gather)
+        values /= np.take(seg_entry, segment, out=gather)
+        values += 1
+        values *= np.take(seg_base, segment, out=gather)
+        values *= initial
+        equity[row] = values
+
+    return equity
+
+def equity_curve(trades, candles, initial=1.0):
+    """거래 내역 하나의 봉별 복리 평가 자산 곡선 (pd.Series)"""
+    return pd.Series(equity_matrix([trades], candles, initial=initial)[0],
+                     index=candles.index, name='equity')
+
+def drawdown_matrix(equity):
+    """자산 행렬(실행 x 봉)의 봉별 낙폭 (running peak 대비, 0 이하 비율)"""
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    peak = np.maximum.accumulate(equity, axis=1)
+    return equity / peak - 1
+
+def max_drawdown(equity):
+    """자산 곡선(1차원) 또는 행렬(실행 x 봉)의 최대 낙폭 (음수 비율)"""
+    drawdown = drawdown_matrix(equity).min(axis=1)
+    return drawdown[0] if np.ndim(equity) == 1 else drawdown
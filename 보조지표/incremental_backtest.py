@@ -0,0 +1,164 @@
+# 증분 백테스트: 전략 상태와 지표 꼬리(tail)를 파일로 저장해 두고
+# 새로 생긴 캔들만으로 기존 거래 내역을 이어서 계산 (전체 재실행과 같은 결과)
+import os
+import pickle
+
+import pandas as pd
+
+from bb_indicators_trade import BollingerBandStrategy
+from compact_dtypes import compact_candles
+from cross_indicators_trade import CrossStrategy
+from data_planner import INTERVAL_MINUTES, get_ohlcv
+from indicators import rsi
+from ma_indicators_trade import MAStrategy
+from trade_store import INCREMENTAL_RUN, TradeStore
+
+STRATEGIES = {
+    'bb': BollingerBandStrategy,
+    'ma': MAStrategy,
+    'cross': CrossStrategy,
+}
+
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+def closed_trades(strategy):
+    """전략이 지금까지 청산한 거래 목록 (청산 순서)"""
+    if isinstance(strategy, CrossStrategy):
+        return [trade for trade in strategy.trades if 'exit_date' in trade]
+    return strategy.trade_history
+
+def calculate_indicators(strategy, df, rsi_state=None):
+    """전략에 맞는 지표 계산 (rsi_state: 크로스 전략의 df 첫 봉 직전까지의 RSI 상태)"""
+    if isinstance(strategy, BollingerBandStrategy):
+        return strategy.calculate_bollinger_bands(df)
+    if isinstance(strategy, CrossStrategy):
+        return strategy.calculate_indicators(df, rsi_state=rsi_state)
+    return strategy.calculate_indicators(df)
+
+class IncrementalBacktest:
+    """전략 상태 + 지표 계산에 필요한 마지막 캔들(tail)을 유지하며 백테스트를 이어가는 실행기
+
+    tail 은 전략의 required_lookback() 개 원본 캔들이며, 이동평균/볼린저 밴드는 window 단위로
+    계산되므로 tail + 새 캔들로 다시 계산해도 값이 같다. 크로스 전략의 RSI 는 tail 첫 봉 직전까지의
+    지수이동평균 상태를 함께 저장해 이어서 계산한다.
+    """
+
+    def __init__(self, name, strategy=None):
+        self.name = name
+        self.strategy = strategy if strategy is not None else STRATEGIES[name]()
+        self.lookback = self.strategy.required_lookback()
+        self.tail = None
+        self.rsi_state = None  # tail 첫 봉 직전까지의 RSI 상태 (크로스 전략)
+        self.last_time = None
+
+    def _calculate(self, df):
+        return calculate_indicators(self.strategy, df, rsi_state=self.rsi_state)
+
+    def _execute(self, df, resume):
+        return self.strategy.execute_strategy(df, resume=resume)
+
+    def _keep_tail(self, candles):
+        """다음 실행을 위해 마지막 lookback 개 캔들과 그 직전까지의 RSI 상태 저장"""
+        cut = max(len(candles) - self.lookback, 0)
+        if isinstance(self.strategy, CrossStrategy) and cut > 0:
+            _, self.rsi_state = rsi(candles['close'].iloc[:cut], state=self.rsi_state)
+        self.tail = candles.iloc[cut:].copy()
+        self.last_time = candles.index[-1]
+
+    def run(self, candles, start=None):
+        """최초 실행: candles 전체로 지표를 계산하고 start 이후 구간을 매매
+
+        Returns:
+            list: 이번 실행에서 청산된 거래 목록
+        """
+        candles = candles[CANDLE_COLUMNS]
+        df = self._calculate(candles.copy())
+        if start is not None:
+            df = df[df.index >= start]
+        self._execute(df, resume=False)
+        self._keep_tail(candles)
+        return list(closed_trades(self.strategy))
+
+    def extend(self, new_candles):
+        """새 캔들로 이어서 실행 (이미 처리한 시각 이전의 캔들은 무시)
+
+        Returns:
+            list: 이번 실행에서 새로 청산된 거래 목록
+        """
+        new_candles = new_candles[new_candles.index > self.last_time][CANDLE_COLUMNS]
+        if new_candles.empty:
+            return []
+        closed_before = len(closed_trades(self.strategy))
+
+        combined = pd.concat([self.tail, new_candles])
+        df = self._calculate(combined.copy())
+        self._execute(df.iloc[len(self.tail):], resume=True)
+        self._keep_tail(combined)
+        return closed_trades(self.strategy)[closed_before:]
+
+    def save(self, path):
+        """전략 상태와 tail 을 파일로 저장 (임시 파일에 쓴 뒤 교체하므로 중간에 종료되어도 기존 파일이 남음)"""
+        state = {
+            'name': self.name,
+            'strategy': self.strategy.get_state(),
+            'tail': self.tail,
+            'rsi_state': self.rsi_state,
+            'last_time': self.last_time,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """save() 로 저장한 파일에서 실행기 복원"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        backtest = cls(state['name'])
+        backtest.strategy.set_state(state['strategy'])
+        backtest.tail = state['tail']
+        backtest.rsi_state = state['rsi_state']
+        backtest.last_time = state['last_time']
+        return backtest
+
+def fetch_closed_candles(ticker, interval, since):
+    """since 이후 마감된 캔들만 받아오기 (아직 진행 중인 마지막 봉은 제외)"""
+    bar = pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+    now_kst = pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None)
+    count = int((now_kst - since) / bar) + 1
+    df = get_ohlcv(ticker, count=count, interval=interval)
+    return compact_candles(df[(df.index > since) & (df.index + bar <= now_kst)])
+
+def main():
+    # 볼린저 밴드 전략 일일 갱신: 상태 파일이 있으면 새 캔들만 이어서 계산
+    state_path = 'bb_incremental_state.pkl'
+    run_id = 'bb_incremental'
+    ticker = "KRW-BTC"
+    interval = "minute5"
+
+    with TradeStore() as store:
+        if os.path.exists(state_path):
+            backtest = IncrementalBacktest.load(state_path)
+            new_trades = backtest.extend(fetch_closed_candles(ticker, interval, backtest.last_time))
+            # 새로 청산된 거래만 저장소의 기존 실행 뒤에 추가
+            # (상태 파일 저장 전에 종료되면 다음 실행이 같은 거래를 다시 추가하지만 저장소가 건너뜀)
+            store.append_trades(run_id, new_trades)
+        else:
+            start = pd.Timestamp("20250101" + "0900")
+            backtest = IncrementalBacktest('bb')
+            warmup_start = start - backtest.lookback * pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+            candles = fetch_closed_candles(ticker, interval, warmup_start - pd.Timedelta(minutes=1))
+            new_trades = backtest.run(candles, start=start)
+            store.write_run(new_trades, 'bb', interval=interval, symbol=ticker, run_id=run_id,
+                            kind=INCREMENTAL_RUN,
+                            params={'take_profit': backtest.strategy.take_profit,
+                                    'stop_loss': backtest.strategy.stop_loss})
+    backtest.save(state_path)
+    print(f"새로 청산된 거래 {len(new_trades)}건을 저장소({run_id})에 추가했습니다. "
+          f"(마지막 캔들: {backtest.last_time}, 현재 포지션: {backtest.strategy.position})")
+
+if __name__ == "__main__":
+    main()
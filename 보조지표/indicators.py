@@ -0,0 +1,95 @@
+# 보조지표 계산 함수 (ta 라이브러리와 같은 공식)
+# 이동평균/표준편차는 각 봉의 window 구간만으로 계산하므로 데이터를 어디서 잘라 계산해도
+# 결과가 완전히 같고, RSI 는 지수이동평균 상태(state)를 넘겨 이어서 계산할 수 있다.
+# (pandas rolling 은 앞쪽 데이터에 따라 마지막 자리 오차가 달라져 증분/분할 계산과 일치하지 않음)
+import numpy as np
+import pandas as pd
+
+def rolling_mean(values, window):
+    """각 봉의 직전 window 개 평균 (앞쪽 window-1 개는 NaN)"""
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n >= window:
+        m = n - window + 1
+        total = x[:m].copy()
+        for k in range(1, window):
+            total += x[k:k + m]
+        out[window - 1:] = total / window
+    return out
+
+def rolling_std(values, window, mean=None):
+    """각 봉의 직전 window 개 모표준편차 (ddof=0, 앞쪽 window-1 개는 NaN)"""
+    x = np.asarray(values, dtype=np.float64)
+    if mean is None:
+        mean = rolling_mean(x, window)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n >= window:
+        m = n - window + 1
+        center = mean[window - 1:]
+        total = np.zeros(m)
+        for k in range(window):
+            d = x[k:k + m] - center
+            total += d * d
+        out[window - 1:] = np.sqrt(total / window)
+    return out
+
+def sma(close, window):
+    """단순 이동평균 (ta.trend.SMAIndicator 와 같은 공식)"""
+    return rolling_mean(close, window)
+
+def bollinger_bands(close, window=30, num_std=3):
+    """볼린저 밴드 상단/중간/하단/폭 (ta.volatility.BollingerBands 와 같은 공식)"""
+    middle = rolling_mean(close, window)
+    std = rolling_std(close, window, mean=middle)
+    upper = middle + num_std * std
+    lower = middle - num_std * std
+    width = (upper - lower) / middle * 100
+    return upper, middle, lower, width
+
+def rsi(close, window=14, state=None):
+    """RSI (ta.momentum.RSIIndicator 와 같은 공식)
+
+    state 는 close 첫 봉 직전까지의 지수이동평균 상태이며, 없으면 close 첫 봉부터 새로 계산한다.
+
+    Returns:
+        tuple: (RSI 배열, close 마지막 봉까지의 상태 dict)
+    """
+    close = pd.Series(np.asarray(close, dtype=np.float64))
+    if len(close) == 0:
+        return np.array([]), state
+
+    diff = close.diff(1)
+    nobs = 0
+    if state is not None:
+        diff.iloc[0] = close.iloc[0] - state['close']
+        nobs = state['nobs']
+    up_direction = diff.where(diff > 0, 0.0)
+    down_direction = -diff.where(diff < 0, 0.0)
+
+    if state is not None:
+        # 직전 지수이동평균 값을 첫 원소로 두면 adjust=False 점화식이 그대로 이어진다
+        up_direction = pd.concat([pd.Series([state['emaup']]), up_direction], ignore_index=True)
+        down_direction = pd.concat([pd.Series([state['emadn']]), down_direction], ignore_index=True)
+    emaup = up_direction.ewm(alpha=1 / window, min_periods=0, adjust=False).mean().to_numpy()
+    emadn = down_direction.ewm(alpha=1 / window, min_periods=0, adjust=False).mean().to_numpy()
+    if state is not None:
+        emaup = emaup[1:]
+        emadn = emadn[1:]
+
+    # emadn 이 0 또는 아주 작은 값(비정규 수)이면 나눗셈이 inf/overflow 가 되지만 결과는 100 으로 같다
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        relative_strength = emaup / emadn
+        values = np.where(emadn == 0, 100, 100 - (100 / (1 + relative_strength)))
+    # 관측치가 window 개 미만인 구간은 ta 와 같이 NaN
+    counts = nobs + np.arange(1, len(close) + 1)
+    values[counts < window] = np.nan
+
+    new_state = {
+        'close': float(close.iloc[-1]),
+        'emaup': float(emaup[-1]),
+        'emadn': float(emadn[-1]),
+        'nobs': int(counts[-1]),
+    }
+    return values, new_state
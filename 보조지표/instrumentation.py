@@ -0,0 +1,307 @@
+# 단계별 실행 시간/카운터 계측 (선택 기능)
+# phase() 컨텍스트 매니저와 @timed 데코레이터로 데이터 조회, 지표 계산, 매매 루프, 출력, 저장, 그래프 단계의
+# 시간을 재고, count()/count_loop() 로 처리한 봉/진입/청산 횟수를 센다. 계측이 꺼져 있으면 전역 변수 하나만 확인하고
+# 바로 실행하므로 추가 비용이 거의 없다.
+#
+# 환경변수 BACKTEST_PROFILE=<폴더> (또는 1 이면 현재 폴더)로 실행하면 종료 시 profile_<스크립트>_<시각>.json 을
+# 저장하고, BACKTEST_PROFILE_SAMPLE=<밀리초> 를 함께 주면 샘플링 프로파일러의 folded stack 파일
+# (flamegraph.pl / speedscope 입력)도 저장한다.
+# BACKTEST_PROFILE_MEMORY=1 이면 메모리 모드로 실행해 단계가 끝날 때마다 RSS/최대 RSS 와 tracemalloc
+# 스냅샷을 기록하고, 직전 단계 이후 메모리가 가장 많이 늘어난 코드 줄을 프로파일에 남긴다.
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 활성화된 Profile (None 이면 계측 꺼짐)
+_PROFILE = None
+
+_NULL_PHASE = contextlib.nullcontext()
+
+# 메모리 스냅샷에서 제외할 계측 자체의 할당
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+]
+
+def peak_rss():
+    """현재 프로세스의 최대 RSS (bytes, 측정할 수 없으면 None)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 는 bytes, Linux 는 KB
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def reset_peak_rss():
+    """최대 RSS 를 현재 RSS 로 초기화 (Linux 의 /proc/self/clear_refs, 초기화하지 못하면 False)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+def current_rss():
+    """현재 프로세스의 RSS (bytes, Linux 의 /proc 이 없으면 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class Sampler:
+    """대상 스레드의 호출 스택을 일정 간격으로 기록하는 샘플링 프로파일러 (folded stack 출력)"""
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                stack = ';'.join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def write_folded(self, path):
+        """'함수;함수;... 샘플 수' 형식(folded stack)으로 저장"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, samples in sorted(self.stacks.items()):
+                f.write(f"{stack} {samples}\n")
+        return path
+
+class Profile:
+    """실행 한 번의 단계별 시간과 카운터"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.phases = {}  # 단계 이름 -> [호출 횟수, 누적 초]
+        self.counters = {}
+        self.sampler = None
+        self.memory = None  # 메모리 모드: 단계 경계별 기록 목록
+        self.top_lines = 10
+        self._snapshot = None
+
+    def start_memory(self, top_lines=10):
+        """메모리 모드 시작 (tracemalloc 추적 시작)"""
+        self.memory = []
+        self.top_lines = top_lines
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        tracemalloc.reset_peak()
+
+    def checkpoint(self, label):
+        """단계 경계의 메모리 기록 (RSS, tracemalloc 현재/구간 최대, 직전 경계 이후 많이 늘어난 코드 줄)"""
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        growth = [stat for stat in snapshot.compare_to(self._snapshot, 'lineno') if stat.size_diff > 0]
+        growth.sort(key=lambda stat: -stat.size_diff)
+        self.memory.append({
+            'phase': label,
+            'rss': current_rss(),
+            'peak_rss': peak_rss(),
+            'traced': traced,
+            'traced_peak': traced_peak,
+            'top_lines': [{'line': f"{os.path.basename(stat.traceback[0].filename)}:"
+                                   f"{stat.traceback[0].lineno}",
+                           'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+                          for stat in growth[:self.top_lines]],
+        })
+        self._snapshot = snapshot
+        tracemalloc.reset_peak()
+
+    def add_time(self, name, seconds):
+        entry = self.phases.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        if self.memory is not None:
+            self.checkpoint(name)
+
+    def add_count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        total = time.perf_counter() - self.start
+        profile = {
+            'name': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_seconds': total,
+            'phases': {name: {'calls': calls, 'seconds': seconds,
+                              'share': seconds / total if total else 0.0}
+                       for name, (calls, seconds) in
+                       sorted(self.phases.items(), key=lambda item: -item[1][1])},
+            'counters': dict(sorted(self.counters.items())),
+        }
+        if self.memory is not None:
+            profile['memory'] = self.memory
+            profile['peak_rss'] = peak_rss()
+        return profile
+
+    def write(self, path):
+        """JSON 프로파일 저장"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+class _Phase:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if _PROFILE is not None:
+            _PROFILE.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+def enabled():
+    return _PROFILE is not None
+
+def phase(name):
+    """단계 시간 측정 컨텍스트 매니저 (계측이 꺼져 있으면 아무것도 하지 않음)"""
+    return _NULL_PHASE if _PROFILE is None else _Phase(name)
+
+def timed(name=None):
+    """함수 실행 시간을 name 단계로 측정하는 데코레이터 (기본 이름: 함수 qualname)"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _PROFILE is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if _PROFILE is not None:
+                    _PROFILE.add_time(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    """카운터 증가 (계측이 꺼져 있으면 아무것도 하지 않음)"""
+    if _PROFILE is not None:
+        _PROFILE.add_count(name, n)
+
+def count_loop(strategy, bars, closed_before, was_open):
+    """매매 루프 한 번의 카운터 (처리한 봉, 청산/진입 거래 수)
+
+    봉마다 호출하지 않고 루프가 끝난 뒤 한 번만 호출한다. closed_before/was_open 은 루프 시작 시점의
+    strategy.stats.count 와 포지션 보유 여부이며, 진입 수 = 청산 수 + 보유 포지션 증감이다.
+    """
+    if _PROFILE is None:
+        return
+    closed = strategy.stats.count - closed_before
+    _PROFILE.add_count('bars', bars)
+    _PROFILE.add_count('trades_closed', closed)
+    _PROFILE.add_count('trades_opened', closed + (strategy.position is not None) - was_open)
+
+def memory_checkpoint(label):
+    """메모리 모드일 때 임의 위치의 메모리 기록 (단계 종료 시에는 자동으로 기록됨)"""
+    if _PROFILE is not None and _PROFILE.memory is not None:
+        _PROFILE.checkpoint(label)
+
+def enable(name='run', sample_interval=None, memory=False):
+    """계측 시작
+
+    sample_interval 초를 주면 현재 스레드의 샘플링 프로파일러를, memory=True 이면 메모리 모드를 함께 시작한다.
+    """
+    global _PROFILE
+    _PROFILE = Profile(name)
+    if memory:
+        _PROFILE.start_memory()
+    if sample_interval:
+        _PROFILE.sampler = Sampler(sample_interval).start()
+    return _PROFILE
+
+def disable():
+    """계측 종료 후 Profile 반환"""
+    global _PROFILE
+    profile, _PROFILE = _PROFILE, None
+    if profile is not None and profile.sampler is not None:
+        profile.sampler.stop()
+    if profile is not None and profile.memory is not None:
+        tracemalloc.stop()
+    return profile
+
+@contextlib.contextmanager
+def profile_run(name, path=None, folded_path=None, sample_interval=0.005, memory=False):
+    """with 블록 실행을 계측하고 끝나면 JSON 프로파일을 저장 (folded_path 가 있으면 샘플링 결과도 저장)
+
+    Yields:
+        Profile
+    """
+    profile = enable(name, sample_interval if folded_path else None, memory)
+    try:
+        yield profile
+    finally:
+        disable()
+        if path is not None:
+            profile.write(path)
+        if folded_path is not None:
+            profile.sampler.write_folded(folded_path)
+
+def _profile_from_environment():
+    # BACKTEST_PROFILE 이 있으면 스크립트 전체를 계측하고 종료 시 저장
+    target = os.environ.get('BACKTEST_PROFILE')
+    memory = os.environ.get('BACKTEST_PROFILE_MEMORY') == '1'
+    if not (target or memory) or _PROFILE is not None:
+        return
+    folder = '.' if target in (None, '', '1') else target
+    os.makedirs(folder, exist_ok=True)
+    script = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0] or 'python'
+    stem = os.path.join(folder, f"profile_{script}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    sample_ms = os.environ.get('BACKTEST_PROFILE_SAMPLE')
+    enable(script, float(sample_ms) / 1000 if sample_ms else None, memory)
+
+    def write():
+        profile = disable()
+        if profile is None:
+            return
+        profile.write(stem + '.json')
+        if profile.sampler is not None:
+            profile.sampler.write_folded(stem + '.folded')
+
+    atexit.register(write)
+
+_profile_from_environment()
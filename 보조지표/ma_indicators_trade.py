@@ -1,9 +1,14 @@
-import pyupbit
-from ta.trend import SMAIndicator, EMAIndicator
-import numpy as np
+import copy
+from array_views import column_views
+from compact_dtypes import POSITION_CODES, empty_bar_arrays
+from instrumentation import count_loop, timed
+from indicators import sma
+from metrics import trade_metrics
 import pandas as pd
-from datetime import datetime
-pd.set_option('display.max_rows', None)  # 모든 행 표시
+from data_planner import plan_candles, load_candles
+from trade_report import display_options, format_trade_stats, format_trade_table
+from trade_stats import TradeStats
+from trade_store import TradeStore
 
 class MAStrategy:
     def __init__(self, take_profit=0.03, stop_loss=0.02):
@@ -11,84 +16,123 @@ class MAStrategy:
         self.entry_price = None
         self.entry_date = None
         self.trade_history = []
+        self.stats = TradeStats()  # 청산될 때마다 갱신되는 거래 통계
         self.take_profit = take_profit
         self.stop_loss = stop_loss
 
+    def get_state(self):
+        """증분 백테스트를 위한 전략 상태 스냅샷"""
+        return {
+            'position': self.position,
+            'entry_price': self.entry_price,
+            'entry_date': self.entry_date,
+            'take_profit': self.take_profit,
+            'stop_loss': self.stop_loss,
+            'trade_history': [dict(trade) for trade in self.trade_history],
+            'stats': copy.deepcopy(self.stats),
+        }
+
+    def set_state(self, state):
+        """get_state() 로 저장한 상태 복원"""
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.trade_history = [dict(trade) for trade in state['trade_history']]
+
+    def required_lookback(self):
+        """지표 워밍업에 필요한 과거 봉 개수 (가장 긴 sma_60 기준)"""
+        return 60 - 1
+
+    @timed('indicators')
+    def indicator_arrays(self, close):
+        """종가 배열로 이동평균/매매 신호 배열 계산 (입력 배열은 수정하지 않음)
+
+        take_profit/stop_loss 와 관계없으므로 파라미터 스윕에서는 한 번만 계산해 재사용할 수 있다.
+        """
+        sma_7 = sma(close, 7)
+        sma_15 = sma(close, 15)
+        sma_30 = sma(close, 30)
+        sma_60 = sma(close, 60)
+        return {
+            'sma_7': sma_7,
+            'sma_15': sma_15,
+            'sma_30': sma_30,
+            'sma_60': sma_60,
+            'long_signal': (sma_7 > sma_15) & (sma_15 > sma_30) & (sma_30 > sma_60),
+            'short_signal': (sma_7 < sma_15) & (sma_15 < sma_30) & (sma_30 < sma_60),
+        }
+
     def calculate_indicators(self, df):
-        """이동평균선 지표 계산"""
-        # 데이터프레임 복사
-        df = df.copy()
-        
-        # 이동평균선 계산
-        df['sma_7'] = SMAIndicator(close=df['close'], window=7).sma_indicator()
-        df['sma_15'] = SMAIndicator(close=df['close'], window=15).sma_indicator()
-        df['sma_30'] = SMAIndicator(close=df['close'], window=30).sma_indicator()
-        df['sma_60'] = SMAIndicator(close=df['close'], window=60).sma_indicator()
-        
-        # 매매 신호 생성
-        df['long_signal'] = (
-            (df['sma_7'] > df['sma_15']) & 
-            (df['sma_15'] > df['sma_30']) & 
-            (df['sma_30'] > df['sma_60'])
-        )
-        
-        df['short_signal'] = (
-            (df['sma_7'] < df['sma_15']) & 
-            (df['sma_15'] < df['sma_30']) & 
-            (df['sma_30'] < df['sma_60']) 
-        )
-        
-        return df
+        """이동평균선 지표/매매 신호 컬럼을 추가한 데이터프레임 (원본은 수정하지 않음)"""
+        return df.assign(**self.indicator_arrays(df['close'].to_numpy()))
 
-    def execute_strategy(self, df):
-        """매매 전략 실행"""
-        signals = [0]  # 첫 번째 행의 신호를 0으로 초기화
-        positions = [None]  # 첫 번째 행의 포지션을 None으로 초기화
-        entry_prices = [None]  # 첫 번째 행의 진입가격을 None으로 초기화
-        profits = [0]  # 첫 번째 행의 수익을 0으로 초기화
-        
-        self.position = None
-        self.entry_price = None
-        self.entry_date = None
-        self.trade_history = []
+    @timed('execute_strategy')
+    def run_arrays(self, close, times, indicators, resume=False):
+        """배열 인터페이스로 매매 전략 실행 (입력 배열은 읽기만 하고 복사하지 않음)
+
+        Args:
+            close: 종가 배열 (array_views.readonly_view 등 읽기 전용 뷰)
+            times: 봉 시각 index (거래 내역의 진입/종료 시각)
+            indicators: indicator_arrays() 결과 (sma_15, long_signal, short_signal 사용)
+            resume: True 이면 직전 실행의 상태에서 첫 봉부터 이어서 실행
+
+        Returns:
+            tuple: (봉별 결과 배열 dict - signal/position/entry_price/profit, 거래 내역)
+        """
+        sma_15 = indicators['sma_15']
+        long_signal = indicators['long_signal']
+        short_signal = indicators['short_signal']
+        bars = empty_bar_arrays(len(close))
+        signals, positions = bars['signal'], bars['position']
+        entry_prices, profits = bars['entry_price'], bars['profit']
+        if resume:
+            start = 0
+        else:
+            # 첫 번째 봉은 신호 0, 포지션 없음으로 시작
+            self.position = None
+            self.entry_price = None
+            self.entry_date = None
+            self.trade_history = []
+            self.stats = TradeStats()
+            start = 1
+        closed_before, was_open = self.stats.count, self.position is not None
         
-        for i in range(1, len(df)):
+        for i in range(start, len(close)):
             signal = 0
-            current_price = df['close'].iloc[i]
-            current_date = df.index[i]
+            current_price = close[i]
             current_profit = 0
             
             if self.position is None:  # 포지션이 없을 때
-                if df['long_signal'].iloc[i]:
+                if long_signal[i]:
                     signal = 1  # 롱 진입
                     self.position = 'long'
                     self.entry_price = current_price
-                    self.entry_date = current_date
-                elif df['short_signal'].iloc[i]:
+                    self.entry_date = times[i]
+                elif short_signal[i]:
                     signal = -1  # 숏 진입
                     self.position = 'short'
                     self.entry_price = current_price
-                    self.entry_date = current_date
+                    self.entry_date = times[i]
                     
             elif self.position == 'long':  # 롱 포지션 상태
                 profit_ratio = (current_price - self.entry_price) / self.entry_price
                 current_profit = profit_ratio
                 
                 # 청산 조건: sma_15 아래로 하락 또는 손익 조건 도달
-                if (current_price < df['sma_15'].iloc[i] or 
+                if (current_price < sma_15[i] or 
                     (self.take_profit and profit_ratio >= self.take_profit) or 
                     (self.stop_loss and profit_ratio <= -self.stop_loss)):
                     
                     signal = -1  # 롱 종료
                     self.trade_history.append({
                         'entry_date': self.entry_date,
-                        'exit_date': current_date,
+                        'exit_date': times[i],
                         'position': self.position,
                         'entry_price': self.entry_price,
                         'exit_price': current_price,
                         'profit_ratio': profit_ratio,
                         'profit': current_price - self.entry_price
                     })
+                    self.stats.add(self.trade_history[-1])
                     self.position = None
                     self.entry_price = None
                     self.entry_date = None
@@ -98,124 +142,63 @@ class MAStrategy:
                 current_profit = profit_ratio
                 
                 # 청산 조건: sma_15 위로 상승 또는 손익 조건 도달
-                if (current_price > df['sma_15'].iloc[i] or 
+                if (current_price > sma_15[i] or 
                     (self.take_profit and profit_ratio >= self.take_profit) or 
                     (self.stop_loss and profit_ratio <= -self.stop_loss)):
                     
                     signal = 1  # 숏 종료
                     self.trade_history.append({
                         'entry_date': self.entry_date,
-                        'exit_date': current_date,
+                        'exit_date': times[i],
                         'position': self.position,
                         'entry_price': self.entry_price,
                         'exit_price': current_price,
                         'profit_ratio': profit_ratio,
                         'profit': self.entry_price - current_price
                     })
+                    self.stats.add(self.trade_history[-1])
                     self.position = None
                     self.entry_price = None
                     self.entry_date = None
             
-            signals.append(signal)
-            positions.append(self.position)
-            entry_prices.append(self.entry_price)
-            profits.append(current_profit)
+            signals[i] = signal
+            positions[i] = POSITION_CODES[self.position]
+            if self.entry_price is not None:
+                entry_prices[i] = self.entry_price
+            profits[i] = current_profit
         
-        df['signal'] = signals
-        df['position'] = positions
-        df['entry_price'] = entry_prices
-        df['profit'] = profits
+        count_loop(self, len(close), closed_before, was_open)
+        return bars, self.trade_history
+
+    def execute_strategy(self, df, resume=False):
+        """매매 전략 실행 (resume=True 이면 직전 실행의 상태에서 첫 행부터 이어서 실행)
+
+        calculate_indicators() 결과의 컬럼 뷰로 run_arrays() 를 실행하고 봉별 결과 컬럼을 추가한다.
+        """
+        views = column_views(df, ['close', 'sma_15', 'long_signal', 'short_signal'])
+        bars, trade_history = self.run_arrays(views['close'], df.index, views, resume=resume)
+        # 봉별 결과는 int8 신호/포지션 코드, NaN 진입가격으로 저장 (compact_dtypes)
+        for name, values in bars.items():
+            df[name] = values
         
-        return df, self.trade_history
+        return df, trade_history
     
-def print_trade_history(trade_history):
+@timed('report')
+def print_trade_history(trade_history, stats=None):
     """거래 내역 출력"""
     print("\n=== 거래 내역 ===")
     print("-" * 100)
-    print(f"{'포지션':<8} {'진입일자':<22} {'종료일자':<22} {'진입가격':<15} {'종료가격':<15} {'수익률':<8} {'수익금액'}")
-    print("-" * 100)
-    
-    total_profit = 0
-    for trade in trade_history:
-        profit_str = f"{trade['profit_ratio']*100:+.2f}%"
-        print(f"{trade['position']:<8} "
-              f"{trade['entry_date'].strftime('%Y-%m-%d %H:%M:%S'):<22} "
-              f"{trade['exit_date'].strftime('%Y-%m-%d %H:%M:%S'):<22} "
-              f"{trade['entry_price']:,.0f} KRW"
-              f"{trade['exit_price']:>15,.0f} KRW"
-              f"{profit_str:>8} "
-              f"{trade['profit']:>12,.0f} KRW")
-        total_profit += trade['profit']
-        
+    print(format_trade_table(trade_history))
+    total_profit = sum(trade['profit'] for trade in trade_history)
     print("-" * 100)
     print(f"총 수익금액: {total_profit:,.0f} KRW")
     
-    df_trades = pd.DataFrame(trade_history)
-    
-    # 컬럼명 한글로 변경
-    df_trades = df_trades.rename(columns={
-        'position': '포지션',
-        'entry_date': '진입일자',
-        'exit_date': '종료일자',
-        'entry_price': '진입가격',
-        'exit_price': '종료가격',
-        'profit_ratio': '수익률',
-        'profit': '수익금액',
-    })
-    
-    # 수익률을 퍼센트로 변환
-    df_trades['수익률'] = df_trades['수익률'] * 100
-    
-    # 데이터프레임 형식 지정
-    pd.set_option('display.float_format', lambda x: f'{x:,.2f}' if isinstance(x, (float, int)) else str(x))
-    
-    # 거래 통계 계산
-    total_trades = len(df_trades)
-    winning_trades = len(df_trades[df_trades['수익률'] > 0])
-    losing_trades = len(df_trades[df_trades['수익률'] <= 0])
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-    
-    avg_profit = df_trades[df_trades['수익률'] > 0]['수익률'].mean() if winning_trades > 0 else 0
-    avg_loss = df_trades[df_trades['수익률'] <= 0]['수익률'].mean() if losing_trades > 0 else 0
-    
-    # 거래 통계 출력
-    print("\n=== 거래 통계 ===")
-    print(f"총 거래 횟수: {total_trades}")
-    print(f"승률: {win_rate:.2f}%")
-    print(f"평균 수익: {avg_profit:.2f}%")
-    print(f"평균 손실: {avg_loss:.2f}%")
+    # 거래 통계 (stats: 실행 중 누적된 TradeStats, 없으면 거래 내역으로 계산)
+    stats = stats.totals() if stats is not None else trade_metrics(trade_history)
+    print("\n" + format_trade_stats(stats))
     
-    # CSV 파일로 저장
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_filename = f'trade_history_{timestamp}_ma.csv'
-    df_trades.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-    print(f"\n거래 내역이 '{csv_filename}'로 저장되었습니다.")
-
     return total_profit
 
-def get_trade_summary(trade_history):
-    """거래 내역 요약 통계를 반환하는 함수"""
-    if not trade_history:
-        return pd.DataFrame()
-        
-    df_trades = pd.DataFrame(trade_history)
-    
-    # 포지션별 통계
-    position_stats = df_trades.groupby('position').agg({
-        'profit_ratio': ['count', 'mean', 'std', 'min', 'max'],
-        'profit': 'sum'
-    }).round(4)
-    
-    # 컬럼명 변경
-    position_stats.columns = ['거래횟수', '평균수익률', '표준편차', '최소수익률', '최대수익률', '총수익금']
-    position_stats.index.name = '포지션'
-    
-    # 수익률 계산을 퍼센트로 변환
-    for col in ['평균수익률', '최소수익률', '최대수익률']:
-        position_stats[col] = position_stats[col] * 100
-    
-    return position_stats
-
 def backtest_strategy(df):
     total_trades = len(df[df['signal'] != 0])
     profitable_trades = len(df[df['profit'] >= 0.02])
@@ -230,30 +213,33 @@ def backtest_strategy(df):
         win_rate = (profitable_trades / total_trades) * 100
         print(f"승률: {win_rate:.2f}%")
 
-def main():
-    # 시작 날짜 (YYYYMMDD 형식)
-    start_date = "20250101"
-    end_date = "20250131"
-    # 시작 날짜의 다음 날짜 계산
-    next_day = pd.to_datetime(end_date) + pd.Timedelta(days=1)
-    next_day_str = next_day.strftime("%Y%m%d")
-    # 비트코인 데이터 가져오기
-    df = pyupbit.get_ohlcv("KRW-BTC", count=4500, to=next_day_str, interval="minute10")
+def main(start_date="20250101", end_date="20250131"):
+    # 시작/종료 날짜 (YYYYMMDD 형식)
     strategy = MAStrategy()
+    # 비트코인 데이터 가져오기 (매매 구간 + 이동평균 워밍업만큼)
+    plan = plan_candles(start_date, end_date, strategy, interval="minute10")
+    df = load_candles(plan, "KRW-BTC")
     df = strategy.calculate_indicators(df)
     # 시작 날짜 이후 데이터만 사용하여 매매 진행
-    df = df[df.index >= start_date+'0900']
+    df = df.iloc[df.index.searchsorted(pd.Timestamp(start_date + '0900')):]
 
     result_df, trade_history = strategy.execute_strategy(df)
 
     backtest_strategy(result_df)
 
     # 거래 내역
-    total_profit = print_trade_history(strategy.trade_history)
+    total_profit = print_trade_history(strategy.trade_history, stats=strategy.stats)
+    # 거래 내역 저장소에 저장
+    with TradeStore() as store:
+        run_id = store.write_run(strategy.trade_history, 'ma', interval=plan.interval,
+                                 params={'take_profit': strategy.take_profit,
+                                         'stop_loss': strategy.stop_loss})
+    print(f"\n거래 내역이 저장소에 저장되었습니다. (run_id: {run_id})")
     # 포지션별 통계
-    position_stats = get_trade_summary(strategy.trade_history)
+    position_stats = strategy.stats.position_summary()
     print("\n=== 포지션별 통계 ===")
-    print(position_stats)
+    with display_options():
+        print(position_stats)
     # 현재 상태 출력
     print("\n현재 상태:")
     print(f"현재 가격: {result_df['close'].iloc[-1]:,} KRW")
@@ -0,0 +1,147 @@
+# 성과 지표 계산 (여러 실행을 한 번에)
+# 수익률 행렬(실행 x 시점)을 받아 실행마다 샤프/소르티노/칼마 비율, 최대 낙폭과 기간,
+# 손익비(profit factor), 기대수익, 승률을 한 번의 벡터 연산으로 계산한다.
+# 거래 수가 다른 실행은 trade_matrix 로 NaN 을 채워 같은 행렬에 담는다.
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ['trades', 'wins', 'total_return', 'win_rate', 'avg_win', 'avg_loss',
+                  'expectancy', 'profit_factor', 'sharpe', 'sortino', 'calmar', 'max_drawdown',
+                  'max_drawdown_duration']
+
+def trade_matrix(trade_sets, column='profit_ratio'):
+    """실행별 거래 수익률 목록을 (실행 수, 최대 거래 수) 행렬로 변환 (빈 칸은 NaN)
+
+    Args:
+        trade_sets: 실행별 거래 내역 (dict 목록, 데이터프레임 또는 수익률 배열)
+    """
+    rows = []
+    for trades in trade_sets:
+        if isinstance(trades, pd.DataFrame):
+            rows.append(trades[column].to_numpy(dtype=np.float64))
+        elif isinstance(trades, list) and trades and isinstance(trades[0], dict):
+            rows.append(np.array([trade[column] for trade in trades], dtype=np.float64))
+        else:
+            rows.append(np.asarray(trades, dtype=np.float64))
+    matrix = np.full((len(rows), max((len(row) for row in rows), default=0)), np.nan)
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = row
+    return matrix
+
+def returns_from_equity(equity):
+    """자산 곡선(실행 x 봉)을 봉별 수익률 행렬로 변환 (첫 봉은 시작 자산 대비)"""
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    previous = np.concatenate([np.ones((len(equity), 1)), equity[:, :-1]], axis=1)
+    return equity / previous - 1
+
+def drawdown_duration(equity, valid=None):
+    """자산 곡선(실행 x 시점)의 최대 낙폭 기간 (고점 이후 회복하지 못한 시점 수)
+
+    valid 가 주어지면 False 인 시점(행렬을 맞추기 위해 채운 칸)은 기간 계산에서 제외한다.
+    """
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    steps = np.arange(equity.shape[1])
+    peak = np.maximum.accumulate(equity, axis=1)
+    # 각 시점까지의 마지막 고점 위치
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, steps, 0), axis=1)
+    underwater = steps - last_peak
+    if valid is not None:
+        underwater = np.where(valid, underwater, 0)
+    return underwater.max(axis=1, initial=0)
+
+def performance_metrics(returns, periods_per_year=None, names=None):
+    """실행별 성과 지표 계산
+
+    Args:
+        returns: (실행 수, 시점 수) 수익률 비율 행렬 (거래별 또는 봉별, NaN 은 없는 값)
+        periods_per_year: 연율화에 쓸 연간 시점 수 (None 이면 샤프/소르티노는 시점당 값,
+            칼마는 전체 수익률 / 최대 낙폭)
+        names: 결과 index 로 쓸 실행 이름
+
+    Returns:
+        pd.DataFrame: 실행별 지표 (수익률/낙폭은 비율, 승률은 %)
+    """
+    r = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    valid = ~np.isnan(r)
+    filled = np.where(valid, r, 0.0)
+    count = valid.sum(axis=1)
+
+    wins = valid & (r > 0)
+    losses = valid & (r <= 0)
+    n_wins = wins.sum(axis=1)
+    n_losses = losses.sum(axis=1)
+    gross_profit = np.where(wins, r, 0.0).sum(axis=1)
+    gross_loss = -np.where(losses, r, 0.0).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = filled.sum(axis=1) / count
+        std = np.sqrt(np.where(valid, (r - mean[:, None]) ** 2, 0.0).sum(axis=1) / (count - 1))
+        downside = np.sqrt((np.minimum(filled, 0.0) ** 2).sum(axis=1) / count)
+        sharpe = mean / std
+        sortino = mean / downside
+        win_rate = np.where(count > 0, n_wins / count * 100, 0.0)
+        avg_win = np.where(n_wins > 0, gross_profit / n_wins, 0.0)
+        avg_loss = np.where(n_losses > 0, -gross_loss / n_losses, 0.0)
+        profit_factor = gross_profit / gross_loss
+
+        # 복리 자산 곡선과 낙폭 (시작 자산 1 포함)
+        equity = np.cumprod(1 + filled, axis=1)
+        equity = np.concatenate([np.ones((len(r), 1)), equity], axis=1)
+        total_return = equity[:, -1] - 1
+        max_drawdown = (equity / np.maximum.accumulate(equity, axis=1) - 1).min(axis=1)
+        if periods_per_year is None:
+            calmar = total_return / -max_drawdown
+        else:
+            sharpe = sharpe * np.sqrt(periods_per_year)
+            sortino = sortino * np.sqrt(periods_per_year)
+            annual_return = equity[:, -1] ** (periods_per_year / count) - 1
+            calmar = annual_return / -max_drawdown
+
+    return pd.DataFrame({
+        'trades': count,
+        'wins': n_wins,
+        'total_return': total_return,
+        'win_rate': win_rate,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'expectancy': mean,
+        'profit_factor': profit_factor,
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'calmar': calmar,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': drawdown_duration(
+            equity, valid=np.concatenate([np.ones((len(r), 1), dtype=bool), valid], axis=1)),
+    }, index=names)[METRIC_COLUMNS]
+
+def equity_metrics(equity, periods_per_year=None, names=None):
+    """자산 곡선 행렬(실행 x 봉)의 성과 지표 (봉별 수익률 기준)"""
+    return performance_metrics(returns_from_equity(equity), periods_per_year=periods_per_year,
+                               names=names)
+
+def trade_metrics(trade_history, column='profit_ratio'):
+    """거래 내역 하나의 성과 지표 dict (거래별 수익률 기준)"""
+    return performance_metrics(trade_matrix([trade_history], column=column)).iloc[0].to_dict()
+
+def get_trade_summary(trade_history):
+    """거래 내역 요약 통계를 반환하는 함수"""
+    if not trade_history:
+        return pd.DataFrame()
+
+    df_trades = pd.DataFrame(trade_history)
+
+    # 포지션별 통계
+    position_stats = df_trades.groupby('position').agg({
+        'profit_ratio': ['count', 'mean', 'std', 'min', 'max'],
+        'profit': 'sum'
+    }).round(4)
+
+    # 컬럼명 변경
+    position_stats.columns = ['거래횟수', '평균수익률', '표준편차', '최소수익률', '최대수익률', '총수익금']
+    position_stats.index.name = '포지션'
+
+    # 수익률 계산을 퍼센트로 변환
+    for col in ['평균수익률', '최소수익률', '최대수익률']:
+        position_stats[col] = position_stats[col] * 100
+
+    return position_stats
@@ -0,0 +1,119 @@
+# 거래 순서 몬테카를로 시뮬레이션 (낙폭/파산 위험 추정)
+# 전략의 거래별 수익률을 섞거나(shuffle) 복원 추출(bootstrap)해 (경로 수 x 거래 수) 행렬로
+# 복리 자산 경로를 만들고, 경로별 최종 자산/최대 낙폭/최저 자산의 분포를 계산한다.
+# 경로는 메모리 한도에 맞춘 고정 크기 묶음으로 생성하며 묶음은 여러 프로세스에서 병렬 실행한다.
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from trade_store import load_report_frame
+
+METHODS = ('shuffle', 'bootstrap')
+
+QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+
+# 묶음 하나가 사용하는 임시 배열의 최대 크기 (바이트)
+MEMORY_CAP = 128 * 1024 * 1024
+
+def trade_returns(trades):
+    """거래 내역(dict 목록, 데이터프레임 또는 수익률 배열)의 거래별 수익률 비율 배열"""
+    if isinstance(trades, pd.DataFrame):
+        return trades['profit_ratio'].to_numpy(dtype=np.float64)
+    if isinstance(trades, list) and trades and isinstance(trades[0], dict):
+        return np.array([trade['profit_ratio'] for trade in trades if 'exit_date' in trade],
+                        dtype=np.float64)
+    return np.asarray(trades, dtype=np.float64)
+
+def path_indices(rng, n_trades, size, method):
+    """경로별 거래 순서 인덱스 (size x n_trades)"""
+    if method == 'shuffle':
+        return rng.permuted(np.tile(np.arange(n_trades), (size, 1)), axis=1)
+    if method == 'bootstrap':
+        return rng.integers(0, n_trades, size=(size, n_trades))
+    raise ValueError(f"지원하지 않는 방식: {method}")
+
+def path_statistics(returns):
+    """수익률 경로 행렬(경로 수 x 거래 수)의 경로별 최종 자산, 최대 낙폭, 최저 자산 (시작 자산 1)"""
+    equity = np.cumprod(1 + returns, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    max_drawdown = (equity / peak - 1).min(axis=1)
+    min_equity = np.minimum(equity.min(axis=1), 1.0)
+    return equity[:, -1], max_drawdown, min_equity
+
+# 작업 프로세스에서 공유하는 거래 수익률 (_init_worker 로 한 번만 전달)
+_DATA = {}
+
+def _init_worker(returns, method):
+    _DATA.update(returns=returns, method=method)
+
+def _simulate_chunk(seed, size):
+    rng = np.random.default_rng(seed)
+    returns = _DATA['returns']
+    index = path_indices(rng, len(returns), size, _DATA['method'])
+    return path_statistics(returns[index])
+
+def simulate_paths(trades, n_paths=1_000_000, method='shuffle', seed=0, max_workers=None,
+                   memory_cap=MEMORY_CAP):
+    """거래 순서를 섞거나 복원 추출한 n_paths 개 자산 경로의 통계
+
+    Args:
+        trades: 거래 내역 (strategy.trade_history, 저장소 조회 결과 또는 수익률 배열)
+        method: 'shuffle' (같은 거래를 다른 순서로) 또는 'bootstrap' (복원 추출)
+        seed: 경로 시드 (같은 시드면 작업 프로세스 수와 관계없이 같은 결과)
+        max_workers: 작업 프로세스 수 (1 이면 현재 프로세스에서 실행)
+        memory_cap: 묶음 하나의 임시 배열 최대 크기 (바이트)
+
+    Returns:
+        pd.DataFrame: 경로별 final_equity, max_drawdown, min_equity
+    """
+    returns = trade_returns(trades)
+    if len(returns) == 0:
+        raise ValueError("시뮬레이션할 거래 내역이 없습니다.")
+
+    # 인덱스/수익률/자산/고점 배열 4개가 memory_cap 안에 들어가는 경로 수
+    chunk_size = max(1, memory_cap // (len(returns) * 8 * 4))
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if max_workers == 1:
+        _init_worker(returns, method)
+        chunks = [_simulate_chunk(s, size) for s, size in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(returns, method)) as executor:
+            chunks = list(executor.map(_simulate_chunk, seeds, sizes))
+
+    final_equity, max_drawdown, min_equity = (np.concatenate(parts) for parts in zip(*chunks))
+    return pd.DataFrame({'final_equity': final_equity, 'max_drawdown': max_drawdown,
+                         'min_equity': min_equity})
+
+def quantile_table(paths, quantiles=QUANTILES):
+    """경로 통계의 분위수 표 (최종 자산 수익률/최대 낙폭, %)"""
+    table = pd.DataFrame({
+        '최종 수익률': (paths['final_equity'] - 1) * 100,
+        '최대 낙폭': paths['max_drawdown'] * 100,
+    }).quantile(list(quantiles))
+    table.index = [f'{q:.0%}' for q in quantiles]
+    table.index.name = '분위수'
+    return table
+
+def ruin_probability(paths, levels=(0.1, 0.2, 0.3, 0.5)):
+    """자산이 한 번이라도 시작 자산 대비 level 이상 줄어든 경로의 비율 (%)"""
+    return pd.Series({f'-{level:.0%}': (paths['min_equity'] <= 1 - level).mean() * 100
+                      for level in levels}, name='파산 확률(%)')
+
+def main():
+    # 저장소의 전략별 가장 최근 실행으로 100만 경로 시뮬레이션
+    for strategy in ['bb', 'cross', 'ma']:
+        trades = load_report_frame(strategy)
+        for method in METHODS:
+            paths = simulate_paths(trades['수익률'] / 100, n_paths=1_000_000, method=method)
+            print(f"\n=== {strategy} 전략 ({method}, 거래 {len(trades)}회) ===")
+            print(quantile_table(paths).round(2))
+            print(ruin_probability(paths).round(2).to_string())
+
+if __name__ == "__main__":
+    main()
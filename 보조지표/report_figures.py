@@ -0,0 +1,399 @@
+# 분석 스크립트 그래프 (report_pipeline 렌더링용)
+# yield.py, 2024_bit_price.py 등 분석 스크립트의 그래프를 Figure 를 반환하는 함수로 모으고,
+# *_job() 함수로 입력 데이터와 파일 이름을 묶은 FigureJob 을 만든다.
+# 이 파일을 직접 실행하면 거래 내역 저장소에서 전략 비교/2024년 월별 보고서 그래프 전체를 한 번에 그린다.
+import argparse
+import math
+
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import pandas as pd
+from scipy import stats
+
+from asof_sampler import asof_sample
+from downsample import axes_pixel_width, downsample
+from equity_curve import compound_returns
+from metrics import performance_metrics, trade_matrix
+from report_pipeline import DPI, FigureJob, print_status, render_jobs, style_context
+from trade_store import MONTHLY_RUN, load_report_frame, trading_month
+
+STRATEGIES = ['bb', 'cross', 'ma']
+
+# 시계열 그래프 다운샘플링 방법 ('minmax': 구간별 최소/최대, 'lttb')
+SERIES_DOWNSAMPLE = 'minmax'
+# 날짜 축 최대 눈금 수
+MAX_DATE_TICKS = 40
+
+# 월별 보고서 구간 (bb_monthly_batch.py 의 2024년 월별 일괄 실행)
+MONTHLY_START = '2024-01-01 09:00:00'
+MONTHLY_END = '2025-01-01 09:00:00'
+
+# 2024년 각 월 25일의 비트코인 가격
+BTC_MONTHLY_PRICES_2024 = {
+    '1월': 57403000,  # 2024-01-25
+    '2월': 78189000,  # 2024-02-25
+    '3월': 96530000,  # 2024-03-25
+    '4월': 93439000,  # 2024-04-25
+    '5월': 96368000,  # 2024-05-25
+    '6월': 86100000,  # 2024-06-25
+    '7월': 94870000,  # 2024-07-25
+    '8월': 85716000,  # 2024-08-25
+    '9월': 79804000,  # 2024-09-25
+    '10월': 93593000,  # 2024-10-25
+    '11월': 137879000,  # 2024-11-25
+    '12월': 144132000  # 2024-12-25
+}
+
+# ---------------------------------------------------------------- 데이터 준비
+
+def load_strategy_frames():
+    """전략별 가장 최근 실행의 거래 내역 {전략: 데이터프레임}"""
+    return {strategy: load_report_frame(strategy) for strategy in STRATEGIES}
+
+def load_monthly_trades():
+    """월별 일괄 실행(bb_monthly_batch.py)의 2024년 거래 내역"""
+    return load_report_frame('bb', kind=MONTHLY_RUN, start=MONTHLY_START, end=MONTHLY_END)
+
+def cumulative_returns(df):
+    """진입일자 순으로 정렬 후 복리 누적 수익률(%) 컬럼 추가"""
+    df = df.sort_values('진입일자')
+    df['누적수익률'] = compound_returns(df['수익률'] / 100) * 100
+    return df
+
+def five_day_returns(curves):
+    """5일 단위 달력에 맞춰 각 전략의 누적 수익률을 한 번에 샘플링"""
+    return asof_sample({name: df.set_index('진입일자')['누적수익률'] for name, df in curves.items()},
+                       freq='5D')
+
+def monthly_trade_summary(df):
+    """월별 총 수익금과 월 안에서 복리 누적한 수익률"""
+    df = df.assign(Month=trading_month(df['진입일자']))
+    return df.groupby('Month').agg(**{
+        '총 수익금': ('수익금액', 'sum'),
+        '월별 수익률': ('수익률', lambda r: compound_returns(r / 100)[-1] * 100),  # 월 안에서 복리 누적
+    }).reset_index()
+
+def monthly_performance(df):
+    """월별 수익금액/수익률 합계/평균 거래가격/거래 횟수/승률"""
+    df = df.assign(month=trading_month(df['진입일자']), win=df['수익금액'] > 0)
+    monthly_data = df.groupby('month').agg(
+        total_profit=('수익금액', 'sum'),
+        total_return=('수익률', 'sum'),
+        avg_price=('진입가격', 'mean'),
+        trade_count=('수익금액', 'size'),
+        win_rate=('win', 'mean'),
+    ).reset_index()
+    monthly_data['win_rate'] = monthly_data['win_rate'] * 100
+    return monthly_data
+
+def monthly_statistics(df):
+    """월별 거래 통계와 샤프비율/손익비"""
+    df = df.assign(월=trading_month(df['진입일자']))
+    monthly_stats = df.groupby('월').agg({
+        '수익금액': ['count', 'sum', 'mean', 'std'],
+        '수익률': ['mean', 'std', lambda x: (x > 0).mean() * 100]  # 승률 추가
+    }).round(2)
+
+    # 컬럼명 변경
+    monthly_stats.columns = [
+        '거래횟수', '총수익', '평균수익', '수익표준편차',
+        '평균수익률', '수익률표준편차', '승률'
+    ]
+
+    # 추가 지표 계산: 월별 거래 수익률 행렬(월 x 거래)로 한 번에 계산
+    returns = trade_matrix([group for _, group in df.groupby('월')['수익률']])
+    metrics = performance_metrics(returns, names=monthly_stats.index)
+    monthly_stats['샤프비율'] = metrics['sharpe'].round(2)
+    monthly_stats['손익비'] = metrics['profit_factor'].round(2)
+    return monthly_stats
+
+# ---------------------------------------------------------------- 그래프
+
+def _date_axis(ax, start, end):
+    # x축 날짜 포맷 설정 (5일 간격, 기간이 길면 눈금이 MAX_DATE_TICKS 개를 넘지 않도록 5일의 배수로 늘림)
+    days = max((pd.Timestamp(end) - pd.Timestamp(start)).days, 1)
+    interval = 5 * max(1, math.ceil(days / (5 * MAX_DATE_TICKS)))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    ax.xaxis.set_major_locator(mdates.DayLocator(interval=interval))
+    ax.tick_params(axis='x', rotation=45)
+
+def _plot_series(ax, x, y, *args, **kwargs):
+    # 축 가로 픽셀 수보다 많은 점은 극값을 유지하며 줄인 뒤 그림
+    x, y = downsample(x, y, axes_pixel_width(ax, DPI), SERIES_DOWNSAMPLE)
+    return ax.plot(x, y, *args, **kwargs)
+
+def cumulative_figure(curves):
+    """투자 전략별 누적 수익률 비교 (거래마다 한 점)"""
+    fig, ax = plt.subplots(figsize=(15, 8))
+    for name, df in curves.items():
+        _plot_series(ax, df['진입일자'], df['누적수익률'], label=name, linewidth=2)
+
+    ax.set_title('투자 전략별 누적 수익률 비교', fontsize=16, pad=20)
+    ax.set_xlabel('날짜', fontsize=12)
+    ax.set_ylabel('누적 수익률 (%)', fontsize=12)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(fontsize=10)
+    times = [df['진입일자'] for df in curves.values() if len(df)]
+    if times:
+        _date_axis(ax, min(t.min() for t in times), max(t.max() for t in times))
+    fig.tight_layout()
+    return fig
+
+def five_day_figure(df_5day):
+    """5일 단위 투자 전략별 누적 수익률 비교 (마지막 지점에 최종 수익률 표시)"""
+    fig, ax = plt.subplots(figsize=(15, 8))
+    last_date = df_5day.index[-1]
+    for (name, yields), marker in zip(df_5day.items(), ['o-', 's-', '^-']):
+        final_yield = yields.iloc[-1]
+        _plot_series(ax, df_5day.index, yields, marker, label=f'{name} ({final_yield:.2f}%)',
+                     linewidth=2, markersize=8)
+        ax.annotate(f'{final_yield:.2f}%',
+                    xy=(last_date, final_yield),
+                    xytext=(10, 0),
+                    textcoords='offset points',
+                    va='center')
+
+    ax.set_title('5일 단위 투자 전략별 누적 수익률 비교', fontsize=16, pad=20)
+    ax.set_xlabel('날짜', fontsize=12)
+    ax.set_ylabel('누적 수익률 (%)', fontsize=12)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend(fontsize=10, loc='upper left')
+    _date_axis(ax, df_5day.index[0], last_date)
+
+    # 여백 조정 (오른쪽 여백 추가)
+    fig.tight_layout()
+    fig.subplots_adjust(right=0.95)
+    return fig
+
+def monthly_trading_figure(df):
+    """월별 총 수익금(막대)과 월별 수익률(선)"""
+    fig, ax1 = plt.subplots(figsize=(15, 8))
+
+    # 수익금액 막대 그래프 (왼쪽 y축)
+    bars = ax1.bar(df['Month'], df['총 수익금'], color='#3498db', alpha=0.7, label='총 수익금')
+    ax1.set_xlabel('월')
+    ax1.set_ylabel('총 수익금 (원)', color='#2980b9')
+    ax1.tick_params(axis='y', labelcolor='#2980b9')
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{height:,.0f}',
+                 ha='center', va='bottom', color='#2980b9')
+
+    # 수익률 선 그래프 (오른쪽 y축)
+    ax2 = ax1.twinx()
+    line1 = ax2.plot(df['Month'], df['월별 수익률'], color='#e74c3c', marker='o',
+                     label='월별 수익률', linewidth=3)
+    for i, v in enumerate(df['월별 수익률']):
+        ax2.text(i, v, f'{v:.1f}%',
+                 ha='center', va='bottom', color='#c0392b')
+    ax2.set_ylabel('수익률 (%)', color='#c0392b')
+    ax2.tick_params(axis='y', labelcolor='#c0392b')
+
+    # 범례 통합
+    ax1.legend([bars] + line1, ['총 수익금', '월별 수익률'], loc='upper left', framealpha=0.9)
+    ax1.grid(True, alpha=0.2)
+    ax1.tick_params(axis='x', rotation=45)
+
+    ax1.set_title('2024년 월별 트레이딩 분석', pad=20, fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+def btc_price_figure(df):
+    """2024년 월별 비트코인 가격 (25일 기준)"""
+    fig, ax = plt.subplots(figsize=(15, 8))
+    ax.bar(df['월'], df['가격'], color='skyblue', alpha=0.6)
+    ax.plot(df['월'], df['가격'], color='red', marker='o', linewidth=2)
+    for i, price in enumerate(df['가격']):
+        ax.text(i, price, f'{price:,}원',
+                ha='center', va='bottom')
+
+    ax.set_title('2024년 월별 비트코인 가격 (25일 기준)')
+    ax.set_xlabel('월')
+    ax.set_ylabel('가격 (억원)')
+    ax.tick_params(axis='x', rotation=45)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+def _bar_labels(ax, bars, fmt):
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height, fmt(height), ha='center', va='bottom')
+
+def monthly_performance_figure(df):
+    """월별 수익금액/평균 거래 가격, 월별 수익률/승률, 월별 거래 횟수"""
+    with style_context('seaborn-v0_8'):
+        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(15, 18))
+
+        # 1. 수익금액과 평균 거래가격
+        ax1_2 = ax1.twinx()
+        bars = ax1.bar(df['month'], df['total_profit'] / 1000000, color='skyblue', alpha=0.7)
+        ax1.set_ylabel('월별 수익금액 (백만원)', color='skyblue', fontsize=12)
+        ax1.tick_params(axis='y', labelcolor='skyblue', labelsize=10)
+        _bar_labels(ax1, bars, lambda height: f'{height:.1f}M')
+        ax1_2.plot(df['month'], df['avg_price'] / 1000000, color='red', linewidth=2, marker='o')
+        ax1_2.set_ylabel('평균 거래가격 (백만원)', color='red', fontsize=12)
+        ax1_2.tick_params(axis='y', labelcolor='red', labelsize=10)
+
+        # 2. 수익률과 승률
+        ax2_2 = ax2.twinx()
+        bars2 = ax2.bar(df['month'], df['total_return'], color='lightgreen', alpha=0.7)
+        ax2.set_ylabel('월별 수익률 합계 (%)', color='green', fontsize=12)
+        ax2.tick_params(axis='y', labelcolor='green', labelsize=10)
+        _bar_labels(ax2, bars2, lambda height: f'{height:.1f}%')
+        ax2_2.plot(df['month'], df['win_rate'], color='purple', linewidth=2, marker='o')
+        ax2_2.set_ylabel('승률 (%)', color='purple', fontsize=12)
+        ax2_2.tick_params(axis='y', labelcolor='purple', labelsize=10)
+
+        # 3. 거래 횟수
+        bars3 = ax3.bar(df['month'], df['trade_count'], color='orange', alpha=0.7)
+        ax3.set_ylabel('월별 거래 횟수', fontsize=12)
+        ax3.tick_params(labelsize=10)
+        _bar_labels(ax3, bars3, lambda height: f'{int(height)}')
+
+        # 공통 스타일링
+        for ax in [ax1, ax2, ax3]:
+            ax.grid(True, alpha=0.3)
+            ax.tick_params(axis='x', rotation=45)
+
+        ax1.set_title('월별 수익금액과 평균 거래가격', pad=20, fontsize=14)
+        ax2.set_title('월별 수익률과 승률', pad=20, fontsize=14)
+        ax3.set_title('월별 거래 횟수', pad=20, fontsize=14)
+        fig.tight_layout(pad=3.0)
+    return fig
+
+def monthly_statistics_figure(stats):
+    """월별 총수익/거래횟수/승률/샤프비율 (2 x 2)"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    panels = [
+        (axes[0, 0], '총수익', 'skyblue', '월별 총수익률'),
+        (axes[0, 1], '거래횟수', 'lightgreen', '월별 거래횟수'),
+        (axes[1, 0], '승률', 'salmon', '월별 승률 (%)'),
+        (axes[1, 1], '샤프비율', 'purple', '월별 샤프비율'),
+    ]
+    for ax, column, color, title in panels:
+        ax.grid(True, zorder=0)  # grid를 먼저 그리고 막대를 위에 그림
+        ax.bar(range(len(stats.index)), stats[column], color=color, zorder=3)
+        ax.set_title(title)
+        ax.set_xticks(range(len(stats.index)))
+        ax.set_xticklabels(stats.index, rotation=45)
+    fig.tight_layout()
+    return fig
+
+def parameter_heatmap_figure(pivot_table, take_profits, stop_losses):
+    """파라미터 조합별 수익률 히트맵"""
+    fig, ax = plt.subplots(figsize=(12, 8))
+    image = ax.imshow(pivot_table, cmap='RdYlGn', aspect='auto')
+    fig.colorbar(image, label='Total Return (%)')
+
+    # 축 레이블 설정 - 소수점 3자리까지 표시
+    ax.set_xticks(range(len(take_profits)), [f'{tp*1:.3f}' for tp in take_profits], rotation=45)
+    ax.set_yticks(range(len(stop_losses)), [f'{sl*1:.3f}' for sl in stop_losses])
+    ax.set_xlabel('take_profit (%)')
+    ax.set_ylabel('stop_loss (%)')
+    ax.set_title('Heatmap of returns by parameter')
+    fig.tight_layout()
+    return fig
+
+def return_distribution_figure(bb_returns, cross_returns):
+    """두 전략의 수익률 분포 비교와 볼린저밴드 전략 Q-Q Plot"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+    ax1.hist(bb_returns, bins=30, alpha=0.5, label='볼린저밴드 전략')
+    ax1.hist(cross_returns, bins=30, alpha=0.5, label='골든/데드크로스 전략')
+    ax1.set_title('수익률 분포 비교')
+    ax1.set_xlabel('수익률')
+    ax1.set_ylabel('빈도')
+    ax1.legend()
+
+    stats.probplot(bb_returns, dist="norm", plot=ax2)
+    ax2.set_title('볼린저밴드 전략 Q-Q Plot')
+    fig.tight_layout()
+    return fig
+
+def qq_figure(returns, title):
+    """수익률 정규 Q-Q Plot"""
+    fig, ax = plt.subplots(figsize=(6, 6))
+    stats.probplot(returns, dist="norm", plot=ax)
+    ax.set_title(title)
+    fig.tight_layout()
+    return fig
+
+# ---------------------------------------------------------------- 그래프 작업
+
+def cumulative_job(curves):
+    """curves: {범례 이름: 누적수익률 컬럼이 있는 거래 내역}"""
+    return FigureJob('strategy_comparison.png', cumulative_figure,
+                     {'curves': {name: df[['진입일자', '누적수익률']] for name, df in curves.items()}})
+
+def five_day_job(df_5day):
+    return FigureJob('strategy_comparison_5day.png', five_day_figure, {'df_5day': df_5day})
+
+def monthly_trading_job(summary):
+    return FigureJob('monthly_trading_2024.png', monthly_trading_figure, {'df': summary})
+
+def btc_price_job(prices):
+    return FigureJob('btc_monthly_price_2024.png', btc_price_figure, {'df': prices})
+
+def monthly_performance_job(monthly_data):
+    return FigureJob('monthly_trading_performance.png', monthly_performance_figure,
+                     {'df': monthly_data})
+
+def monthly_statistics_job(monthly_stats):
+    return FigureJob('monthly_performance.png', monthly_statistics_figure,
+                     {'stats': monthly_stats[['총수익', '거래횟수', '승률', '샤프비율']]})
+
+def parameter_heatmap_job(results_df, take_profits, stop_losses):
+    pivot_table = results_df.pivot(index='stop_loss', columns='take_profit', values='total_profit_ratio')
+    return FigureJob('ma_strategy_optimization.png', parameter_heatmap_figure,
+                     {'pivot_table': pivot_table, 'take_profits': list(take_profits),
+                      'stop_losses': list(stop_losses)})
+
+def distribution_jobs(bb_returns, cross_returns):
+    bb_returns = bb_returns.to_numpy(dtype=float)
+    cross_returns = cross_returns.to_numpy(dtype=float)
+    return [
+        FigureJob('return_distribution.png', return_distribution_figure,
+                  {'bb_returns': bb_returns, 'cross_returns': cross_returns}),
+        FigureJob('cross_qq.png', qq_figure, {'returns': cross_returns, 'title': '크로스 전략 Q-Q Plot'}),
+    ]
+
+def btc_prices_2024():
+    """2024년 월별 비트코인 가격 데이터프레임 (월, 가격)"""
+    return pd.DataFrame(list(BTC_MONTHLY_PRICES_2024.items()), columns=['월', '가격'])
+
+def report_jobs():
+    """전략 비교 + 2024년 월별 보고서 전체 그래프 작업 (저장소에 없는 실행의 그래프는 제외)"""
+    frames = load_strategy_frames()
+    curves = {name: cumulative_returns(frames[strategy])
+              for strategy, name in zip(STRATEGIES, ['볼린저 밴드', '골든/데드크로스', '이동평균선'])}
+    jobs = [
+        cumulative_job(curves),
+        five_day_job(five_day_returns(dict(zip(['기본 전략', '크로스 전략', '이동평균 전략'],
+                                               curves.values())))),
+        *distribution_jobs(frames['bb']['수익률'], frames['cross']['수익률']),
+        btc_price_job(btc_prices_2024()),
+    ]
+    try:
+        trades = load_monthly_trades()
+    except ValueError as e:
+        print(f"월별 보고서 제외: {e}")
+        return jobs
+    if not trades.empty:
+        jobs += [
+            monthly_trading_job(monthly_trade_summary(trades)),
+            monthly_performance_job(monthly_performance(trades)),
+            monthly_statistics_job(monthly_statistics(trades)),
+        ]
+    return jobs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="전체 보고서 그래프 렌더링")
+    parser.add_argument('--output', help="출력 폴더 (기본: REPORT_DIR 또는 reports)")
+    parser.add_argument('--workers', type=int, help="작업 프로세스 수 (1 이면 현재 프로세스에서 실행)")
+    parser.add_argument('--force', action='store_true', help="변경 없는 그래프도 다시 그림")
+    args = parser.parse_args(argv)
+    print_status(render_jobs(report_jobs(), args.output, args.workers, args.force))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# 헤드리스 그래프 렌더링 파이프라인
+# 분석 스크립트의 그래프를 plt.show() 로 띄우는 대신 Agg 백엔드로 파일에 저장한다.
+# 그래프 하나는 FigureJob(파일 이름, 그리기 함수, 입력 데이터)이며, 여러 그래프는 프로세스 풀에서 나눠 그린다.
+# 한글 폰트는 프로세스마다 한 번만 설정하고, 입력 데이터와 그리기 함수 모듈(+ 그 모듈이 쓰는 보조지표 모듈)
+# 소스의 해시가 지난번과 같고 파일이 남아 있으면 다시 그리지 않는다 (출력 폴더의 .render_cache.json 에 해시 기록).
+import hashlib
+import inspect
+import json
+import os
+import platform
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib import font_manager
+
+from instrumentation import timed
+
+DEFAULT_DIR = os.environ.get(
+    'REPORT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'reports')
+)
+
+CACHE_FILE = '.render_cache.json'
+
+DPI = 150
+
+LIBRARY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 운영체제별 한글 폰트 (앞에서부터 설치된 폰트 사용)
+FONT_CANDIDATES = {
+    'Windows': ['Malgun Gothic', 'NanumGothic'],
+    'Darwin': ['AppleGothic', 'NanumGothic'],
+}
+DEFAULT_FONTS = ['NanumGothic', 'Noto Sans CJK KR', 'Malgun Gothic', 'AppleGothic']
+
+_FONTS_READY = False
+
+def setup_fonts():
+    """한글 폰트/마이너스 기호 설정 (프로세스마다 한 번만 실행)"""
+    global _FONTS_READY
+    if _FONTS_READY:
+        return
+    candidates = FONT_CANDIDATES.get(platform.system(), DEFAULT_FONTS)
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    family = next((name for name in candidates if name in installed), candidates[0])
+    plt.rc('font', family=family)
+    plt.rc('axes', unicode_minus=False)
+    _FONTS_READY = True
+
+def style_context(style):
+    """matplotlib 스타일을 적용하되 setup_fonts() 의 한글 폰트는 유지하는 컨텍스트"""
+    fonts = {'font.family': plt.rcParams['font.family'], 'axes.unicode_minus': False}
+    return plt.style.context([style, fonts])
+
+class FigureJob:
+    """그래프 하나 (render(**data) 가 Figure 를 반환하면 name 파일로 저장)
+
+    render 는 작업 프로세스로 전달되므로 모듈 최상위 함수여야 한다.
+    """
+
+    def __init__(self, name, render, data, dpi=DPI):
+        self.name = name
+        self.render = render
+        self.data = data
+        self.dpi = dpi
+
+    def digest(self):
+        """입력 데이터, 그리기 함수 모듈과 의존 모듈 소스, dpi 의 해시"""
+        h = hashlib.sha1()
+        # 모듈 이름은 직접 실행(__main__)과 import 가 달라지므로 제외
+        h.update(f"{self.render.__qualname__}:{self.dpi}".encode('utf-8'))
+        h.update(module_version(self.render).encode('utf-8'))
+        _update_hash(h, self.data)
+        return h.hexdigest()
+
+_MODULE_VERSIONS = {}
+
+def _source_files(module):
+    """모듈 파일과, 모듈이 import 한 보조지표(LIBRARY_DIR) 모듈/함수의 파일 목록"""
+    files = {os.path.abspath(module.__file__)}
+    for value in vars(module).values():
+        dependency = value if inspect.ismodule(value) else inspect.getmodule(value)
+        path = getattr(dependency, '__file__', None)
+        if path and os.path.dirname(os.path.abspath(path)) == LIBRARY_DIR:
+            files.add(os.path.abspath(path))
+    return sorted(files)
+
+def module_version(func):
+    """그리기 함수가 정의된 모듈과 그 모듈이 쓰는 보조지표 모듈 소스 전체의 해시
+
+    그리기 함수가 부르는 보조 함수(다운샘플링, 축 설정 등)나 모듈 상수가 바뀌어도 그래프를 다시 그린다.
+    """
+    module = inspect.getmodule(func)
+    if getattr(module, '__file__', None) is None:
+        try:
+            return hashlib.sha1(inspect.getsource(func).encode('utf-8')).hexdigest()
+        except (OSError, TypeError):
+            return ''
+    if module.__name__ not in _MODULE_VERSIONS:
+        h = hashlib.sha1()
+        for path in _source_files(module):
+            h.update(os.path.basename(path).encode('utf-8'))
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        _MODULE_VERSIONS[module.__name__] = h.hexdigest()
+    return _MODULE_VERSIONS[module.__name__]
+
+def _update_hash(h, value):
+    # 데이터프레임/배열은 값 전체, 나머지는 repr 로 해시
+    if isinstance(value, pd.DataFrame):
+        h.update(repr((list(value.columns), [str(d) for d in value.dtypes])).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        h.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            h.update(repr(key).encode('utf-8'))
+            _update_hash(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode('utf-8'))
+        for item in value:
+            _update_hash(h, item)
+    else:
+        h.update(repr(value).encode('utf-8'))
+
+def _load_cache(directory):
+    try:
+        with open(os.path.join(directory, CACHE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(directory, cache):
+    with open(os.path.join(directory, CACHE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+def _init_worker():
+    setup_fonts()
+
+def _render(job, path):
+    """그래프 하나를 그려 저장 (프로세스 풀 작업 단위)"""
+    fig = job.render(**job.data)
+    try:
+        fig.savefig(path, dpi=job.dpi, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return path
+
+@timed('plot')
+def render_jobs(jobs, directory=None, max_workers=None, force=False):
+    """그래프 목록을 directory 에 저장 (해시가 같은 그래프는 건너뜀)
+
+    Args:
+        jobs: FigureJob 목록
+        directory: 출력 폴더 (기본: REPORT_DIR 환경변수 또는 저장소 최상위의 reports)
+        max_workers: 작업 프로세스 수 (기본: CPU 수, 1 이거나 그릴 그래프가 하나면 현재 프로세스에서 실행)
+        force: True 이면 해시와 관계없이 모두 다시 그림
+
+    Returns:
+        dict: {파일 경로: 'rendered' 또는 'cached'}
+    """
+    directory = directory or DEFAULT_DIR
+    os.makedirs(directory, exist_ok=True)
+    cache = _load_cache(directory)
+
+    status = {}
+    pending = []
+    for job in jobs:
+        path = os.path.join(directory, job.name)
+        digest = job.digest()
+        if not force and cache.get(job.name) == digest and os.path.exists(path):
+            status[path] = 'cached'
+        else:
+            pending.append((job, path, digest))
+            status[path] = 'rendered'
+
+    workers = min(len(pending), max_workers or os.cpu_count() or 1)
+    if workers == 1:
+        _init_worker()
+        for job, path, _ in pending:
+            _render(job, path)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            pending_jobs, paths, _ = zip(*pending)
+            list(executor.map(_render, pending_jobs, paths))
+
+    if pending:
+        cache.update({job.name: digest for job, _, digest in pending})
+        _save_cache(directory, cache)
+    return status
+
+def print_status(status):
+    """render_jobs 결과 출력"""
+    for path, state in status.items():
+        label = "저장" if state == 'rendered' else "변경 없음 (기존 파일 사용)"
+        print(f"그래프 {label}: {path}")
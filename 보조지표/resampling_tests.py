@@ -0,0 +1,171 @@
+# 전략 간 성과 차이의 재표본 검정
+# 모든 전략 쌍에 대해 평균 수익률/샤프 비율 차이를 stationary block bootstrap(신뢰구간, p-value)과
+# 순열 검정(p-value)으로 검정하고, 여러 쌍을 동시에 검정한 p-value 를 보정한다.
+# 재표본은 (재표본 수 x 거래 수) 인덱스 행렬로 묶음(chunk) 단위 생성해 메모리를 제한하며,
+# 묶음마다 SeedSequence.spawn 으로 나눈 시드를 쓰므로 작업 프로세스 수와 관계없이 결과가 같다.
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ('mean', 'sharpe')
+
+# 묶음 하나의 인덱스 행렬 최대 크기 (바이트)
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+
+def stationary_bootstrap_indices(rng, n, size, mean_block):
+    """stationary block bootstrap 재표본 인덱스 (size x n)
+
+    각 위치에서 확률 1/mean_block 으로 임의 위치의 새 블록을 시작하고, 아니면 직전 인덱스의
+    다음 값(끝에서는 처음으로 순환)을 이어 쓴다.
+    """
+    steps = np.arange(n)
+    starts = rng.integers(0, n, size=(size, n))
+    new_block = rng.random((size, n)) < 1.0 / mean_block
+    new_block[:, 0] = True
+    # 각 위치가 속한 블록의 시작 위치
+    block_pos = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+    block_start = np.take_along_axis(starts, block_pos, axis=1)
+    return (block_start + steps - block_pos) % n
+
+def permutation_indices(rng, n, size):
+    """순열 검정용 인덱스 (size x n, 행마다 0..n-1 의 무작위 순열)"""
+    return rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+
+def sample_statistic(samples, statistic):
+    """재표본 행렬(재표본 수 x 거래 수)의 행별 통계량"""
+    mean = samples.mean(axis=1)
+    if statistic == 'mean':
+        return mean
+    if statistic == 'sharpe':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return mean / samples.std(axis=1, ddof=1)
+    raise ValueError(f"지원하지 않는 통계량: {statistic}")
+
+def holm(p_values):
+    """Holm-Bonferroni 보정 p-value"""
+    p = np.asarray(p_values, dtype=np.float64)
+    order = np.argsort(p)
+    adjusted = np.maximum.accumulate((len(p) - np.arange(len(p))) * p[order])
+    result = np.empty_like(p)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg (FDR) 보정 p-value"""
+    p = np.asarray(p_values, dtype=np.float64)
+    order = np.argsort(p)
+    ranked = p[order] * len(p) / np.arange(1, len(p) + 1)
+    adjusted = np.minimum.accumulate(ranked[::-1])[::-1]
+    result = np.empty_like(p)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+# 작업 프로세스에서 공유하는 검정 데이터 (_init_worker 로 한 번만 전달)
+_DATA = {}
+
+def _init_worker(samples, pairs, statistics, mean_blocks):
+    _DATA.update(samples=samples, pairs=pairs, statistics=statistics, mean_blocks=mean_blocks)
+
+def _bootstrap_chunk(seed, size):
+    """재표본 묶음 하나의 전략별 통계량 (size x 전략 수 x 통계량 수)"""
+    rng = np.random.default_rng(seed)
+    samples = _DATA['samples']
+    out = np.empty((size, len(samples), len(_DATA['statistics'])))
+    for s, (values, mean_block) in enumerate(zip(samples, _DATA['mean_blocks'])):
+        resampled = values[stationary_bootstrap_indices(rng, len(values), size, mean_block)]
+        for k, statistic in enumerate(_DATA['statistics']):
+            out[:, s, k] = sample_statistic(resampled, statistic)
+    return out
+
+def _permutation_chunk(seed, size):
+    """순열 묶음 하나의 전략 쌍별 통계량 차이 (size x 쌍 수 x 통계량 수)"""
+    rng = np.random.default_rng(seed)
+    samples = _DATA['samples']
+    out = np.empty((size, len(_DATA['pairs']), len(_DATA['statistics'])))
+    for j, (a, b) in enumerate(_DATA['pairs']):
+        pooled = np.concatenate([samples[a], samples[b]])
+        shuffled = pooled[permutation_indices(rng, len(pooled), size)]
+        left, right = shuffled[:, :len(samples[a])], shuffled[:, len(samples[a]):]
+        for k, statistic in enumerate(_DATA['statistics']):
+            out[:, j, k] = sample_statistic(left, statistic) - sample_statistic(right, statistic)
+    return out
+
+def _run_chunks(task, seeds, sizes, initargs, max_workers):
+    if max_workers == 1:
+        _init_worker(*initargs)
+        return np.concatenate([task(seed, size) for seed, size in zip(seeds, sizes)])
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=initargs) as executor:
+        return np.concatenate(list(executor.map(task, seeds, sizes)))
+
+def _chunk_sizes(n_resamples, chunk_size):
+    sizes = [chunk_size] * (n_resamples // chunk_size)
+    if n_resamples % chunk_size:
+        sizes.append(n_resamples % chunk_size)
+    return sizes
+
+def resampling_tests(returns_by_name, n_resamples=100000, statistics=STATISTICS, mean_block=None,
+                     confidence=0.95, seed=0, max_workers=None, chunk_size=None):
+    """모든 전략 쌍의 통계량 차이(앞 전략 - 뒤 전략) 재표본 검정
+
+    Args:
+        returns_by_name: {전략 이름: 거래 순서대로의 수익률 배열}
+        n_resamples: bootstrap/순열 재표본 수
+        statistics: 검정할 통계량 ('mean', 'sharpe')
+        mean_block: 평균 블록 길이 (None 이면 전략별 거래 수의 세제곱근)
+        confidence: bootstrap 신뢰구간 수준
+        seed: 재표본 시드 (같은 시드면 작업 프로세스 수와 관계없이 같은 결과)
+        max_workers: 작업 프로세스 수 (1 이면 현재 프로세스에서 실행)
+        chunk_size: 묶음당 재표본 수 (None 이면 인덱스 행렬이 MAX_CHUNK_BYTES 이하가 되도록)
+
+    Returns:
+        pd.DataFrame: 쌍/통계량별 관측 차이, 신뢰구간, bootstrap/순열 p-value, 보정 p-value
+    """
+    names = list(returns_by_name)
+    samples = [np.asarray(returns_by_name[name], dtype=np.float64) for name in names]
+    pairs = list(combinations(range(len(names)), 2))
+    statistics = tuple(statistics)
+    if mean_block is None:
+        mean_blocks = [max(1.0, len(values) ** (1 / 3)) for values in samples]
+    else:
+        mean_blocks = [float(mean_block)] * len(samples)
+
+    if chunk_size is None:
+        longest = max(len(samples[a]) + len(samples[b]) for a, b in pairs)
+        chunk_size = max(1, MAX_CHUNK_BYTES // (longest * 8 * 3))
+    sizes = _chunk_sizes(n_resamples, chunk_size)
+    boot_seeds, perm_seeds = np.random.SeedSequence(seed).spawn(2)
+    initargs = (samples, pairs, statistics, mean_blocks)
+
+    boot = _run_chunks(_bootstrap_chunk, boot_seeds.spawn(len(sizes)), sizes, initargs, max_workers)
+    perm = _run_chunks(_permutation_chunk, perm_seeds.spawn(len(sizes)), sizes, initargs,
+                       max_workers)
+
+    alpha = (1 - confidence) / 2
+    rows = []
+    for j, (a, b) in enumerate(pairs):
+        for k, statistic in enumerate(statistics):
+            observed = (sample_statistic(samples[a][None, :], statistic)[0]
+                        - sample_statistic(samples[b][None, :], statistic)[0])
+            boot_diff = boot[:, a, k] - boot[:, b, k]
+            boot_diff = boot_diff[~np.isnan(boot_diff)]
+            # bootstrap 분포를 0 중심으로 옮겨 귀무가설(차이 없음) 아래의 극단값 비율 계산
+            boot_extreme = np.sum(np.abs(boot_diff - observed) >= abs(observed))
+            perm_extreme = np.sum(np.abs(perm[:, j, k]) >= abs(observed))
+            rows.append({
+                'strategy_a': names[a],
+                'strategy_b': names[b],
+                'statistic': statistic,
+                'observed': observed,
+                'ci_low': np.quantile(boot_diff, alpha),
+                'ci_high': np.quantile(boot_diff, 1 - alpha),
+                'bootstrap_p': (boot_extreme + 1) / (len(boot_diff) + 1),
+                'permutation_p': (perm_extreme + 1) / (n_resamples + 1),
+            })
+
+    result = pd.DataFrame(rows)
+    result['p_holm'] = holm(result['permutation_p'])
+    result['p_bh'] = benjamini_hochberg(result['permutation_p'])
+    return result
@@ -0,0 +1,146 @@
+# 파라미터 스윕 실행 및 체크포인트/재시작
+import json
+import sqlite3
+import time
+from itertools import product
+
+import numpy as np
+
+
+def _to_builtin(value):
+    """numpy 스칼라 등을 JSON 으로 저장 가능한 파이썬 기본 타입으로 변환"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"JSON 으로 변환할 수 없는 타입: {type(value)}")
+
+
+def cell_key(params):
+    """파라미터 조합을 체크포인트 키 문자열로 변환 (부동소수 오차를 없애기 위해 반올림)"""
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float):
+            value = round(value, 10)
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True)
+
+
+class SweepCheckpoint:
+    """완료된 파라미터 조합의 결과를 SQLite 파일에 추가 기록(append-only)하는 체크포인트
+
+    결과는 메모리에 모았다가 flush_every 개 또는 flush_interval 초마다 한 번에 커밋한다.
+    같은 파일에서 다시 시작하면 이미 완료된 조합은 completed() 에 포함되어 건너뛸 수 있다.
+    """
+
+    def __init__(self, path, flush_every=10, flush_interval=30.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'cell TEXT PRIMARY KEY, result TEXT, finished_at REAL NOT NULL)'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+        self.conn.commit()
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    def get_meta(self, key, default=None):
+        """스윕 설정값(데이터 구간 등) 조회"""
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        """스윕 설정값 저장 (재시작 시 같은 조건으로 이어가기 위해 사용)"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            (key, json.dumps(value, default=_to_builtin))
+        )
+        self.conn.commit()
+
+    def completed(self):
+        """이미 완료된 파라미터 조합 키 집합"""
+        done = {row[0] for row in self.conn.execute('SELECT cell FROM results')}
+        done.update(cell for cell, _, _ in self._pending)
+        return done
+
+    def add(self, params, result):
+        """파라미터 조합 하나의 결과 기록 (결과가 없으면 None 으로 완료만 표시)"""
+        payload = None if result is None else json.dumps(result, default=_to_builtin)
+        self._pending.append((cell_key(params), payload, time.time()))
+        if (len(self._pending) >= self.flush_every or
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """모아둔 결과를 한 번의 트랜잭션으로 파일에 추가"""
+        if self._pending:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO results (cell, result, finished_at) VALUES (?, ?, ?)',
+                self._pending
+            )
+            self.conn.commit()
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def results(self):
+        """저장된 결과를 {키: 결과 dict} 형태로 반환 (결과가 없는 조합은 None)"""
+        self.flush()
+        return {
+            cell: (json.loads(payload) if payload is not None else None)
+            for cell, payload in self.conn.execute('SELECT cell, result FROM results')
+        }
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_grid(param_grid):
+    """{이름: 값 목록} 형태의 그리드에서 모든 파라미터 조합을 dict 로 생성"""
+    names = list(param_grid)
+    for values in product(*param_grid.values()):
+        yield dict(zip(names, values))
+
+
+def run_sweep(param_grid, evaluate, checkpoint=None, progress=True):
+    """그리드의 모든 조합에 대해 evaluate(**params) 실행 후 결과 dict 목록을 그리드 순서대로 반환
+
+    checkpoint(SweepCheckpoint)가 주어지면 완료된 조합은 저장된 결과를 재사용하고
+    새로 계산한 결과는 체크포인트에 기록한다. evaluate 가 None 을 반환한 조합은 결과에서 제외된다.
+    """
+    cells = list(iter_grid(param_grid))
+    saved = checkpoint.results() if checkpoint is not None else {}
+    total = len(cells)
+    skipped = sum(1 for params in cells if cell_key(params) in saved)
+    if progress and skipped:
+        print(f"체크포인트에서 {skipped}/{total}개 조합을 불러왔습니다.")
+
+    results = []
+    for current, params in enumerate(cells, start=1):
+        key = cell_key(params)
+        if key in saved:
+            result = saved[key]
+        else:
+            if progress:
+                print(f"진행률: {current}/{total} ({current/total*100:.1f}%)")
+            result = evaluate(**params)
+            if checkpoint is not None:
+                checkpoint.add(params, result)
+        if result is not None:
+            results.append(result)
+
+    if checkpoint is not None:
+        checkpoint.flush()
+    return results
@@ -0,0 +1,179 @@
+# 시드 기반 가상 시장 데이터 (오프라인용 pyupbit.get_ohlcv 대체)
+# 일봉 수준에서 국면 전환(상승/하락/횡보), 변동성 군집(로그 변동성 AR(1)), 점프를 포함한 GBM 을 만들고,
+# 하루(09:00 KST 시작) 안의 1분봉은 그날 시가에서 종가로 가는 브라운 브리지로 채운다.
+# 하루 단위로 (seed, 종목, 날짜) 시드를 쓰므로 count/to/interval 이 달라도 겹치는 구간의 캔들은 항상 같다.
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# 가상 시장의 첫 날 (업비트 원화 시장 개장일, 09:00 KST)
+EPOCH = pd.Timestamp('2017-09-25 09:00')
+# 미리 만드는 일봉 수 (EPOCH 부터 약 55년)
+HORIZON_DAYS = 20_000
+DAY_MINUTES = 1440
+
+INTERVAL_MINUTES = {
+    'minute1': 1, 'minute3': 3, 'minute5': 5, 'minute10': 10, 'minute15': 15,
+    'minute30': 30, 'minute60': 60, 'minute240': 240, 'day': 1440,
+}
+
+# 국면별 연 수익률(drift)/연 변동성
+REGIMES = [
+    {'name': 'bull', 'drift': 0.8, 'volatility': 0.6},
+    {'name': 'bear', 'drift': -0.6, 'volatility': 0.8},
+    {'name': 'sideways', 'drift': 0.0, 'volatility': 0.4},
+]
+REGIME_STAY = 0.98          # 국면이 다음 날에도 유지될 확률
+VOL_PERSISTENCE = 0.95      # 일별 로그 변동성 AR(1) 계수
+VOL_OF_VOL = 0.15           # 일별 로그 변동성 충격 크기
+INTRADAY_PERSISTENCE = 0.98
+INTRADAY_VOL_OF_VOL = 0.05
+JUMP_PROBABILITY = 0.02     # 하루에 점프가 있을 확률
+JUMP_SCALE = 0.05           # 점프 크기(로그 수익률) 표준편차
+VALUE_PER_MINUTE = 2e8      # 분당 평균 거래대금 (KRW)
+
+START_PRICES = {'KRW-BTC': 4_500_000, 'KRW-ETH': 330_000, 'KRW-XRP': 230}
+DEFAULT_START_PRICE = 10_000
+
+# 업비트 원화 시장 호가 단위 (가격 하한, 호가 단위)
+TICK_SIZES = [
+    (2_000_000, 1000), (1_000_000, 500), (500_000, 100), (100_000, 50), (10_000, 10),
+    (1_000, 1), (100, 0.1), (10, 0.01), (1, 0.001), (0, 0.0001),
+]
+
+def tick_size(price):
+    """가격별 호가 단위 배열"""
+    price = np.asarray(price, dtype=np.float64)
+    return np.select([price >= floor for floor, _ in TICK_SIZES], [tick for _, tick in TICK_SIZES])
+
+def _ticker_key(ticker):
+    return zlib.crc32(ticker.encode('utf-8'))
+
+@lru_cache(maxsize=32)
+def daily_path(ticker, seed=0):
+    """종목의 일별 시가/종가(로그), 일 변동성, 점프, 국면 (EPOCH 부터 HORIZON_DAYS 일)"""
+    rng = np.random.default_rng([seed, _ticker_key(ticker)])
+    n = HORIZON_DAYS
+
+    # 국면 전환: 기하분포 기간마다 다른 국면으로 이동
+    durations = rng.geometric(1 - REGIME_STAY, size=n)
+    steps = rng.integers(1, len(REGIMES), size=n)
+    labels = np.concatenate([[rng.integers(len(REGIMES))], steps[1:]]).cumsum() % len(REGIMES)
+    regime = np.repeat(labels, durations)[:n]
+    drift = np.array([r['drift'] for r in REGIMES])[regime] / 365
+    volatility = np.array([r['volatility'] for r in REGIMES])[regime] / np.sqrt(365)
+
+    # 변동성 군집: 로그 변동성 AR(1) (평균이 국면 변동성이 되도록 보정)
+    log_vol = lfilter([VOL_OF_VOL], [1, -VOL_PERSISTENCE], rng.standard_normal(n))
+    sigma = volatility * np.exp(log_vol - VOL_OF_VOL ** 2 / (1 - VOL_PERSISTENCE ** 2))
+
+    jumps = np.where(rng.random(n) < JUMP_PROBABILITY, rng.normal(0, JUMP_SCALE, n), 0.0)
+    returns = drift - sigma ** 2 / 2 + sigma * rng.standard_normal(n) + jumps
+    log_close = np.log(START_PRICES.get(ticker, DEFAULT_START_PRICE)) + np.cumsum(returns)
+    log_open = np.concatenate([[log_close[0] - returns[0]], log_close[:-1]])
+    return log_open, log_close, sigma, jumps, regime
+
+def minute_bars(ticker, first_day, last_day, seed=0):
+    """first_day ~ last_day (EPOCH 기준 날짜 번호) 의 1분봉 (날짜 수 x 1440 배열 dict)"""
+    log_open, log_close, sigma, jumps, _ = daily_path(ticker, seed)
+    days = np.arange(first_day, last_day + 1)
+    n_days = len(days)
+    key = _ticker_key(ticker)
+
+    # 날짜별 시드로 난수 생성 (구간이 달라도 같은 날은 같은 값)
+    noise = np.empty((4, n_days, DAY_MINUTES))
+    jump_minute = np.empty(n_days, dtype=np.int64)
+    for row, day in enumerate(days):
+        rng = np.random.default_rng([seed, key, int(day)])
+        noise[:, row] = rng.standard_normal((4, DAY_MINUTES))
+        jump_minute[row] = rng.integers(DAY_MINUTES)
+    diffusion, vol_noise, range_noise, volume_noise = noise
+
+    # 분 단위 변동성 군집 (하루 분산의 합이 그날 일 변동성과 같도록 정규화)
+    weight = np.exp(lfilter([INTRADAY_VOL_OF_VOL], [1, -INTRADAY_PERSISTENCE], vol_noise, axis=1))
+    weight /= np.sqrt(np.mean(weight ** 2, axis=1, keepdims=True))
+    minute_sigma = sigma[days, None] / np.sqrt(DAY_MINUTES) * weight
+
+    # 시가 -> (종가 - 점프) 브라운 브리지 + 점프 시각 이후 점프 반영
+    t = np.arange(1, DAY_MINUTES + 1) / DAY_MINUTES
+    walk = np.cumsum(minute_sigma * diffusion, axis=1)
+    bridge = walk - t * walk[:, -1:]
+    jump = jumps[days, None] * (np.arange(DAY_MINUTES) >= jump_minute[:, None])
+    start = log_open[days, None]
+    close_path = start + (log_close[days] - start[:, 0] - jumps[days])[:, None] * t + bridge + jump
+
+    close = np.exp(close_path)
+    open_ = np.exp(np.concatenate([start, close_path[:, :-1]], axis=1))
+    tick = tick_size(close)
+    close = np.round(close / tick) * tick
+    open_ = np.round(open_ / tick) * tick
+    spread = np.exp(np.abs(range_noise) * minute_sigma * 0.5)
+    high = np.ceil(np.maximum(open_, close) * spread / tick) * tick
+    low = np.maximum(np.floor(np.minimum(open_, close) / spread / tick) * tick, tick)
+
+    # 거래대금: 변동이 큰 분일수록 많음
+    activity = (0.5 + np.abs(diffusion)) / (0.5 + np.sqrt(2 / np.pi))
+    value = VALUE_PER_MINUTE * np.exp(0.5 * volume_noise - 0.125) * activity
+    volume = value / ((open_ + close) / 2)
+    return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume,
+            'value': value}
+
+def aggregate_bars(bars, minutes):
+    """(날짜 수 x 1440) 1분봉을 minutes 분봉으로 합침 (각 날짜의 09:00 KST 기준 정렬)"""
+    if minutes == 1:
+        return {name: values.ravel() for name, values in bars.items()}
+    shape = (bars['open'].shape[0], DAY_MINUTES // minutes, minutes)
+    return {
+        'open': bars['open'].reshape(shape)[..., 0].ravel(),
+        'high': bars['high'].reshape(shape).max(axis=2).ravel(),
+        'low': bars['low'].reshape(shape).min(axis=2).ravel(),
+        'close': bars['close'].reshape(shape)[..., -1].ravel(),
+        'volume': bars['volume'].reshape(shape).sum(axis=2).ravel(),
+        'value': bars['value'].reshape(shape).sum(axis=2).ravel(),
+    }
+
+def now_kst():
+    """현재 한국 시각 (timezone 없는 Timestamp, pyupbit index 와 같은 기준)"""
+    return pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None)
+
+def generate_ohlcv(ticker="KRW-BTC", interval="minute1", count=200, end=None, seed=0,
+                   block_days=64):
+    """end(KST) 이전에 시작한 마지막 count 개 캔들 (pyupbit.get_ohlcv 와 같은 컬럼/KST index)
+
+    EPOCH 이전 구간은 없으므로 상장 직후처럼 count 보다 적게 반환될 수 있다.
+    1분봉은 block_days 일씩 만들어 합치므로 임시 메모리는 block_days 에만 비례한다.
+    """
+    if interval not in INTERVAL_MINUTES:
+        raise ValueError(f"지원하지 않는 interval: {interval}")
+    minutes = INTERVAL_MINUTES[interval]
+    bar = pd.Timedelta(minutes=minutes)
+    end = now_kst() if end is None else pd.Timestamp(end)
+    end_bar = min(int(np.ceil((end - EPOCH) / bar)), HORIZON_DAYS * DAY_MINUTES // minutes)
+    first_bar = max(end_bar - count, 0)
+    if end_bar <= first_bar:
+        return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume', 'value'],
+                            index=pd.DatetimeIndex([]), dtype=np.float64)
+
+    per_day = DAY_MINUTES // minutes
+    first_day, last_day = first_bar // per_day, (end_bar - 1) // per_day
+    parts = []
+    for day in range(first_day, last_day + 1, block_days):
+        block = minute_bars(ticker, day, min(day + block_days - 1, last_day), seed)
+        parts.append(aggregate_bars(block, minutes))
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    offset = first_bar - first_day * per_day
+    index = EPOCH + np.arange(first_bar, end_bar) * bar
+    return pd.DataFrame({name: values[offset:offset + len(index)]
+                         for name, values in columns.items()}, index=pd.DatetimeIndex(index))
+
+def get_ohlcv(ticker="KRW-BTC", interval="day", count=200, to=None, period=0.1, seed=0):
+    """pyupbit.get_ohlcv 와 같은 인자/결과 형식의 가상 캔들
+
+    to 는 pyupbit 와 같이 UTC 기준 시각이며 (없으면 현재 시각), 그 이전에 시작한 캔들을 반환한다.
+    period(요청 간격)는 호환용으로만 받는다.
+    """
+    end = None if to is None else pd.Timestamp(to) + pd.Timedelta(hours=9)
+    return generate_ohlcv(ticker, interval, count, end, seed)
@@ -0,0 +1,41 @@
+# 배열 인터페이스(indicator_arrays/run_arrays) 점검
+# python -m pytest 보조지표/test_array_backtest.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from array_views import readonly_view
+from backtest_result import check_zero_copy, run_array_backtest, run_backtest
+from incremental_backtest import STRATEGIES
+from synthetic_market import generate_ohlcv
+
+N_BARS = 200_000
+
+@pytest.mark.parametrize('name', sorted(STRATEGIES))
+def test_run_arrays_allocation_bound(name):
+    # 새로 할당된 메모리(봉별 결과 배열 제외)가 float64 컬럼 하나의 절반보다 작아야 함
+    result = check_zero_copy(name, n_bars=N_BARS)
+    assert result['peak'] - result['output'] < 8 * N_BARS // 2
+
+@pytest.mark.parametrize('name', sorted(STRATEGIES))
+def test_run_arrays_rejects_writes(name):
+    close = readonly_view(np.linspace(1e8, 1.1e8, 500))
+    strategy = STRATEGIES[name]()
+    indicators = {key: readonly_view(values) for key, values in strategy.indicator_arrays(close).items()}
+    with pytest.raises(ValueError):
+        indicators[next(iter(indicators))][0] = 0
+    strategy.run_arrays(close, pd.date_range('2024-01-01', periods=len(close), freq='min'), indicators)
+
+@pytest.mark.parametrize('name', sorted(STRATEGIES))
+def test_array_backtest_matches_execute_strategy(name):
+    candles = generate_ohlcv("KRW-BTC", "minute5", 3000, end=pd.Timestamp('2025-01-10 09:00'), seed=3)
+    start = candles.index[500]
+    expected = run_backtest(name, candles, start, take_profit=0.01, stop_loss=0.01)
+    indicators = STRATEGIES[name]().indicator_arrays(candles['close'].to_numpy())
+    first = candles.index.searchsorted(start)
+    result = run_array_backtest(name, candles.iloc[first:],
+                                {key: values[first:] for key, values in indicators.items()},
+                                take_profit=0.01, stop_loss=0.01)
+    assert len(expected) > 0
+    assert result.trade_list() == expected.trade_list()
+    assert result.open_position == expected.open_position
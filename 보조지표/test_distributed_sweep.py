@@ -0,0 +1,112 @@
+# 작업 큐(SQLiteQueue/FileQueue)의 임대/하트비트/재시도와 결과 모으기 점검
+# python -m pytest 보조지표/test_distributed_sweep.py
+import os
+
+import pytest
+
+from distributed_sweep import FileQueue, collect, make_datasets, open_queue, run_worker, submit
+from sweep import SweepCheckpoint
+from trade_store import SWEEP_RUN, TradeStore
+
+EXPIRED = -1.0  # 임대하자마자 만료되는 임대 시간
+
+def chunks(n=1):
+    return [(f"chunk-{i}", 'data', {'n': i}) for i in range(n)]
+
+@pytest.fixture(params=['sqlite', 'file'])
+def queue(request, tmp_path):
+    if request.param == 'sqlite':
+        url = f"sqlite:{tmp_path / 'queue.db'}"
+    else:
+        url = f"file:{tmp_path / 'queue'}"
+    with open_queue(url) as queue:
+        yield queue
+
+def test_expired_lease_is_leased_again(queue):
+    queue.put(chunks())
+    assert queue.lease('w1', lease_seconds=EXPIRED)[0] == 'chunk-0'
+    assert queue.lease('w2')[0] == 'chunk-0'
+    assert queue.counts() == {'leased': 1}
+
+def test_live_lease_is_not_leased_again(queue):
+    queue.put(chunks())
+    assert queue.lease('w1') is not None
+    assert queue.lease('w2') is None
+    assert queue.heartbeat('w1', 'chunk-0')
+
+def test_heartbeat_and_complete_after_lost_lease(queue):
+    queue.put(chunks())
+    queue.lease('w1', lease_seconds=EXPIRED)
+    queue.lease('w2')
+    assert not queue.heartbeat('w1', 'chunk-0')
+    assert not queue.complete('w1', 'chunk-0', {'worker': 'w1'})
+    assert queue.complete('w2', 'chunk-0', {'worker': 'w2'})
+    assert [result for _, _, result in queue.collect()] == [{'worker': 'w2'}]
+
+def test_failed_attempts_move_chunk_to_failed(queue):
+    queue.put(chunks())
+    for _ in range(2):
+        chunk_id, _, _ = queue.lease('w1', max_attempts=2)
+        queue.fail('w1', chunk_id, 'ValueError: 실패', max_attempts=2)
+    assert queue.counts() == {'failed': 1}
+    assert queue.failures() == [('chunk-0', 2, 'ValueError: 실패')]
+    assert queue.lease('w1', max_attempts=2) is None
+
+def test_expired_attempts_move_chunk_to_failed(queue):
+    queue.put(chunks())
+    assert queue.lease('w1', lease_seconds=EXPIRED, max_attempts=2) is not None
+    assert queue.lease('w2', lease_seconds=EXPIRED, max_attempts=2) is not None
+    assert queue.lease('w3', max_attempts=2) is None
+    assert queue.counts() == {'failed': 1}
+    assert [attempts for _, attempts, _ in queue.failures()] == [2]
+
+def abandon_claim(queue, name, monkeypatch):
+    # 임대 중(숨은 파일로 옮긴 뒤 임대 파일을 만들기 전) 종료된 프로세스가 남긴 만료된 숨은 파일
+    monkeypatch.setattr(queue, 'CLAIM_SECONDS', EXPIRED)
+    claim = queue._claim(queue._path('pending', name))
+    monkeypatch.undo()
+    return claim
+
+def test_abandoned_claim_is_recovered(tmp_path, monkeypatch):
+    queue = FileQueue(str(tmp_path / 'queue'))
+    queue.put(chunks())
+    claim = abandon_claim(queue, 'data~chunk-0.json', monkeypatch)
+    assert queue.counts() == {'leased': 1}
+    chunk_id, _, payload = queue.lease('w1')
+    assert (chunk_id, payload) == ('chunk-0', {'n': 0})
+    assert not os.path.exists(claim)
+    assert queue.complete('w1', chunk_id, {'worker': 'w1'})
+
+def test_abandoned_claim_of_finished_chunk_is_removed(tmp_path, monkeypatch):
+    queue = FileQueue(str(tmp_path / 'queue'))
+    queue.put(chunks())
+    chunk_id, _, _ = queue.lease('w1')
+    queue.complete('w1', chunk_id, {'worker': 'w1'})
+    # 완료 보고 직후 다른 워커가 만료로 되돌린 사본
+    queue._write(queue._path('pending', 'data~chunk-0.json'),
+                 {'chunk_id': 'chunk-0', 'data_key': 'data', 'payload': {}, 'attempts': 1, 'error': None})
+    abandon_claim(queue, 'data~chunk-0.json', monkeypatch)
+    assert queue.lease('w2') is None
+    assert queue.counts() == {'done': 1}
+
+def test_collect_twice_is_idempotent(queue, tmp_path, monkeypatch):
+    monkeypatch.setenv('CANDLE_SOURCE', 'synthetic')
+    grid = {'take_profit': [0.01, 0.02], 'stop_loss': [0.01]}
+    submit(queue, 'job', 'ma', make_datasets(['20250101:20250103']), grid, chunk_size=1, store_trades=True)
+    assert run_worker(queue, 'w1', poll_interval=0) == 2
+
+    with SweepCheckpoint(str(tmp_path / 'results.db')) as checkpoint, \
+            TradeStore(str(tmp_path / 'store.db')) as store:
+        # 결과를 기록한 뒤 collected 로 표시하기 전에 종료된 경우: 다음 collect 가 같은 결과를 다시 모음
+        with monkeypatch.context() as patch:
+            patch.setattr(queue, 'mark_collected', lambda chunk_ids: None)
+            collect(queue, checkpoint, store)
+        first = (checkpoint.results(), store.runs(kind=SWEEP_RUN)['run_id'].tolist(), len(store.read_trades()))
+        workers = collect(queue, checkpoint, store)
+        second = (checkpoint.results(), store.runs(kind=SWEEP_RUN)['run_id'].tolist(), len(store.read_trades()))
+        assert workers == {'w1': {'chunks': 2, 'loads': 1}}
+        assert collect(queue, checkpoint, store) == {}
+
+    assert len(first[0]) == 2 and len(first[1]) == 2 and first[2] > 0
+    assert second == first
+    assert queue.counts() == {'collected': 2}
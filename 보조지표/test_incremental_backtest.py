@@ -0,0 +1,60 @@
+# 증분 백테스트(run + extend)가 전체 재실행과 같은 거래/상태를 만드는지 점검
+# python -m pytest 보조지표/test_incremental_backtest.py
+import pandas as pd
+import pytest
+
+from incremental_backtest import STRATEGIES, IncrementalBacktest
+from synthetic_market import generate_ohlcv
+from trade_store import INCREMENTAL_RUN, TradeStore
+
+# 최초 실행 이후 extend 할 캔들 수 (한 봉씩, 여러 봉씩 이어가는 경우 모두 포함)
+STEPS = (1, 1, 2, 5, 13, 89, 400)
+
+def candles():
+    return generate_ohlcv("KRW-BTC", "minute5", 3000, end=pd.Timestamp('2025-01-10 09:00'), seed=7)
+
+def state(backtest):
+    strategy = backtest.strategy
+    return {
+        'position': strategy.position,
+        'entry_price': strategy.entry_price,
+        'entry_date': strategy.entry_date,
+        'stats': strategy.stats.totals(),
+        'last_time': backtest.last_time,
+    }
+
+@pytest.mark.parametrize('name', sorted(STRATEGIES))
+def test_extend_matches_full_rerun(name, tmp_path):
+    data = candles()
+    start = data.index[500]
+    full = IncrementalBacktest(name)
+    expected = full.run(data, start=start)
+
+    backtest = IncrementalBacktest(name)
+    cut = 1000
+    trades = list(backtest.run(data.iloc[:cut], start=start))
+    path = tmp_path / 'state.pkl'
+    step = 0
+    while cut < len(data):
+        # 실행 사이마다 상태 파일로 저장/복원
+        backtest.save(path)
+        backtest = IncrementalBacktest.load(path)
+        end = min(cut + STEPS[step % len(STEPS)], len(data))
+        trades += backtest.extend(data.iloc[cut:end])
+        cut, step = end, step + 1
+
+    assert len(expected) > 0
+    assert trades == expected
+    assert state(backtest) == state(full)
+    pd.testing.assert_frame_equal(backtest.tail, full.tail)
+
+def test_append_trades_skips_saved_trades(tmp_path):
+    # 상태 파일 저장 전에 종료되어 같은 거래를 다시 추가해도 저장소에는 한 번만 남음
+    data = candles()
+    backtest = IncrementalBacktest('bb')
+    trades = backtest.run(data, start=data.index[500])
+    with TradeStore(str(tmp_path / 'store.db')) as store:
+        store.write_run(trades[:3], 'bb', run_id='bb_incremental', kind=INCREMENTAL_RUN)
+        assert store.append_trades('bb_incremental', trades) == len(trades) - 3
+        assert store.append_trades('bb_incremental', trades) == 0
+        assert len(store.read_trades(run_id='bb_incremental')) == len(trades)
@@ -0,0 +1,66 @@
+# 백테스트 결과 출력/저장 (선택 단계)
+# 거래 내역 표는 거래마다 f-string 으로 출력하지 않고 표 전체를 한 번의 to_string/CSV 쓰기로 만든다.
+# pandas 표시 옵션은 전역으로 바꾸지 않고 display_options() 안에서만 적용한다.
+import pandas as pd
+
+from instrumentation import timed
+
+# 전략 거래 내역 dict 키 -> 출력용 한글 컬럼명
+TABLE_COLUMNS = {
+    'position': '포지션',
+    'entry_date': '진입일자',
+    'exit_date': '종료일자',
+    'entry_price': '진입가격',
+    'exit_price': '종료가격',
+    'profit_ratio': '수익률',
+    'profit': '수익금액',
+}
+
+TABLE_FORMATTERS = {
+    '진입가격': '{:,.0f} KRW'.format,
+    '종료가격': '{:,.0f} KRW'.format,
+    '수익률': '{:+.2f}%'.format,
+    '수익금액': '{:,.0f} KRW'.format,
+}
+
+def display_options():
+    """요약 표 출력용 pandas 표시 옵션 (with 블록 안에서만 적용)"""
+    return pd.option_context('display.max_rows', None, 'display.width', None,
+                             'display.float_format', '{:,.2f}'.format)
+
+@timed('trade_table')
+def trade_table(trades):
+    """청산된 거래 내역(dict 목록 또는 데이터프레임)을 한글 컬럼 표로 변환 (수익률은 %)"""
+    df = pd.DataFrame(trades)
+    if df.empty:
+        return pd.DataFrame(columns=list(TABLE_COLUMNS.values()))
+    if 'exit_date' in df:
+        df = df[df['exit_date'].notna()]
+    table = df[list(TABLE_COLUMNS)].rename(columns=TABLE_COLUMNS)
+    table['수익률'] = table['수익률'].astype(float) * 100
+    for column in ['진입일자', '종료일자']:
+        table[column] = pd.to_datetime(table[column]).dt.strftime('%Y-%m-%d %H:%M:%S')
+    return table
+
+def format_trade_table(trades):
+    """거래 내역 표 문자열 (표 전체를 한 번에 변환)"""
+    table = trade_table(trades)
+    if table.empty:
+        return "(거래 없음)"
+    return table.to_string(index=False, formatters=TABLE_FORMATTERS)
+
+def format_trade_stats(stats):
+    """거래 통계 dict (metrics.trade_metrics 또는 TradeStats.totals) 출력 문자열"""
+    return "\n".join([
+        "=== 거래 통계 ===",
+        f"총 거래 횟수: {int(stats['trades'])}",
+        f"승률: {stats['win_rate']:.2f}%",
+        f"평균 수익: {stats['avg_win'] * 100:.2f}%",
+        f"평균 손실: {stats['avg_loss'] * 100:.2f}%",
+    ])
+
+@timed('csv')
+def write_trades_csv(trades, path):
+    """거래 내역 표를 CSV 로 한 번에 저장"""
+    trade_table(trades).to_csv(path, index=False, encoding='utf-8-sig')
+    return path
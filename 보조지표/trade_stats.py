@@ -0,0 +1,213 @@
+# 거래 통계 누적기 (거래가 청산될 때마다 갱신)
+# 전체 거래 내역을 데이터프레임으로 만들지 않고 Welford 방식의 평균/분산, 최소/최대, 개수/합계와
+# KLL 분위수 스케치를 (포지션, 종료이유)별로 누적해 실행 중에도 요약 통계를 볼 수 있다.
+# 메모리는 거래 수와 관계없이 그룹 수와 스케치 크기(k)에만 비례한다.
+import math
+import random
+
+import pandas as pd
+
+class RunningStats:
+    """Welford 방식 누적 통계 (개수, 합계, 평균, 분산, 최소, 최대)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value):
+        value = float(value)
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        """다른 누적 통계를 합침 (병렬/분할 실행 결과 합치기)"""
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """표본 분산 (ddof=1, pandas std 와 같은 기준)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+class KLLSketch:
+    """KLL 분위수 스케치 (k 가 클수록 정확, 메모리는 약 k * log(n / k))"""
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.count = 0
+        self.compactors = [[]]
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level):
+        height = len(self.compactors)
+        return max(2, int(math.ceil(self.k * (2 / 3) ** (height - level - 1))))
+
+    def update(self, value):
+        self.compactors[0].append(float(value))
+        self.count += 1
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compress()
+
+    def _compress(self):
+        # 가득 찬 층을 아래부터 정렬해 절반(홀수/짝수 위치 중 무작위)만 한 층 위로 올림
+        level = 0
+        while level < len(self.compactors):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items = sorted(self.compactors[level])
+                keep = [items.pop()] if len(items) % 2 else []
+                offset = self._rng.randint(0, 1)
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = keep
+            level += 1
+
+    def merge(self, other):
+        """다른 스케치를 합침"""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        while any(len(items) >= self._capacity(level)
+                  for level, items in enumerate(self.compactors)):
+            self._compress()
+        return self
+
+    def quantile(self, q):
+        """q 분위수 추정값 (0 <= q <= 1)"""
+        weighted = sorted((value, 2 ** level) for level, items in enumerate(self.compactors)
+                          for value in items)
+        if not weighted:
+            return math.nan
+        target = q * sum(weight for _, weight in weighted)
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+class TradeStats:
+    """청산된 거래의 수익률/수익금 통계를 (포지션, 종료이유)별로 누적"""
+
+    def __init__(self, k=200):
+        self.k = k
+        self.ratios = {}  # (포지션, 종료이유) -> 수익률 RunningStats
+        self.profits = {}  # (포지션, 종료이유) -> 수익금 RunningStats
+        self.sketches = {}  # (포지션, 종료이유) -> 수익률 KLLSketch
+        self.wins = RunningStats()
+        self.losses = RunningStats()
+
+    def add(self, trade):
+        """청산된 거래 하나 반영 (trade: 전략 거래 내역 dict)"""
+        key = (trade['position'], trade.get('exit_reason'))
+        ratio = trade['profit_ratio']
+        self.ratios.setdefault(key, RunningStats()).update(ratio)
+        self.profits.setdefault(key, RunningStats()).update(trade['profit'])
+        (self.wins if ratio > 0 else self.losses).update(ratio)
+        self.sketches.setdefault(key, KLLSketch(k=self.k)).update(ratio)
+
+    def merge(self, other):
+        """다른 누적기를 합침 (예: 기간별 병렬 실행 결과)"""
+        for mine, theirs in ((self.ratios, other.ratios), (self.profits, other.profits)):
+            for key, stats in theirs.items():
+                mine.setdefault(key, RunningStats()).merge(stats)
+        for key, sketch in other.sketches.items():
+            self.sketches.setdefault(key, KLLSketch(k=self.k)).merge(sketch)
+        self.wins.merge(other.wins)
+        self.losses.merge(other.losses)
+        return self
+
+    @classmethod
+    def from_trades(cls, trades):
+        """거래 내역 목록으로 누적기 생성 (청산되지 않은 거래는 제외)"""
+        stats = cls()
+        for trade in trades:
+            if 'exit_date' in trade:
+                stats.add(trade)
+        return stats
+
+    @property
+    def count(self):
+        return self.wins.count + self.losses.count
+
+    def totals(self):
+        """전체 거래 통계 (metrics.trade_metrics 와 같은 이름, 승률은 %)"""
+        count = self.count
+        return {
+            'trades': count,
+            'wins': self.wins.count,
+            'win_rate': self.wins.count / count * 100 if count else 0.0,
+            'avg_win': self.wins.mean if self.wins.count else 0.0,
+            'avg_loss': self.losses.mean if self.losses.count else 0.0,
+            'expectancy': (self.wins.total + self.losses.total) / count if count else math.nan,
+        }
+
+    def quantiles(self, qs=(0.05, 0.25, 0.5, 0.75, 0.95), group=None):
+        """거래 수익률 분위수 추정값 (%)
+
+        group 이 None 이면 전체 거래, 포지션('long'/'short')이면 그 포지션, (포지션, 종료이유)면 그 그룹의
+        스케치를 합쳐 추정한다.
+        """
+        sketch = KLLSketch(k=self.k)
+        for key, group_sketch in self.sketches.items():
+            if group is None or group == key or group == key[0]:
+                sketch.merge(group_sketch)
+        return pd.Series({q: sketch.quantile(q) * 100 for q in qs}, name='수익률 분위수')
+
+    def _summary(self, group_of):
+        groups = {}
+        for key in self.ratios:
+            group = group_of(key)
+            ratio, profit = groups.setdefault(group, (RunningStats(), RunningStats()))
+            ratio.merge(self.ratios[key])
+            profit.merge(self.profits[key])
+        rows = {group: [ratio.count, ratio.mean, ratio.std, ratio.min, ratio.max, profit.total]
+                for group, (ratio, profit) in sorted(groups.items(), key=lambda item: str(item[0]))}
+        summary = pd.DataFrame.from_dict(
+            rows, orient='index',
+            columns=['거래횟수', '평균수익률', '표준편차', '최소수익률', '최대수익률', '총수익금']
+        ).round(4)
+        # 수익률 계산을 퍼센트로 변환
+        for col in ['평균수익률', '최소수익률', '최대수익률']:
+            summary[col] = summary[col] * 100
+        return summary
+
+    def position_summary(self):
+        """포지션별 통계 (metrics.get_trade_summary 와 같은 형식)"""
+        if not self.ratios:
+            return pd.DataFrame()
+        summary = self._summary(lambda key: key[0])
+        summary.index.name = '포지션'
+        return summary
+
+    def reason_summary(self):
+        """(포지션, 종료이유)별 통계"""
+        if not self.ratios:
+            return pd.DataFrame()
+        summary = self._summary(lambda key: key)
+        summary.index = pd.MultiIndex.from_tuples(summary.index, names=['포지션', '종료이유'])
+        return summary
@@ -0,0 +1,262 @@
+# 거래 내역 저장소 (SQLite)
+# 전략별 타임스탬프 CSV 대신 하나의 파일에 고정된 스키마로 거래 내역을 저장하고,
+# 전략/실행(run)/날짜 조건으로 필요한 거래만 조회한다.
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from instrumentation import timed
+
+DEFAULT_PATH = os.environ.get(
+    'TRADE_STORE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'trade_store.db')
+)
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# bb_monthly_batch.py 가 저장하는 월별 일괄 실행의 run_id 접두사
+MONTHLY_BB_PREFIX = 'bb_monthly_'
+
+# 실행 종류 (분석 스크립트는 기본적으로 전략 스크립트의 main 실행만 조회)
+MAIN_RUN = 'main'                # 전략 스크립트 실행 (bb/ma/cross_indicators_trade.py)
+MONTHLY_RUN = 'monthly'          # 월별 일괄 실행 (bb_monthly_batch.py)
+INCREMENTAL_RUN = 'incremental'  # 증분 실행 (incremental_backtest.py)
+SWEEP_RUN = 'sweep'              # 파라미터 스윕의 조합별 실행 (distributed_sweep.py)
+RUN_KINDS = [MAIN_RUN, MONTHLY_RUN, INCREMENTAL_RUN, SWEEP_RUN]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    strategy TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT,
+    created_at TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'main'
+);
+CREATE TABLE IF NOT EXISTS trades (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    strategy TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    position TEXT NOT NULL CHECK (position IN ('long', 'short')),
+    entry_time TEXT NOT NULL,
+    exit_time TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    exit_price REAL NOT NULL,
+    profit_ratio REAL NOT NULL,
+    profit REAL NOT NULL,
+    exit_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trades_strategy ON trades (strategy, run_id, entry_time);
+CREATE INDEX IF NOT EXISTS idx_trades_time ON trades (entry_time);
+"""
+
+TRADE_FIELDS = ['run_id', 'strategy', 'params_hash', 'symbol', 'position', 'entry_time',
+                'exit_time', 'entry_price', 'exit_price', 'profit_ratio', 'profit', 'exit_reason']
+
+# 분석 스크립트에서 사용하는 한글 컬럼명
+REPORT_COLUMNS = {
+    'position': '포지션',
+    'entry_time': '진입일자',
+    'exit_time': '종료일자',
+    'entry_price': '진입가격',
+    'exit_price': '종료가격',
+    'profit_ratio': '수익률',
+    'profit': '수익금액',
+    'exit_reason': '종료이유',
+}
+
+def params_hash(params):
+    """전략 파라미터 dict 의 해시 (같은 파라미터면 같은 값)"""
+    payload = json.dumps(params or {}, sort_keys=True, default=float)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+def _format_time(value):
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime(TIME_FORMAT)
+
+class TradeStore:
+    """거래 내역 저장소"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_PATH
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        # kind 컬럼이 없던 저장소: 컬럼 추가 후 알려진 run_id 로 종류 채우기
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(runs)')}
+        if 'kind' not in columns:
+            with self.conn:
+                self.conn.execute(f"ALTER TABLE runs ADD COLUMN kind TEXT NOT NULL DEFAULT '{MAIN_RUN}'")
+                self.conn.execute('UPDATE runs SET kind = ? WHERE run_id LIKE ?',
+                                  (MONTHLY_RUN, MONTHLY_BB_PREFIX + '%'))
+                self.conn.execute("UPDATE runs SET kind = ? WHERE run_id = 'bb_incremental'",
+                                  (INCREMENTAL_RUN,))
+        # (run_id, entry_time) 유일 인덱스가 없던 저장소: 같은 거래가 두 번 추가된 행을 지우고 인덱스 생성
+        # (실행마다 포지션은 하나이므로 진입 시각이 같은 거래는 같은 거래)
+        indexes = {row[1] for row in self.conn.execute('PRAGMA index_list(trades)')}
+        if 'idx_trades_run_entry' not in indexes:
+            with self.conn:
+                self.conn.execute('DELETE FROM trades WHERE rowid NOT IN '
+                                  '(SELECT MIN(rowid) FROM trades GROUP BY run_id, entry_time)')
+                self.conn.execute('CREATE UNIQUE INDEX idx_trades_run_entry ON trades (run_id, entry_time)')
+                self.conn.execute('DROP INDEX IF EXISTS idx_trades_run')
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @timed('store')
+    def write_run(self, trades, strategy, params=None, symbol="KRW-BTC", interval=None, run_id=None,
+                  kind=MAIN_RUN):
+        """백테스트 한 번의 거래 내역 저장 (같은 run_id 가 있으면 덮어씀)
+
+        Args:
+            trades: 전략의 거래 내역 (dict 목록, 청산되지 않은 거래는 제외됨)
+            strategy: 전략 이름 ('bb', 'ma', 'cross')
+            params: 전략 파라미터 dict
+            kind: 실행 종류 (RUN_KINDS)
+
+        Returns:
+            str: 저장한 run_id
+        """
+        if run_id is None:
+            run_id = f"{strategy}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if kind not in RUN_KINDS:
+            raise ValueError(f"알 수 없는 실행 종류: {kind} (사용 가능: {', '.join(RUN_KINDS)})")
+        hash_ = params_hash(params)
+        with self.conn:
+            self.conn.execute('DELETE FROM trades WHERE run_id = ?', (run_id,))
+            self.conn.execute(
+                'INSERT OR REPLACE INTO runs (run_id, strategy, params_hash, params, symbol, interval, '
+                'created_at, kind) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (run_id, strategy, hash_, json.dumps(params or {}, default=float),
+                 symbol, interval, datetime.now().strftime(TIME_FORMAT), kind)
+            )
+            self._insert(run_id, strategy, hash_, symbol, trades)
+        return run_id
+
+    def append_trades(self, run_id, trades):
+        """기존 실행(run_id)에 거래 추가 (증분 백테스트에서 새로 청산된 거래 저장)
+
+        이미 저장된 거래(같은 진입 시각)는 건너뛰므로 같은 거래를 다시 추가해도 결과가 같다.
+
+        Returns:
+            int: 새로 추가한 거래 수
+        """
+        row = self.conn.execute(
+            'SELECT strategy, params_hash, symbol FROM runs WHERE run_id = ?', (run_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"저장소({self.path})에 실행 '{run_id}' 이(가) 없어 거래를 추가할 수 없습니다.")
+        strategy, hash_, symbol = row
+        with self.conn:
+            return self._insert(run_id, strategy, hash_, symbol, trades)
+
+    def _insert(self, run_id, strategy, hash_, symbol, trades):
+        rows = [
+            (run_id, strategy, hash_, symbol, trade['position'],
+             _format_time(trade['entry_date']), _format_time(trade['exit_date']),
+             float(trade['entry_price']), float(trade['exit_price']),
+             float(trade['profit_ratio']), float(trade['profit']), trade.get('exit_reason'))
+            for trade in trades if 'exit_date' in trade
+        ]
+        before = self.conn.total_changes
+        self.conn.executemany(
+            f'INSERT OR IGNORE INTO trades VALUES ({", ".join("?" * len(TRADE_FIELDS))})', rows
+        )
+        return self.conn.total_changes - before
+
+    def read_trades(self, strategy=None, run_id=None, start=None, end=None, symbol=None,
+                    params_hash=None):
+        """조건에 맞는 거래만 조회 (start 이상 end 미만의 진입 시각)
+
+        Returns:
+            pd.DataFrame: 진입 시각 순으로 정렬된 거래 내역
+        """
+        conditions = []
+        values = []
+        for column, value in (('strategy', strategy), ('run_id', run_id), ('symbol', symbol),
+                              ('params_hash', params_hash)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                values.append(value)
+        if start is not None:
+            conditions.append('entry_time >= ?')
+            values.append(_format_time(start))
+        if end is not None:
+            conditions.append('entry_time < ?')
+            values.append(_format_time(end))
+
+        query = f'SELECT {", ".join(TRADE_FIELDS)} FROM trades'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY entry_time'
+        df = pd.read_sql_query(query, self.conn, params=values)
+        df['entry_time'] = pd.to_datetime(df['entry_time'])
+        df['exit_time'] = pd.to_datetime(df['exit_time'])
+        return df
+
+    def runs(self, strategy=None, kind=None):
+        """저장된 실행 목록 (kind 가 주어지면 그 종류만)"""
+        conditions = []
+        params = []
+        for column, value in (('strategy', strategy), ('kind', kind)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        query = 'SELECT * FROM runs'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return pd.read_sql_query(query + ' ORDER BY created_at', self.conn, params=params)
+
+    def latest_run(self, strategy, kind=MAIN_RUN, prefix=None):
+        """전략의 가장 최근 실행 run_id
+
+        kind 종류의 실행 중에서 고르며 (None 이면 모든 종류), prefix 가 주어지면 그 이름으로 시작하는 실행 중에서 고른다.
+        """
+        query = 'SELECT run_id FROM runs WHERE strategy = ?'
+        params = [strategy]
+        if kind is not None:
+            query += ' AND kind = ?'
+            params.append(kind)
+        if prefix is not None:
+            query += ' AND run_id LIKE ?'
+            params.append(prefix + '%')
+        row = self.conn.execute(query + ' ORDER BY created_at DESC, run_id DESC LIMIT 1',
+                                params).fetchone()
+        if row is None:
+            raise ValueError(f"저장된 '{strategy}' 전략 거래 내역이 없습니다. (실행 종류: {kind or '전체'})")
+        return row[0]
+
+def to_report_frame(df):
+    """저장소 조회 결과를 분석 스크립트용 한글 컬럼/퍼센트 수익률 형식으로 변환"""
+    df_report = df[list(REPORT_COLUMNS)].rename(columns=REPORT_COLUMNS)
+    df_report['수익률'] = df_report['수익률'] * 100
+    return df_report
+
+def trading_month(times):
+    """매매 구간(매일 09:00 KST 시작) 기준 월 'YYYY-MM' (1일 09:00 전 거래는 전월)"""
+    return (times - pd.Timedelta(hours=9)).dt.strftime('%Y-%m')
+
+def load_report_frame(strategy, run_id=None, kind=MAIN_RUN, prefix=None, start=None, end=None, path=None):
+    """전략의 실행(기본: kind 종류의 가장 최근 실행) 거래 내역을 한글 컬럼 형식으로 조회"""
+    with TradeStore(path) as store:
+        if run_id is None:
+            run_id = store.latest_run(strategy, kind=kind, prefix=prefix)
+        return to_report_frame(store.read_trades(strategy=strategy, run_id=run_id,
+                                                 start=start, end=end))
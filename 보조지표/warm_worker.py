@@ -0,0 +1,365 @@
+# 상주 백테스트 작업 프로세스 (warm worker)
+# 캔들과 계산한 지표를 메모리에 두고 로컬 소켓(multiprocessing.connection)으로 백테스트 요청을 받아
+# execute_strategy 만 다시 실행한다. 요청마다 전략/지표 모듈 파일의 수정 시각을 확인해 바뀐 모듈을 다시 불러오고,
+# 지표 캐시는 지표 계산 함수 소스의 해시로 구분하므로 매매 루프만 고치면 지표를 그대로 재사용한다.
+# 캐시는 크기(bytes)/개수 한도를 넘으면 가장 오래 쓰지 않은 항목부터 제거한다 (LRU).
+# 요청은 pickle 로 주고받으므로 인증 키가 필요하다: WARM_WORKER_AUTHKEY 환경변수, 없으면 serve 가 처음 실행될 때
+# 만드는 사용자 전용(권한 600) 키 파일(WARM_WORKER_KEY_FILE, 기본 ~/.warm_worker_key)을 서버/클라이언트가 같이 읽는다.
+#
+#   python warm_worker.py serve --memory-mb 2048
+#   python warm_worker.py backtest ma --start 20250101 --end 20250131 --take-profit 0.04
+import argparse
+import hashlib
+import importlib
+import inspect
+import os
+import secrets
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+DEFAULT_ADDRESS = os.environ.get('WARM_WORKER_ADDRESS', '127.0.0.1:6543')
+KEY_FILE = os.environ.get('WARM_WORKER_KEY_FILE', os.path.join(os.path.expanduser('~'), '.warm_worker_key'))
+MEMORY_MB = float(os.environ.get('WARM_WORKER_MEMORY_MB', 1024))
+MAX_ENTRIES = int(os.environ.get('WARM_WORKER_MAX_ENTRIES', 64))
+
+# 전략 이름 -> (모듈, 클래스, 기본 캔들 간격)
+STRATEGY_CLASSES = {
+    'bb': ('bb_indicators_trade', 'BollingerBandStrategy', 'minute5'),
+    'ma': ('ma_indicators_trade', 'MAStrategy', 'minute10'),
+    'cross': ('cross_indicators_trade', 'CrossStrategy', 'minute5'),
+}
+
+# 수정 시 다시 불러올 모듈 (의존 순서: 앞 모듈이 바뀌면 뒤 모듈도 함께 다시 불러옴)
+RELOAD_ORDER = [
+    'indicators', 'compact_dtypes', 'array_views', 'trade_stats', 'metrics', 'equity_curve',
+    'bb_indicators_trade', 'ma_indicators_trade', 'cross_indicators_trade',
+    'incremental_backtest', 'backtest_result',
+]
+
+def parse_address(address):
+    """'host:port' 문자열을 (host, port) 로 변환"""
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+def load_authkey(create=False, path=None):
+    """인증 키 (WARM_WORKER_AUTHKEY 환경변수, 없으면 사용자 전용 키 파일)
+
+    create=True 이면 키 파일이 없을 때 임의의 키로 새로 만든다 (serve).
+    다른 사용자가 읽을 수 있는 키 파일은 사용하지 않는다.
+    """
+    key = os.environ.get('WARM_WORKER_AUTHKEY')
+    if key:
+        return key.encode('utf-8')
+    path = path or KEY_FILE
+    if create:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(secrets.token_hex(32))
+    try:
+        with open(path, encoding='utf-8') as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        raise RuntimeError(f"인증 키가 없습니다. WARM_WORKER_AUTHKEY 를 설정하거나 먼저 serve 를 실행하세요. ({path})")
+    if os.name == 'posix' and os.stat(path).st_mode & 0o077:
+        raise RuntimeError(f"다른 사용자가 읽을 수 있는 키 파일입니다: {path} (chmod 600 필요)")
+    if not key:
+        raise RuntimeError(f"키 파일이 비어 있습니다: {path}")
+    return key.encode('utf-8')
+
+class LRUCache:
+    """크기(bytes)/개수 한도가 있는 LRU 캐시"""
+
+    def __init__(self, max_bytes, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (value, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size):
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+        # 방금 넣은 항목 하나는 한도를 넘어도 유지
+        while len(self.entries) > 1 and (self.bytes > self.max_bytes or
+                                         len(self.entries) > self.max_entries):
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def summary(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+def _frame_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+def _to_builtin(value):
+    # 결과를 pandas/numpy 없이 읽을 수 있는 기본 타입으로 변환
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+class WarmWorker:
+    """캔들/지표 캐시와 모듈 자동 다시 불러오기를 가진 백테스트 실행기 (소켓 없이도 사용 가능)"""
+
+    def __init__(self, memory_mb=MEMORY_MB, max_entries=MAX_ENTRIES):
+        self.cache = LRUCache(int(memory_mb * 1024 ** 2), max_entries)
+        self.mtimes = {}
+        self.reloads = 0
+        self._load_modules()
+
+    def _load_modules(self):
+        for name in RELOAD_ORDER:
+            module = importlib.import_module(name)
+            self.mtimes[name] = os.path.getmtime(module.__file__)
+
+    def reload_changed(self):
+        """수정된 모듈과 그 뒤(의존) 모듈을 다시 불러오고 다시 불러온 모듈 이름 목록 반환"""
+        changed = [i for i, name in enumerate(RELOAD_ORDER)
+                   if os.path.getmtime(sys.modules[name].__file__) != self.mtimes[name]]
+        if not changed:
+            return []
+        reloaded = RELOAD_ORDER[changed[0]:]
+        for name in reloaded:
+            module = importlib.reload(sys.modules[name])
+            self.mtimes[name] = os.path.getmtime(module.__file__)
+        self.reloads += 1
+        return reloaded
+
+    def strategy_class(self, name):
+        module_name, class_name, _ = STRATEGY_CLASSES[name]
+        return getattr(sys.modules[module_name], class_name)
+
+    def indicator_version(self, name):
+        """지표 계산 함수(calculate*/indicator*) 소스와 indicators 모듈 소스의 해시"""
+        cls = self.strategy_class(name)
+        h = hashlib.sha1()
+        for attr in sorted(vars(cls)):
+            if attr.startswith(('calculate', 'indicator')):
+                h.update(inspect.getsource(getattr(cls, attr)).encode('utf-8'))
+        with open(sys.modules['indicators'].__file__, 'rb') as f:
+            h.update(f.read())
+        return h.hexdigest()[:12]
+
+    def candles(self, name, symbol, interval, start, end):
+        """매매 구간 + 지표 워밍업 캔들 (캐시 적중 여부와 함께 반환)"""
+        from data_planner import candle_source, load_candles, plan_candles
+        key = ('candles', symbol, interval, start, end, candle_source())
+        df = self.cache.get(key)
+        if df is not None:
+            return df, True
+        plan = plan_candles(start, end, self.strategy_class(name)(), interval=interval)
+        df = load_candles(plan, symbol)
+        self.cache.put(key, df, _frame_bytes(df))
+        return df, False
+
+    def indicators(self, name, symbol, interval, start, end):
+        """매매 구간의 지표 데이터프레임 (캐시 적중 여부와 함께 반환)"""
+        from data_planner import trading_window
+        from incremental_backtest import CANDLE_COLUMNS, calculate_indicators
+        key = ('indicators', name, symbol, interval, start, end, self.indicator_version(name))
+        df = self.cache.get(key)
+        if df is not None:
+            return df, True
+        candles, _ = self.candles(name, symbol, interval, start, end)
+        df = calculate_indicators(self.strategy_class(name)(), candles[CANDLE_COLUMNS].copy())
+        df = df[df.index >= trading_window(start, end)[0]]
+        self.cache.put(key, df, _frame_bytes(df))
+        return df, False
+
+    def backtest(self, strategy, start, end, interval=None, symbol="KRW-BTC", params=None):
+        """캐시한 지표로 매매 루프만 실행
+
+        Returns:
+            dict: trades(거래 dict 목록, 날짜는 ISO 문자열), metrics, open_position, cache, reloaded, timing(ms)
+        """
+        started = time.perf_counter()
+        reloaded = self.reload_changed()
+        interval = interval or STRATEGY_CLASSES[strategy][2]
+        df, indicator_hit = self.indicators(strategy, symbol, interval, start, end)
+        prepared = time.perf_counter()
+
+        from backtest_result import run_prepared
+        result = run_prepared(strategy, df, **(params or {}))
+        finished = time.perf_counter()
+
+        trades = [{key: _to_builtin(value) for key, value in trade.items()}
+                  for trade in result.trade_list()]
+        open_position = result.open_position and {key: _to_builtin(value)
+                                                  for key, value in result.open_position.items()}
+        return {
+            'strategy': strategy,
+            'params': {key: _to_builtin(value) for key, value in result.params.items()},
+            'trades': trades,
+            'metrics': {key: _to_builtin(value) for key, value in result.metrics.items()},
+            'open_position': open_position,
+            'cache': {'indicators': indicator_hit},
+            'reloaded': reloaded,
+            'timing': {'prepare_ms': (prepared - started) * 1000,
+                       'execute_ms': (finished - prepared) * 1000,
+                       'total_ms': (finished - started) * 1000},
+        }
+
+    def stats(self):
+        from instrumentation import current_rss, peak_rss
+        return {'cache': self.cache.summary(), 'reloads': self.reloads,
+                'rss': current_rss(), 'peak_rss': peak_rss()}
+
+    def handle(self, request):
+        """요청 dict 처리 (command: backtest, stats, evict, ping)"""
+        command = request.get('command')
+        if command == 'backtest':
+            return self.backtest(request['strategy'], request['start'], request['end'],
+                                 request.get('interval'), request.get('symbol', "KRW-BTC"),
+                                 request.get('params'))
+        if command == 'stats':
+            return self.stats()
+        if command == 'evict':
+            self.cache.clear()
+            return self.stats()
+        if command == 'ping':
+            return {'pong': True}
+        raise ValueError(f"알 수 없는 요청: {command}")
+
+def serve(address=DEFAULT_ADDRESS, memory_mb=MEMORY_MB, max_entries=MAX_ENTRIES, authkey=None):
+    """요청을 순서대로 처리하는 서버 (shutdown 요청을 받을 때까지 실행)
+
+    연결 하나에서 여러 요청을 보낼 수 있고, 요청 처리 중 예외는 {'error': ...} 응답으로 돌려준다.
+    authkey 가 없으면 load_authkey(create=True) 의 키를 쓴다.
+    """
+    authkey = authkey or load_authkey(create=True)
+    worker = WarmWorker(memory_mb, max_entries)
+    with Listener(parse_address(address), authkey=authkey) as listener:
+        print(f"warm worker 실행 중: {address} (캐시 한도 {memory_mb:,.0f}MB / {max_entries}개)")
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                # 키가 틀린 연결 등은 거절하고 계속 실행
+                print(f"연결 거절: {type(e).__name__}: {e}")
+                continue
+            with conn:
+                while True:
+                    try:
+                        request = conn.recv()
+                    except EOFError:
+                        break
+                    if request.get('command') == 'shutdown':
+                        conn.send({'shutdown': True})
+                        return worker.stats()
+                    try:
+                        response = worker.handle(request)
+                    except Exception as e:
+                        response = {'error': f"{type(e).__name__}: {e}",
+                                    'traceback': traceback.format_exc()}
+                    conn.send(response)
+
+class WarmClient:
+    """warm worker 클라이언트 (연결 하나를 재사용)"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=None):
+        self.conn = Client(parse_address(address), authkey=authkey or load_authkey())
+
+    def request(self, command, **fields):
+        self.conn.send({'command': command, **fields})
+        response = self.conn.recv()
+        if 'error' in response:
+            raise RuntimeError(f"warm worker 오류: {response['error']}\n{response['traceback']}")
+        return response
+
+    def backtest(self, strategy, start, end, interval=None, symbol="KRW-BTC", **params):
+        return self.request('backtest', strategy=strategy, start=start, end=end, interval=interval,
+                            symbol=symbol, params=params)
+
+    def stats(self):
+        return self.request('stats')
+
+    def evict(self):
+        return self.request('evict')
+
+    def shutdown(self):
+        self.conn.send({'command': 'shutdown'})
+        return self.conn.recv()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def print_result(result):
+    """백테스트 응답 요약 출력"""
+    metrics = result['metrics']
+    cached = "캐시 사용" if result['cache']['indicators'] else "새로 계산"
+    print(f"{result['strategy']} {result['params']}: 거래 {len(result['trades'])}회, "
+          f"승률 {metrics['win_rate']:.2f}%, 총 수익금 {metrics['total_profit']:,.0f}원")
+    print(f"지표 {cached}, 준비 {result['timing']['prepare_ms']:.1f}ms / "
+          f"매매 루프 {result['timing']['execute_ms']:.1f}ms")
+    if result['reloaded']:
+        print(f"다시 불러온 모듈: {', '.join(result['reloaded'])}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="상주 백테스트 작업 프로세스")
+    parser.add_argument('--address', default=DEFAULT_ADDRESS, help="host:port")
+    commands = parser.add_subparsers(dest='command', required=True)
+    server = commands.add_parser('serve', help="서버 실행")
+    server.add_argument('--memory-mb', type=float, default=MEMORY_MB, help="캐시 크기 한도 (MB)")
+    server.add_argument('--max-entries', type=int, default=MAX_ENTRIES, help="캐시 항목 수 한도")
+    backtest = commands.add_parser('backtest', help="백테스트 요청")
+    backtest.add_argument('strategy', choices=sorted(STRATEGY_CLASSES))
+    backtest.add_argument('--start', default='20250101')
+    backtest.add_argument('--end', default='20250131')
+    backtest.add_argument('--interval')
+    backtest.add_argument('--take-profit', type=float)
+    backtest.add_argument('--stop-loss', type=float)
+    commands.add_parser('stats', help="캐시/메모리 상태")
+    commands.add_parser('evict', help="캐시 비우기")
+    commands.add_parser('shutdown', help="서버 종료")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        serve(args.address, args.memory_mb, args.max_entries)
+        return
+    with WarmClient(args.address) as client:
+        if args.command == 'backtest':
+            params = {key: value for key, value in
+                      [('take_profit', args.take_profit), ('stop_loss', args.stop_loss)]
+                      if value is not None}
+            print_result(client.backtest(args.strategy, args.start, args.end, args.interval, **params))
+        elif args.command == 'shutdown':
+            client.shutdown()
+        else:
+            print(getattr(client, args.command)())
+
+if __name__ == "__main__":
+    main()